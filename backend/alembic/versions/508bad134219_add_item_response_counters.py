@@ -0,0 +1,71 @@
+"""add_item_response_counters
+
+Revision ID: 508bad134219
+Revises: bad8f5de1b5d
+Create Date: 2026-10-18 13:57:52.398907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '508bad134219'
+down_revision: Union[str, None] = 'bad8f5de1b5d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('item_response_counters',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('question_id', sa.UUID(), nullable=False),
+    sa.Column('test_session_identifier', sa.String(length=100), server_default='', nullable=False),
+    sa.Column('responses_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('correct_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('option_counts', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'{}'::jsonb"), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('question_id', 'test_session_identifier', name='uq_question_session_counter')
+    )
+    op.create_index(op.f('ix_item_response_counters_question_id'), 'item_response_counters', ['question_id'], unique=False)
+    op.create_index(op.f('ix_item_response_counters_test_session_identifier'), 'item_response_counters', ['test_session_identifier'], unique=False)
+
+    # Isi penghitung dari respons yang sudah ada
+    op.execute("""
+        WITH per_option AS (
+            SELECT question_id,
+                   COALESCE(test_session_identifier, '') AS test_session_identifier,
+                   selected_option_id,
+                   COUNT(*) AS selection_count,
+                   COUNT(*) FILTER (WHERE is_response_correct IS TRUE) AS correct_count
+            FROM student_responses
+            GROUP BY 1, 2, 3
+        )
+        INSERT INTO item_response_counters
+            (id, question_id, test_session_identifier, responses_count, correct_count, option_counts)
+        SELECT gen_random_uuid(),
+               question_id,
+               test_session_identifier,
+               SUM(selection_count),
+               SUM(correct_count),
+               COALESCE(
+                   jsonb_object_agg(selected_option_id::text, selection_count)
+                       FILTER (WHERE selected_option_id IS NOT NULL),
+                   '{}'::jsonb
+               )
+        FROM per_option
+        GROUP BY question_id, test_session_identifier
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_item_response_counters_test_session_identifier'), table_name='item_response_counters')
+    op.drop_index(op.f('ix_item_response_counters_question_id'), table_name='item_response_counters')
+    op.drop_table('item_response_counters')
@@ -5,11 +5,15 @@ from typing import Any, Optional, List, Dict
 from uuid import UUID
 from pydantic import BaseModel
 
-from app import schemas
+from app import schemas, crud
 from app.db.session import get_db
 from app.core.security import get_current_active_user
 from app.models.user import User
-from app.services.item_analysis_service import ItemAnalysisService
+from app.services.item_analysis_service import ItemAnalysisService, DISCRIMINATION_GROUP_FRACTION, validate_group_fraction
+from app.services.irt_service import irt_service, validate_irt_model
+from app.services.dif_service import dif_service
+from app.services.similarity_service import similarity_service, DEFAULT_Z_THRESHOLD, DEFAULT_MIN_IDENTICAL_WRONG
+from app.services.response_matrix import get_session_identifier, validate_session_identifier
 
 router = APIRouter()
 
@@ -18,10 +22,12 @@ class StudentScoresInput(BaseModel):
     scores: Dict[str, float] # student_identifier: total_score
 
 @router.post("/questions/{question_id}", response_model=schemas.ItemAnalysisResultRead)
-async def trigger_and_get_question_analysis(
+def trigger_and_get_question_analysis(
     question_id: UUID,
     db: Session = Depends(get_db),
     test_session_identifier: Optional[str] = None, # Bisa dari query param
+    group_fraction: float = DISCRIMINATION_GROUP_FRACTION, # 0.27, 0.33 atau 0.5 (median split)
+    ci: bool = False, # Hitung interval kepercayaan bootstrap untuk P-value dan D-index
     # Gunakan Body(...) untuk menerima JSON body, termasuk yang opsional
     student_scores_input: Optional[schemas.StudentScoresInput] = Body(None),
     item_analysis_service: ItemAnalysisService = Depends(ItemAnalysisService),
@@ -29,8 +35,10 @@ async def trigger_and_get_question_analysis(
 ) -> Any:
     """
     Memicu perhitungan analisis untuk soal tertentu.
-    Secara opsional menerima skor total siswa di dalam body untuk
-    perhitungan Indeks Diskriminasi yang lengkap.
+    Jika `test_session_identifier` diberikan, skor total siswa untuk Indeks Diskriminasi
+    dihitung otomatis di server. Body berisi skor total tetap diterima untuk
+    kompatibilitas dan akan menggantikan skor yang dihitung server.
+    Dengan `ci=true`, interval kepercayaan bootstrap 95% ikut dihitung dan disimpan.
     """
     # Ekstrak dictionary skor jika ada, jika tidak, biarkan None
     all_student_scores = student_scores_input.scores if student_scores_input else None
@@ -41,7 +49,9 @@ async def trigger_and_get_question_analysis(
             db=db,
             question_id=question_id,
             test_session_identifier=test_session_identifier,
-            all_student_total_scores_for_test=all_student_scores
+            all_student_total_scores_for_test=all_student_scores,
+            group_fraction=group_fraction,
+            ci=ci
         )
         return analysis_result
     except HTTPException as e:
@@ -50,9 +60,211 @@ async def trigger_and_get_question_analysis(
         # Tambahkan logging di sini jika perlu
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred during analysis.")
 
+@router.post("/test-sessions/{session_id}", response_model=schemas.TestSessionAnalysisRead)
+def trigger_test_session_analysis(
+    session_id: UUID,
+    group_fraction: float = DISCRIMINATION_GROUP_FRACTION, # 0.27, 0.33 atau 0.5 (median split)
+    ci: bool = False, # Hitung interval kepercayaan bootstrap untuk P-value dan D-index
+    test_session_identifier: Optional[str] = None, # Identifier respons jika bukan ID sesi ujian
+    db: Session = Depends(get_db),
+    item_analysis_service: ItemAnalysisService = Depends(ItemAnalysisService),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Memicu analisis untuk semua soal dalam sebuah sesi ujian sekaligus.
+    Respons sesi dimuat satu kali, P-value, D-index dan statistik opsi dihitung
+    untuk seluruh soal, lalu semua hasil disimpan dalam satu transaksi.
+    `group_fraction` menentukan proporsi kelompok atas/bawah untuk D-index, dan
+    `ci=true` menambahkan interval kepercayaan bootstrap 95% untuk setiap soal.
+    Respons dicari dengan ID sesi sebagai `test_session_identifier` (konvensi template lembar
+    jawaban); berikan `test_session_identifier` jika respons diupload dengan label lain.
+    """
+    validate_session_identifier(test_session_identifier)
+    return item_analysis_service.analyze_test_session(
+        db=db, session_id=session_id, group_fraction=group_fraction, ci=ci,
+        test_session_identifier=test_session_identifier
+    )
+
+@router.get("/test-sessions/{session_id}/reliability", response_model=schemas.TestReliabilityRead)
+def get_test_session_reliability(
+    session_id: UUID,
+    refresh: bool = False,
+    test_session_identifier: Optional[str] = None, # Identifier respons jika bukan ID sesi ujian
+    db: Session = Depends(get_db),
+    item_analysis_service: ItemAnalysisService = Depends(ItemAnalysisService),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Mengambil reliabilitas sesi ujian (KR-20 / Cronbach's alpha) beserta point-biserial
+    terkoreksi dan alpha jika soal dihapus untuk setiap soal.
+    Dihitung saat pertama kali diminta; gunakan `refresh=true` untuk menghitung ulang.
+    """
+    validate_session_identifier(test_session_identifier)
+    return item_analysis_service.analyze_test_session_reliability(
+        db=db, session_id=session_id, refresh=refresh, test_session_identifier=test_session_identifier
+    )
+
+@router.post("/test-sessions/{session_id}/dif", response_model=schemas.DIFAnalysisRead)
+def analyze_test_session_dif(
+    session_id: UUID,
+    dif_in: schemas.DIFAnalysisRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Analisis Differential Item Functioning (Mantel-Haenszel) untuk semua soal sebuah sesi ujian
+    antara dua kelompok (Roster atau daftar student_identifier). Siswa distratifikasi
+    berdasarkan skor total; setiap soal mendapat odds ratio MH, delta ETS dan kelas A/B/C.
+    """
+    validate_session_identifier(dif_in.test_session_identifier)
+    return dif_service.analyze_test_session_dif(db=db, session_id=session_id, dif_in=dif_in)
+
+@router.get("/test-sessions/{session_id}/similarity", response_model=schemas.SessionSimilarityRead)
+def detect_test_session_similarity(
+    session_id: UUID,
+    z_threshold: float = DEFAULT_Z_THRESHOLD,
+    min_identical_wrong: int = DEFAULT_MIN_IDENTICAL_WRONG,
+    limit: int = 100,
+    test_session_identifier: Optional[str] = None, # Identifier respons jika bukan ID sesi ujian
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Menandai pasangan siswa dalam sebuah sesi ujian yang memilih pengecoh (jawaban salah)
+    yang sama jauh lebih sering dari yang diharapkan berdasarkan popularitas pengecoh.
+    Hasil diurutkan dari z-score tertinggi; gunakan sebagai indikasi awal, bukan bukti kecurangan.
+    """
+    validate_session_identifier(test_session_identifier)
+    return similarity_service.detect_similar_responses(
+        db=db, session_id=session_id, z_threshold=z_threshold,
+        min_identical_wrong=min_identical_wrong, limit=limit,
+        test_session_identifier=test_session_identifier
+    )
+
+@router.post("/test-sessions/{session_id}/irt", response_model=schemas.IRTCalibrationRead)
+def calibrate_test_session_irt(
+    session_id: UUID,
+    model: str = "2pl",
+    test_session_identifier: Optional[str] = None, # Identifier respons jika bukan ID sesi ujian
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Mengkalibrasi model IRT ('rasch' atau '2pl') untuk sebuah sesi ujian.
+    Parameter b (kesulitan) dan a (daya beda) disimpan pada hasil analisis setiap soal,
+    estimasi kemampuan siswa dapat dibaca melalui `GET /test-sessions/{session_id}/abilities`.
+    """
+    validate_session_identifier(test_session_identifier)
+    identifiers = {session_id: test_session_identifier} if test_session_identifier else None
+    return irt_service.calibrate_test_sessions(
+        db=db, session_ids=[session_id], model=model, test_session_identifiers=identifiers
+    )[0]
+
+@router.post("/irt/calibrate", response_model=List[schemas.BackgroundJobRead], status_code=status.HTTP_202_ACCEPTED)
+def calibrate_test_sessions_irt(
+    calibration_in: schemas.IRTCalibrationRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Mengantrekan kalibrasi model IRT untuk beberapa sesi ujian sekaligus, satu pekerjaan per sesi,
+    sehingga proses-proses worker mengkalibrasi sesi secara paralel. Mengembalikan daftar pekerjaan
+    (urutan sesuai `test_session_ids`); hasil setiap sesi (IRTCalibrationRead) tersedia di
+    `result.calibrations` pada `GET /jobs/{job_id}`.
+    """
+    if not calibration_in.test_session_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Isi minimal satu test_session_id.")
+    validate_irt_model(calibration_in.model)
+    for identifier in calibration_in.test_session_identifiers.values():
+        validate_session_identifier(identifier)
+    for session_id in calibration_in.test_session_ids:
+        if not crud.test_session.get(db=db, id=session_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Test Session {session_id} not found")
+
+    params_list = [
+        {
+            "test_session_ids": [str(session_id)],
+            "model": calibration_in.model,
+            "test_session_identifiers": (
+                {str(session_id): calibration_in.test_session_identifiers[session_id]}
+                if session_id in calibration_in.test_session_identifiers else {}
+            ),
+        }
+        for session_id in dict.fromkeys(calibration_in.test_session_ids)
+    ]
+    return crud.background_job.enqueue_many(
+        db=db, job_type="irt_calibration", params_list=params_list, owner_id=current_user.id
+    )
+
+@router.get("/test-sessions/{session_id}/abilities", response_model=List[schemas.PersonAbilityRead])
+def read_test_session_abilities(
+    session_id: UUID,
+    skip: int = 0,
+    limit: int = 1000,
+    test_session_identifier: Optional[str] = None, # Identifier respons jika bukan ID sesi ujian
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Mengambil estimasi kemampuan (theta) siswa dari kalibrasi IRT terakhir sebuah sesi ujian.
+    """
+    validate_session_identifier(test_session_identifier)
+    session = crud.test_session.get(db=db, id=session_id)
+    if not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test Session not found")
+    return crud.irt_person_ability.get_multi_by_session(
+        db=db, test_session_identifier=get_session_identifier(session, test_session_identifier), skip=skip, limit=limit
+    )
+
+@router.post("/jobs", response_model=schemas.BackgroundJobRead, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_analysis_job(
+    job_in: schemas.AnalysisJobCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Mengantrekan analisis item untuk dijalankan worker di latar belakang dan
+    langsung mengembalikan ID pekerjaan. Progres dapat dipantau melalui `GET /jobs/{job_id}`.
+    """
+    validate_group_fraction(job_in.group_fraction)
+    validate_session_identifier(job_in.test_session_identifier)
+    if job_in.question_id:
+        if not crud.question.get(db=db, id=job_in.question_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Question with id {job_in.question_id} not found.")
+        job_type = "question_analysis"
+        params = {"question_id": str(job_in.question_id), "test_session_identifier": job_in.test_session_identifier}
+    else:
+        if not crud.test_session.get(db=db, id=job_in.test_session_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test Session not found")
+        job_type = "test_session_analysis"
+        params = {"test_session_id": str(job_in.test_session_id), "test_session_identifier": job_in.test_session_identifier}
+    params["group_fraction"] = job_in.group_fraction
+    params["ci"] = job_in.ci
+
+    return crud.background_job.enqueue(db=db, job_type=job_type, params=params, owner_id=current_user.id)
+
+@router.post("/counters/rebuild", response_model=schemas.BackgroundJobRead, status_code=status.HTTP_202_ACCEPTED)
+def rebuild_item_response_counters(
+    test_session_identifier: Optional[str] = None, # Kosongkan untuk semua sesi
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    (Admin) Mengantrekan penghitungan ulang penghitung statistik item dari tabel respons siswa.
+    Penghitung hanya diperbarui oleh upload respons massal; gunakan ini setelah respons diubah
+    atau dihapus dengan cara lain agar statistik opsi dan analisis per soal kembali akurat.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="The user doesn't have enough privileges")
+    validate_session_identifier(test_session_identifier)
+    return crud.background_job.enqueue(
+        db=db, job_type="counter_rebuild",
+        params={"test_session_identifier": test_session_identifier}, owner_id=current_user.id
+    )
+
 # Endpoint GET tetap sama, hanya mengambil data yang sudah ada
 @router.get("/questions/{question_id}", response_model=schemas.ItemAnalysisResultRead)
-async def get_question_analysis(
+def get_question_analysis(
     question_id: UUID,
     test_session_identifier: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -74,7 +286,7 @@ async def get_question_analysis(
     response_model=List[schemas.ItemAnalysisResultRead],
     summary="Get Summary Statistics for Multiple Question Analyses"
 )
-async def read_analysis_summary_stats(
+def read_analysis_summary_stats(
     db: Session = Depends(get_db),
     subject: Optional[str] = None,
     topic: Optional[str] = None,
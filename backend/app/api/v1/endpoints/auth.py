@@ -1,11 +1,12 @@
 # backend/app/api/v1/endpoints/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from datetime import timedelta
 
 from app import schemas, crud
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.core.security import create_access_token, verify_password # get_password_hash tidak dipakai di login, tapi di register
 from app.core.config import settings
 # Model User tidak perlu diimpor di sini jika kita pakai CRUD
@@ -14,14 +15,15 @@ router = APIRouter()
 
 @router.post("/login", response_model=schemas.Token)
 async def login_for_access_token(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     Endpoint untuk login pengguna dan mendapatkan access token.
     """
-    user = crud.user.get_by_username(db, username=form_data.username) # Menggunakan CRUD
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await crud.user_async.get_by_username(db, username=form_data.username) # Menggunakan CRUD
+    # Verifikasi bcrypt memakan CPU, jalankan di threadpool agar event loop tidak terblokir
+    if not user or not await run_in_threadpool(verify_password, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -39,18 +41,18 @@ async def login_for_access_token(
 @router.post("/register", response_model=schemas.UserRead, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_in: schemas.UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Endpoint untuk registrasi pengguna baru.
     """
-    existing_user_by_email = crud.user.get_by_email(db, email=user_in.email) # Menggunakan CRUD
+    existing_user_by_email = await crud.user_async.get_by_email(db, email=user_in.email) # Menggunakan CRUD
     if existing_user_by_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists.",
         )
-    existing_user_by_username = crud.user.get_by_username(db, username=user_in.username) # Menggunakan CRUD
+    existing_user_by_username = await crud.user_async.get_by_username(db, username=user_in.username) # Menggunakan CRUD
     if existing_user_by_username:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -58,5 +60,5 @@ async def register_user(
         )
 
     # Fungsi create di CRUDUser sudah menangani hashing password
-    db_user = crud.user.create(db=db, obj_in=user_in) # Menggunakan CRUD
+    db_user = await crud.user_async.create(db=db, obj_in=user_in) # Menggunakan CRUD
     return db_user
\ No newline at end of file
@@ -0,0 +1,65 @@
+# backend/app/api/v1/endpoints/jobs.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import Any, List
+from uuid import UUID
+
+from app import schemas, crud
+from app.db.session import get_db
+from app.core.security import get_current_active_user
+from app.models.user import User
+from app.services.bulk_upload_service import bulk_upload_service
+
+router = APIRouter()
+
+@router.get("/", response_model=List[schemas.BackgroundJobRead])
+def read_my_jobs(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    skip: int = 0,
+    limit: int = 100
+) -> Any:
+    """
+    Mengambil daftar pekerjaan latar belakang milik pengguna saat ini.
+    """
+    return crud.background_job.get_multi_by_owner(db=db, owner_id=current_user.id, skip=skip, limit=limit)
+
+def _get_own_job(db: Session, job_id: UUID, current_user: User):
+    job = crud.background_job.get(db=db, id=job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if job.created_by_user_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    return job
+
+@router.get("/{job_id}", response_model=schemas.BackgroundJobRead)
+def read_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Mengambil status dan progres sebuah pekerjaan latar belakang.
+    """
+    return _get_own_job(db, job_id, current_user)
+
+@router.get("/{job_id}/errors.csv", response_class=FileResponse)
+def download_job_errors(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Mengunduh daftar error pekerjaan upload massal (row_number, error_message, row_data) sebagai CSV.
+    Tersedia setelah pekerjaan selesai.
+    """
+    job = _get_own_job(db, job_id, current_user)
+    if job.job_type not in ("question_upload", "response_upload"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job is not an upload job")
+    if job.status != "completed":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is {job.status}; errors are available once it completes")
+    path = bulk_upload_service.get_errors_csv_path(job.params)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Error file not found")
+    return FileResponse(path, media_type="text/csv", filename=f"upload_errors_{job_id}.csv")
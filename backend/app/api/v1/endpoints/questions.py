@@ -1,12 +1,15 @@
 # src/api/v1/endpoints/questions.py
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, status
+from fastapi import APIRouter, Body, Depends, HTTPException, File, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Dict
 from uuid import UUID
 
 from app import schemas, crud
-from app.db.session import get_db
-from app.core.security import get_current_active_user
+from app.db.session import get_async_db, get_db
+from app.core.pagination import InvalidCursorError
+from app.core.security import get_current_active_user, get_current_active_user_async
+from app.crud.crud_question import TotalMode
 from app.models.user import User
 from app.services.bulk_upload_service import bulk_upload_service
 from app.services.item_analysis_service import ItemAnalysisService
@@ -14,7 +17,7 @@ from app.services.item_analysis_service import ItemAnalysisService
 router = APIRouter()
 
 @router.post("/", response_model=schemas.QuestionRead, status_code=status.HTTP_201_CREATED)
-async def create_question(
+def create_question(
     question_in: schemas.QuestionCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -32,14 +35,23 @@ def read_questions(
     subject: Optional[str] = None,
     topic: Optional[str] = None,
     question_type: Optional[str] = None,
+    q: Optional[str] = Query(None, description="Pencarian teks pada konten, subjek dan topik soal; hasil diurutkan berdasarkan relevansi."),
+    cursor: Optional[str] = Query(None, description="Nilai `next_cursor` dari halaman sebelumnya; jika diisi, `skip` diabaikan."),
+    total_mode: TotalMode = Query("cached", alias="total", description="'cached' (default; bisa tertinggal hingga QUESTION_COUNT_CACHE_SECONDS setelah import oleh worker), 'exact', atau 'estimated' (perkiraan planner, tanpa COUNT)."),
 ) -> Any:
     """
-    Mengambil daftar soal dengan filter dan paginasi.
-    """
-    # 2. Panggil fungsi CRUD yang mengembalikan dict berisi 'items' dan 'total'
-    questions_data = crud.question.get_multi(
-        db, skip=skip, limit=limit, subject=subject, topic=topic, question_type=question_type
-    )
+    Mengambil daftar soal dengan filter, pencarian `q` dan paginasi.
+    Untuk halaman dalam gunakan paginasi cursor (`cursor` = `next_cursor` respons sebelumnya)
+    yang biayanya sama dengan halaman pertama, alih-alih `skip` yang makin lambat.
+    """
+    # 2. Panggil fungsi CRUD yang mengembalikan dict berisi 'items', 'total' dan 'next_cursor'
+    try:
+        questions_data = crud.question.get_multi(
+            db, skip=skip, limit=limit, subject=subject, topic=topic, question_type=question_type,
+            search=q.strip() if q else None, cursor=cursor, total_mode=total_mode
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return questions_data # 3. Kembalikan langsung objek dict tersebut
 
 @router.get("/{question_id}/option-stats", response_model=schemas.QuestionOptionStatsRead)
@@ -94,12 +106,12 @@ def read_comments_for_question(
 @router.get("/{question_id}", response_model=schemas.QuestionRead)
 async def read_question(
     question_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     Mengambil detail satu soal berdasarkan ID.
     """
-    db_question = crud.question.get(db=db, id=question_id)
+    db_question = await crud.question_async.get(db=db, id=question_id)
     if not db_question:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
     return db_question
@@ -108,23 +120,23 @@ async def read_question(
 async def update_question(
     question_id: UUID,
     question_in: schemas.QuestionUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
 ) -> Any:
     """
     Memperbarui soal yang ada. Pengguna hanya bisa memperbarui soal miliknya.
     """
-    db_question = crud.question.get(db=db, id=question_id)
+    db_question = await crud.question_async.get(db=db, id=question_id)
     if not db_question:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
     if db_question.created_by_user_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
     
-    updated_question = crud.question.update(db=db, db_obj=db_question, obj_in=question_in)
+    updated_question = await crud.question_async.update(db=db, db_obj=db_question, obj_in=question_in)
     return updated_question
 
 @router.delete("/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_question(
+def delete_question(
     question_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -154,4 +166,30 @@ def upload_questions_bulk(
 
     Format JSON harus berupa array dari objek soal.
     """
-    return bulk_upload_service.process_question_upload(db=db, file=file, owner=current_user)
\ No newline at end of file
+    return bulk_upload_service.process_question_upload(db=db, file=file, owner=current_user)
+
+@router.post("/bulk-upload/jobs", response_model=schemas.BackgroundJobRead, status_code=status.HTTP_202_ACCEPTED, summary="Upload Soal Massal di Latar Belakang")
+def enqueue_question_upload_job(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    file: UploadFile = File(...)
+) -> Any:
+    """
+    Menyimpan file CSV/JSON soal ke area staging dan mengantrekannya untuk diproses worker.
+    Langsung mengembalikan ID pekerjaan; progres (baris, error, throughput) dipantau melalui
+    `GET /jobs/{job_id}` dan daftar error diunduh melalui `GET /jobs/{job_id}/errors.csv`.
+    """
+    params = bulk_upload_service.stage_upload(file=file)
+    return crud.background_job.enqueue(db=db, job_type="question_upload", params=params, owner_id=current_user.id)
+
+@router.post("/batch", response_model=schemas.QuestionBatchCreateResponse, status_code=status.HTTP_200_OK, summary="Buat Soal Secara Massal dari Payload JSON")
+def create_questions_batch(
+    questions_in: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Membuat banyak soal sekaligus dari array objek soal (format sama dengan upload JSON).
+    Baris yang tidak valid tidak menggagalkan seluruh permintaan, tetapi dilaporkan per baris di `errors`.
+    """
+    return bulk_upload_service.process_question_batch(db=db, rows=questions_in, owner=current_user)
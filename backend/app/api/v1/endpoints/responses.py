@@ -1,7 +1,7 @@
 # backend/app/api/v1/endpoints/responses.py
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, status
+from fastapi import APIRouter, Depends, HTTPException, File, Query, UploadFile, status
 from sqlalchemy.orm import Session
-from typing import List, Any, Optional
+from typing import List, Any, Literal, Optional
 from uuid import UUID
 
 from app import schemas, crud
@@ -12,19 +12,37 @@ from app.services.bulk_upload_service import bulk_upload_service
 
 router = APIRouter()
 
-@router.post("/bulk", status_code=status.HTTP_200_OK, response_model=schemas.BulkUploadResponse)
-async def create_student_responses_bulk(
+@router.post("/bulk", status_code=status.HTTP_200_OK, response_model=schemas.ResponseBulkUploadResponse)
+def create_student_responses_bulk(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    on_conflict: Literal["update", "ignore"] = Query("update", description="Perlakuan jawaban yang sudah ada (soal, siswa, sesi sama): 'update' memperbaikinya, 'ignore' mempertahankan jawaban lama.")
 ) -> Any:
     """
     Mengunggah file CSV atau JSON untuk membuat banyak jawaban siswa sekaligus.
+    Upload ulang bersifat idempoten: jawaban yang sama tidak diubah, jawaban yang berbeda diperbarui di tempat.
     """
-    return bulk_upload_service.process_response_upload(db=db, file=file)
+    return bulk_upload_service.process_response_upload(db=db, file=file, on_conflict=on_conflict)
+
+@router.post("/bulk/jobs", status_code=status.HTTP_202_ACCEPTED, response_model=schemas.BackgroundJobRead)
+def enqueue_student_responses_upload_job(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    file: UploadFile = File(...),
+    on_conflict: Literal["update", "ignore"] = Query("update", description="Perlakuan jawaban yang sudah ada, sama seperti pada /bulk.")
+) -> Any:
+    """
+    Menyimpan file CSV/JSON jawaban siswa ke area staging dan mengantrekannya untuk diproses worker.
+    Langsung mengembalikan ID pekerjaan; progres (baris, error, throughput) dipantau melalui
+    `GET /jobs/{job_id}` dan daftar error diunduh melalui `GET /jobs/{job_id}/errors.csv`.
+    """
+    params = bulk_upload_service.stage_upload(file=file)
+    params["on_conflict"] = on_conflict
+    return crud.background_job.enqueue(db=db, job_type="response_upload", params=params, owner_id=current_user.id)
 
 @router.get("/by-question/{question_id}", response_model=List[schemas.StudentResponseRead])
-async def read_responses_by_question(
+def read_responses_by_question(
     question_id: UUID,
     db: Session = Depends(get_db),
     skip: int = 0,
@@ -46,7 +64,7 @@ async def read_responses_by_question(
     return responses
 
 @router.get("/by-student/{student_identifier}", response_model=List[schemas.StudentResponseRead])
-async def read_responses_by_student(
+def read_responses_by_student(
     student_identifier: str,
     db: Session = Depends(get_db),
     skip: int = 0,
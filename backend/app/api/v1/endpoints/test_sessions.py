@@ -1,8 +1,8 @@
 # backend/app/api/v1/endpoints/test_sessions.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List, Any
+from typing import List, Any, Literal, Optional
 from uuid import UUID
 from fastapi.responses import StreamingResponse
 
@@ -11,6 +11,8 @@ from app.db.session import get_db
 from app.core.security import get_current_active_user
 from app.models.user import User
 from app.services.template_service import template_service
+from app.services.export_service import export_service, ExportDataset, ExportFormat
+from app.services.response_matrix import validate_session_identifier
 
 router = APIRouter()
 
@@ -96,8 +98,38 @@ def add_questions_to_test_session(session_id: UUID, questions_in: schemas.Questi
     return crud.test_session.add_questions_to_session(db=db, db_obj=db_session, question_ids=questions_in.question_ids)
 
 @router.get("/{session_id}/answer-sheet-template", response_class=StreamingResponse)
-def download_answer_sheet_template(session_id: UUID, db: Session = Depends(get_db)):
-    response = template_service.generate_answer_sheet_template(db=db, session_id=session_id)
+def download_answer_sheet_template(
+    session_id: UUID,
+    layout: Literal["long", "wide"] = Query("long", description="'long': satu baris per siswa x soal, 'wide': satu baris per siswa dan satu kolom per soal."),
+    db: Session = Depends(get_db)
+):
+    response = template_service.generate_answer_sheet_template(db=db, session_id=session_id, layout=layout)
     if not response:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test Session not found")
-    return response
\ No newline at end of file
+    return response
+
+@router.get("/{session_id}/export/{dataset}", response_class=StreamingResponse)
+def export_test_session_data(
+    session_id: UUID,
+    dataset: ExportDataset,
+    export_format: ExportFormat = Query("csv", alias="format", description="'csv', 'ndjson' (satu objek JSON per baris) atau 'parquet' (kolumnar, terkompresi zstd)."),
+    test_session_identifier: Optional[str] = Query(None, description="Identifier respons jika bukan ID sesi ujian."),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Mengunduh seluruh data sesi ujian sekaligus secara streaming:
+    `responses` (semua jawaban siswa), `scores` (skor total per siswa) atau
+    `item-analysis` (hasil analisis soal yang tersimpan). Pengganti paginasi
+    `/responses/by-question` untuk penarikan data dalam jumlah besar.
+    """
+    validate_session_identifier(test_session_identifier)
+    db_session = crud.test_session.get(db=db, id=session_id)
+    if not db_session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sesi ujian tidak ditemukan")
+    if db_session.owner_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Tidak memiliki izin untuk mengekspor data sesi ini")
+    return export_service.export_session_dataset(
+        db, session=db_session, dataset=dataset, export_format=export_format,
+        test_session_identifier=test_session_identifier
+    )
@@ -1,17 +1,17 @@
 # backend/app/api/v1/endpoints/users.py
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, List
 from uuid import UUID
 
 from app import schemas, crud
-from app.db.session import get_db
-from app.core.security import get_current_active_user
+from app.db.session import get_async_db
+from app.core.security import get_current_active_user_async
 from app.models.user import User
 
 router = APIRouter()
 
-def get_current_active_admin(current_user: User = Depends(get_current_active_user)) -> User:
+def get_current_active_admin(current_user: User = Depends(get_current_active_user_async)) -> User:
     """
     Dependensi untuk memeriksa apakah pengguna saat ini adalah admin yang aktif.
     """
@@ -28,7 +28,7 @@ def get_current_active_admin(current_user: User = Depends(get_current_active_use
 
 @router.get("/me", response_model=schemas.UserRead)
 async def read_users_me(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user_async)
 ):
     """
     Mendapatkan detail pengguna yang sedang login dan aktif.
@@ -38,44 +38,44 @@ async def read_users_me(
 @router.put("/me", response_model=schemas.UserRead)
 async def update_user_me(
     user_in: schemas.UserUpdate, # Menggunakan skema UserUpdate yang sudah diperbaiki
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
 ):
     """
     Memperbarui detail pengguna yang sedang login.
     """
-    updated_user = crud.user.update(db, db_obj=current_user, obj_in=user_in)
+    updated_user = await crud.user_async.update(db, db_obj=current_user, obj_in=user_in)
     return updated_user
 
 # Endpoint untuk admin sekarang berada di bawah endpoint /me
 
 @router.get("/all", response_model=List[schemas.UserRead], dependencies=[Depends(get_current_active_admin)])
 async def read_all_users(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
 ):
     """
     Mengambil daftar semua pengguna. Hanya bisa diakses oleh admin.
     """
-    users = crud.user.get_multi(db, skip=skip, limit=limit)
+    users = await crud.user_async.get_multi(db, skip=skip, limit=limit)
     return users
 
 @router.put("/{user_id}", response_model=schemas.UserRead, dependencies=[Depends(get_current_active_admin)])
 async def update_user_by_admin(
     user_id: UUID,
     user_in: schemas.UserUpdateByAdmin,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Memperbarui data pengguna berdasarkan ID. Hanya bisa diakses oleh admin.
     """
-    user_to_update = crud.user.get(db, id=user_id)
+    user_to_update = await crud.user_async.get(db, id=user_id)
     if not user_to_update:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="The user with this ID does not exist in the system",
         )
     
-    updated_user = crud.user.update(db, db_obj=user_to_update, obj_in=user_in)
+    updated_user = await crud.user_async.update(db, db_obj=user_to_update, obj_in=user_in)
     return updated_user
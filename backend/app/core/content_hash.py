@@ -0,0 +1,24 @@
+# backend/app/core/content_hash.py
+import hashlib
+import re
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question_content(content: str) -> str:
+    """
+    Normalisasi konten soal untuk deteksi duplikat: spasi berurutan (termasuk baris baru dan tab)
+    digabung menjadi satu spasi, spasi di awal/akhir dibuang, dan huruf diubah menjadi kecil.
+    Harus tetap sama dengan ekspresi SQL yang dipakai migrasi untuk mengisi kolom `content_hash`.
+    """
+    return _WHITESPACE_RE.sub(" ", content).strip().lower()
+
+
+def question_content_hash(content: str) -> str:
+    """SHA-256 (hex) dari konten soal yang sudah dinormalisasi; nilai kolom `questions.content_hash`."""
+    return hashlib.sha256(normalize_question_content(content).encode("utf-8")).hexdigest()
+
+
+def exact_content_hash(content: str) -> str:
+    """SHA-256 (hex) dari konten soal apa adanya, untuk membandingkan duplikat persis tanpa menyimpan teksnya."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
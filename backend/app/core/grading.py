@@ -0,0 +1,84 @@
+# backend/app/core/grading.py
+import string
+from typing import Dict, Iterable, Optional, Set
+from uuid import UUID
+
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.question import Question
+
+
+def normalize_answer(text: Optional[str]) -> str:
+    """Normalisasi jawaban untuk pencocokan: spasi berurutan digabung, spasi tepi dibuang, huruf kecil."""
+    return " ".join((text or "").split()).casefold()
+
+
+class GradingKey:
+    """
+    Kunci penilaian satu soal yang disusun sekali dan dipakai ulang untuk setiap jawaban:
+    peta teks opsi (dinormalisasi) dan label huruf A/B/C/... ke ID opsi, ID opsi benar,
+    serta jawaban benar soal isian singkat yang sudah dinormalisasi.
+    """
+    __slots__ = ("question_id", "question_type", "option_ids", "correct_option_id", "correct_answer")
+
+    def __init__(self, question: Question):
+        self.question_id: UUID = question.id
+        self.question_type: str = question.question_type
+        self.correct_answer: Optional[str] = (
+            normalize_answer(question.correct_answer_text) if question.correct_answer_text else None
+        )
+
+        options = list(question.answer_options)
+        self.correct_option_id: Optional[UUID] = next((option.id for option in options if option.is_correct), None)
+        self.option_ids: Dict[str, UUID] = {}
+        for option in options:
+            self.option_ids.setdefault(normalize_answer(option.option_text), option.id)
+        # Label huruf hanya jika urutan opsi jelas (semua opsi punya display_order); teks opsi asli tetap diutamakan
+        if options and all(option.display_order is not None for option in options):
+            ordered = sorted(options, key=lambda option: option.display_order)
+            for letter, option in zip(string.ascii_lowercase, ordered):
+                self.option_ids.setdefault(letter, option.id)
+
+    def match_option(self, answer_text: Optional[str]) -> Optional[UUID]:
+        """ID opsi yang cocok dengan teks jawaban atau label hurufnya, atau None."""
+        if not answer_text:
+            return None
+        return self.option_ids.get(normalize_answer(answer_text))
+
+    def grade_text(self, answer_text: Optional[str]) -> Optional[bool]:
+        """Menilai jawaban isian singkat; None jika soal tidak punya kunci jawaban teks."""
+        if self.correct_answer is None:
+            return None
+        return normalize_answer(answer_text) == self.correct_answer
+
+    def grade_option(self, selected_option_id: Optional[UUID]) -> bool:
+        """Menilai jawaban pilihan ganda; soal tanpa opsi benar selalu dinilai salah."""
+        return self.correct_option_id is not None and selected_option_id == self.correct_option_id
+
+
+class GradingKeyCache:
+    """
+    Cache kunci penilaian per soal untuk satu proses upload atau penyimpanan massal.
+    Soal yang belum ada di cache dimuat bersama dalam satu query; ID yang tidak ditemukan
+    juga diingat agar tidak dicari ulang.
+    """
+    def __init__(self):
+        self._keys: Dict[UUID, GradingKey] = {}
+        self._missing: Set[UUID] = set()
+
+    def load(self, db: Session, question_ids: Iterable[UUID]) -> None:
+        new_ids = set(question_ids) - self._keys.keys() - self._missing
+        if not new_ids:
+            return
+        questions = (
+            db.query(Question)
+            .options(selectinload(Question.answer_options))
+            .filter(Question.id.in_(new_ids))
+            .all()
+        )
+        for question in questions:
+            self._keys[question.id] = GradingKey(question)
+        self._missing.update(new_ids - self._keys.keys())
+
+    def get(self, question_id: UUID) -> Optional[GradingKey]:
+        return self._keys.get(question_id)
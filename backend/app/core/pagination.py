@@ -0,0 +1,86 @@
+# backend/app/core/pagination.py
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+
+class InvalidCursorError(ValueError):
+    """Cursor paginasi tidak dapat didekode (rusak atau bukan buatan server)."""
+
+
+class CursorPosition(NamedTuple):
+    """Posisi item terakhir sebuah halaman; `rank` hanya ada untuk hasil pencarian yang diurutkan relevansinya."""
+    created_at: datetime
+    id: UUID
+    rank: Optional[float] = None
+
+
+def encode_cursor(created_at: datetime, id: UUID, rank: Optional[float] = None) -> str:
+    """Cursor keyset opaque berisi posisi (rank, created_at, id) item terakhir pada halaman."""
+    payload: Dict[str, Any] = {"c": created_at.isoformat(), "i": str(id)}
+    if rank is not None:
+        payload["r"] = rank
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> CursorPosition:
+    """Kebalikan `encode_cursor`; melempar InvalidCursorError untuk cursor yang tidak valid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        rank = payload.get("r")
+        return CursorPosition(
+            datetime.fromisoformat(payload["c"]), UUID(payload["i"]), float(rank) if rank is not None else None
+        )
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor.") from e
+
+
+class CountCache:
+    """
+    Cache jumlah total per kombinasi filter dengan masa berlaku `ttl_seconds`, per proses.
+    Dipakai agar COUNT(*) atas seluruh hasil filter tidak dihitung ulang di setiap halaman.
+    Entri kedaluwarsa dibuang saat dibaca/ditulis, dan paling banyak `max_entries` entri disimpan
+    (yang paling lama tidak dipakai dibuang lebih dulu), karena key berisi teks pencarian bebas.
+    """
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_expired(self, now: float) -> None:
+        # get() memindahkan entri ke belakang, jadi urutan dict bukan urutan kedaluwarsa;
+        # semua entri diperiksa (jumlahnya dibatasi max_entries)
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at < now]
+        for key in expired:
+            del self._entries[key]
+
+    def get(self, key: Hashable) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: int) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+            self._entries[key] = (now + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
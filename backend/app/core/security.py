@@ -6,10 +6,12 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 # Anda perlu mengimpor model User dan fungsi CRUD untuk mengambil user
 # Ini adalah placeholder, pastikan path importnya benar setelah Anda membuat model dan CRUD.
 from app.models.user import User # Asumsi model User ada di app.models.user
@@ -57,50 +59,61 @@ from pydantic import BaseModel
 class TokenData(BaseModel):
     username: Optional[str] = None
 
-async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
-    """
-    Dependensi untuk mendapatkan pengguna saat ini berdasarkan token JWT.
-    Mendekode token, mengambil username, dan mengambil data pengguna dari database.
-    """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+_CREDENTIALS_EXCEPTION = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def _get_token_data(token: str) -> TokenData:
+    """Mendekode token JWT dan mengambil username (klaim 'sub')."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: Optional[str] = payload.get("sub") # "sub" adalah standar klaim untuk subject (username)
         if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
+            raise _CREDENTIALS_EXCEPTION
+        return TokenData(username=username)
     except JWTError:
-        raise credentials_exception
-    
-    # Placeholder: Anda perlu mengimplementasikan fungsi untuk mengambil user berdasarkan username dari database.
-    # user = get_user_by_username(db, username=token_data.username) # Ini cara yang ideal menggunakan modul CRUD
-    
-    # Untuk sementara, agar fungsi ini bisa berjalan tanpa CRUD eksplisit:
-    user = db.query(User).filter(User.username == token_data.username).first()
+        raise _CREDENTIALS_EXCEPTION
 
+def _check_user(user: Optional[User]) -> User:
     if user is None:
-        raise credentials_exception
+        raise _CREDENTIALS_EXCEPTION
     if not user.is_active: # Tambahan check jika Anda ingin memastikan user aktif
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
     return user
 
+def get_current_user(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    Dependensi untuk mendapatkan pengguna saat ini berdasarkan token JWT.
+    Mendekode token, mengambil username, dan mengambil data pengguna dari database.
+    Dipakai endpoint sync: sesi `get_db` yang sama dipakai bersama endpoint dalam satu request,
+    sehingga setiap request hanya memegang satu koneksi.
+    """
+    token_data = _get_token_data(token)
+    user = db.query(User).filter(User.username == token_data.username).first()
+    return _check_user(user)
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    Varian `get_current_user` untuk endpoint async yang memakai `get_async_db`: query berjalan
+    tanpa memblokir event loop, dan objek User terikat ke sesi async yang sama dengan endpoint.
+    """
+    token_data = _get_token_data(token)
+    user = await db.scalar(select(User).where(User.username == token_data.username))
+    return _check_user(user)
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """
-    Dependensi untuk mendapatkan pengguna aktif saat ini.
-    Jika Anda tidak memiliki field `is_active` atau logika khusus,
-    Anda bisa langsung menggunakan `get_current_user`.
-    Fungsi ini ditambahkan jika ada kebutuhan untuk membedakan antara
-    mendapatkan user (mungkin non-aktif) dan user yang aktif.
-    Jika `get_current_user` sudah menangani `is_active`, fungsi ini mungkin redundan.
+    Dependensi untuk mendapatkan pengguna aktif saat ini (endpoint sync).
+    Logika is_active sudah ditangani di get_current_user.
     """
-    # Logika is_active sudah ditangani di get_current_user,
-    # jadi fungsi ini bisa saja hanya me-return current_user atau dihapus jika get_current_user sudah cukup.
-    # if not current_user.is_active:
-    #     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def get_current_active_user_async(current_user: User = Depends(get_current_user_async)) -> User:
+    """Dependensi pengguna aktif untuk endpoint async yang memakai `get_async_db`."""
+    return current_user
@@ -1,10 +1,14 @@
 # backend/app/crud/__init__.py
-from .crud_user import user
-from .crud_question import question
+from .crud_user import user, user_async
+from .crud_question import question, question_async
 from .crud_answer_option import answer_option
 from .crud_comment import comment
 from .crud_student_response import student_response
 from .crud_item_analysis_result import item_analysis_result
+from .crud_item_response_counter import item_response_counter
 from .crud_test_session import test_session
 from .crud_meta import meta
-from .crud_roster import roster
\ No newline at end of file
+from .crud_roster import roster
+from .crud_background_job import background_job
+from .crud_irt_person_ability import irt_person_ability
+from .crud_test_reliability_result import test_reliability_result
\ No newline at end of file
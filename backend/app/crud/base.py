@@ -4,6 +4,8 @@ from uuid import UUID
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.db.base import Base
@@ -71,4 +73,67 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if obj:
             db.delete(obj)
             db.commit()
-        return obj # Mengembalikan objek yang dihapus atau None jika tidak ditemukan
\ No newline at end of file
+        return obj # Mengembalikan objek yang dihapus atau None jika tidak ditemukan
+
+class AsyncCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    def __init__(self, model: Type[ModelType]):
+        """
+        Varian async dari `CRUDBase` untuk endpoint `async def` yang memakai `AsyncSession`.
+        Relasi tidak bisa dimuat secara lazy di mode async, jadi relasi yang dibutuhkan
+        response harus dimuat eager (`selectinload`) oleh subclass.
+
+        **Parameter**
+        * `model`: Kelas model SQLAlchemy
+        """
+        self.model = model
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        """Mengambil satu record berdasarkan ID."""
+        return await db.get(self.model, id)
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[ModelType]:
+        """Mengambil beberapa record dengan paginasi."""
+        result = await db.scalars(select(self.model).offset(skip).limit(limit))
+        return list(result.all())
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        """Membuat record baru."""
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data)  # type: ignore
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        """Memperbarui record yang ada."""
+        obj_data = jsonable_encoder(db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+
+        for field in obj_data:
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: UUID) -> Optional[ModelType]:
+        """Menghapus record berdasarkan ID."""
+        obj = await db.get(self.model, id)
+        if obj:
+            await db.delete(obj)
+            await db.commit()
+        return obj
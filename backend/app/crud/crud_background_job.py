@@ -0,0 +1,113 @@
+# backend/app/crud/crud_background_job.py
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.models.background_job import BackgroundJob
+from app.schemas.background_job import BackgroundJobRead
+
+class CRUDBackgroundJob(CRUDBase[BackgroundJob, BackgroundJobRead, BackgroundJobRead]):
+    def enqueue(
+        self, db: Session, *, job_type: str, params: Dict[str, Any], owner_id: Optional[UUID] = None
+    ) -> BackgroundJob:
+        """Menambahkan pekerjaan baru ke antrean dengan status 'queued'."""
+        db_obj = self.model(job_type=job_type, params=params, status="queued", created_by_user_id=owner_id)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def enqueue_many(
+        self, db: Session, *, job_type: str, params_list: List[Dict[str, Any]], owner_id: Optional[UUID] = None
+    ) -> List[BackgroundJob]:
+        """Menambahkan beberapa pekerjaan sekaligus dalam satu transaksi, agar bisa dikerjakan worker secara paralel."""
+        db_objs = [
+            self.model(job_type=job_type, params=params, status="queued", created_by_user_id=owner_id)
+            for params in params_list
+        ]
+        db.add_all(db_objs)
+        db.commit()
+        for db_obj in db_objs:
+            db.refresh(db_obj)
+        return db_objs
+
+    def get_multi_by_owner(
+        self, db: Session, *, owner_id: UUID, skip: int = 0, limit: int = 100
+    ) -> List[BackgroundJob]:
+        """Mengambil daftar pekerjaan milik pengguna tertentu, terbaru lebih dulu."""
+        return (
+            db.query(self.model)
+            .filter(self.model.created_by_user_id == owner_id)
+            .order_by(self.model.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def claim_next(self, db: Session) -> Optional[BackgroundJob]:
+        """
+        Mengambil satu pekerjaan 'queued' tertua dan menandainya 'running'.
+        SKIP LOCKED memastikan beberapa worker tidak mengambil pekerjaan yang sama.
+        """
+        job = (
+            db.query(self.model)
+            .filter(self.model.status == "queued")
+            .order_by(self.model.created_at)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if not job:
+            db.rollback()
+            return None
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def update_progress(
+        self, db: Session, *, job_id: UUID, current: int, total: Optional[int] = None,
+        info: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Memperbarui progres pekerjaan (langsung di-commit agar bisa dipantau selama berjalan)."""
+        values: Dict[str, Any] = {"progress_current": current}
+        if total is not None:
+            values["progress_total"] = total
+        if info is not None:
+            values["progress_info"] = info
+        db.query(self.model).filter(self.model.id == job_id).update(values, synchronize_session=False)
+        db.commit()
+
+    def mark_finished(
+        self, db: Session, *, job_id: UUID,
+        result: Optional[Dict[str, Any]] = None, error_message: Optional[str] = None
+    ) -> None:
+        """Menandai pekerjaan selesai ('completed') atau gagal ('failed' jika ada error_message)."""
+        db.query(self.model).filter(self.model.id == job_id).update(
+            {
+                "status": "failed" if error_message else "completed",
+                "result": result,
+                "error_message": error_message,
+                "finished_at": datetime.now(timezone.utc),
+            },
+            synchronize_session=False
+        )
+        db.commit()
+
+    def requeue_stale(self, db: Session) -> int:
+        """
+        Mengembalikan pekerjaan yang masih 'running' ke antrean.
+        Dipanggil saat worker mulai, untuk pekerjaan yang terputus karena worker sebelumnya berhenti.
+        """
+        count = (
+            db.query(self.model)
+            .filter(self.model.status == "running")
+            .update({"status": "queued", "started_at": None}, synchronize_session=False)
+        )
+        db.commit()
+        return count
+
+background_job = CRUDBackgroundJob(BackgroundJob)
@@ -0,0 +1,40 @@
+# backend/app/crud/crud_irt_person_ability.py
+from typing import Any, Dict, List
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.irt_person_ability import IRTPersonAbility
+
+class CRUDIRTPersonAbility:
+    model = IRTPersonAbility
+
+    def replace_for_session(
+        self, db: Session, *, test_session_identifier: str, abilities_in: List[Dict[str, Any]],
+        batch_size: int = 5000
+    ) -> None:
+        """
+        Mengganti seluruh estimasi kemampuan sebuah sesi tes dengan hasil kalibrasi terbaru
+        (hapus lalu INSERT multi-baris per batch) dalam satu transaksi.
+        """
+        db.query(self.model).filter(
+            self.model.test_session_identifier == test_session_identifier
+        ).delete(synchronize_session=False)
+        for start in range(0, len(abilities_in), batch_size):
+            db.execute(insert(self.model).values(abilities_in[start:start + batch_size]))
+        db.commit()
+
+    def get_multi_by_session(
+        self, db: Session, *, test_session_identifier: str, skip: int = 0, limit: int = 1000
+    ) -> List[IRTPersonAbility]:
+        """Mengambil estimasi kemampuan siswa pada sebuah sesi tes, diurutkan dari theta tertinggi."""
+        return (
+            db.query(self.model)
+            .filter(self.model.test_session_identifier == test_session_identifier)
+            .order_by(self.model.theta.desc().nulls_last(), self.model.student_identifier)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+irt_person_ability = CRUDIRTPersonAbility()
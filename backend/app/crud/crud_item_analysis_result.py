@@ -1,14 +1,21 @@
 # backend/app/crud/crud_item_analysis_result.py
-from typing import Optional
+from typing import Optional, List, Sequence
 from uuid import UUID
 
-from sqlalchemy.orm import Session
-from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Query, Session
 
 from app.crud.base import CRUDBase
 from app.models.item_analysis_result import ItemAnalysisResult
 from app.schemas.item_analysis_result import ItemAnalysisResultBase # Digunakan untuk create/update
 
+# Kolom hasil analisis klasik (P, D, interval kepercayaan) yang ditulis ulang setiap kali sesi dianalisis
+CTT_RESULT_FIELDS = (
+    "difficulty_index_p_value", "discrimination_index", "responses_analyzed_count",
+    "p_value_ci_lower", "p_value_ci_upper", "discrimination_ci_lower", "discrimination_ci_upper", "ci_replicates",
+)
+
 class CRUDItemAnalysisResult(CRUDBase[ItemAnalysisResult, ItemAnalysisResultBase, ItemAnalysisResultBase]):
     def get_by_question_and_session(
         self, db: Session, *, question_id: UUID, test_session_identifier: Optional[str] = None
@@ -41,4 +48,39 @@ class CRUDItemAnalysisResult(CRUDBase[ItemAnalysisResult, ItemAnalysisResultBase
         else:
             return self.create(db, obj_in=obj_in)
 
+    def upsert_many(
+        self, db: Session, *, objs_in: List[ItemAnalysisResultBase],
+        fields: Sequence[str] = CTT_RESULT_FIELDS
+    ) -> List[ItemAnalysisResult]:
+        """
+        Menyimpan banyak hasil analisis sekaligus dengan satu INSERT ... ON CONFLICT DO UPDATE
+        dalam satu transaksi. Hanya kolom pada `fields` yang ditulis, sehingga analisis klasik
+        dan kalibrasi IRT tidak saling menimpa. Digunakan oleh analisis per sesi ujian.
+        """
+        if not objs_in:
+            return []
+        values = [
+            obj_in.model_dump(include={"question_id", "test_session_identifier", *fields})
+            for obj_in in objs_in
+        ]
+        stmt = insert(self.model).values(values)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_question_session_analysis",
+            set_={
+                **{field: stmt.excluded[field] for field in fields},
+                "last_analyzed_at": func.now(),
+            }
+        ).returning(self.model)
+        results = db.scalars(stmt, execution_options={"populate_existing": True}).all()
+        db.commit()
+        return results
+
+    def get_export_query(self, db: Session, *, test_session_identifier: str) -> Query:
+        """Query seluruh kolom hasil analisis soal satu sesi tes untuk ekspor."""
+        return (
+            db.query(*self.model.__table__.columns)
+            .filter(self.model.test_session_identifier == test_session_identifier)
+            .order_by(self.model.question_id)
+        )
+
 item_analysis_result = CRUDItemAnalysisResult(ItemAnalysisResult)
\ No newline at end of file
@@ -0,0 +1,142 @@
+# backend/app/crud/crud_item_response_counter.py
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.item_response_counter import ItemResponseCounter
+
+CounterKey = Tuple[UUID, str]
+
+# Menghitung ulang penghitung langsung dari student_responses (sama dengan migrasi pengisian awalnya)
+_REBUILD_SQL = """
+    WITH per_option AS (
+        SELECT question_id,
+               COALESCE(test_session_identifier, '') AS test_session_identifier,
+               selected_option_id,
+               COUNT(*) AS selection_count,
+               COUNT(*) FILTER (WHERE is_response_correct IS TRUE) AS correct_count
+        FROM student_responses
+        WHERE CAST(:session_key AS TEXT) IS NULL OR COALESCE(test_session_identifier, '') = :session_key
+        GROUP BY 1, 2, 3
+    )
+    INSERT INTO item_response_counters
+        (id, question_id, test_session_identifier, responses_count, correct_count, option_counts)
+    SELECT gen_random_uuid(),
+           question_id,
+           test_session_identifier,
+           SUM(selection_count),
+           SUM(correct_count),
+           COALESCE(
+               jsonb_object_agg(selected_option_id::text, selection_count)
+                   FILTER (WHERE selected_option_id IS NOT NULL),
+               '{}'::jsonb
+           )
+    FROM per_option
+    GROUP BY question_id, test_session_identifier
+"""
+
+def _session_key(test_session_identifier: Optional[str]) -> str:
+    """Respons tanpa sesi tes dicatat pada penghitung dengan identifier string kosong."""
+    return test_session_identifier or ""
+
+class CRUDItemResponseCounter:
+    model = ItemResponseCounter
+
+    def apply_responses(
+        self, db: Session, *, responses: Iterable[Dict[str, Any]], sign: int = 1
+    ) -> None:
+        """
+        Menambahkan (sign=1) atau mengurangkan (sign=-1) sekumpulan respons ke penghitung.
+        Setiap respons berupa dict dengan key question_id, test_session_identifier,
+        selected_option_id dan is_response_correct.
+
+        Tidak melakukan commit: dipanggil di dalam transaksi yang sama dengan
+        penyimpanan respons agar penghitung selalu konsisten dengan tabel student_responses.
+        """
+        deltas: Dict[CounterKey, Dict[str, Any]] = {}
+        for res in responses:
+            key = (res["question_id"], _session_key(res.get("test_session_identifier")))
+            delta = deltas.setdefault(key, {"responses": 0, "correct": 0, "options": Counter()})
+            delta["responses"] += sign
+            if res.get("is_response_correct") is True:
+                delta["correct"] += sign
+            if res.get("selected_option_id") is not None:
+                delta["options"][str(res["selected_option_id"])] += sign
+
+        if not deltas:
+            return
+
+        # Pastikan baris penghitung ada, lalu kunci barisnya agar pembaruan bersamaan tidak saling menimpa
+        db.execute(
+            insert(self.model)
+            .values([
+                {"question_id": q_id, "test_session_identifier": session_key}
+                for q_id, session_key in sorted(deltas, key=lambda k: (str(k[0]), k[1]))
+            ])
+            .on_conflict_do_nothing(constraint="uq_question_session_counter")
+        )
+        counters: List[ItemResponseCounter] = (
+            db.query(self.model)
+            .filter(tuple_(self.model.question_id, self.model.test_session_identifier).in_(list(deltas)))
+            .order_by(self.model.question_id, self.model.test_session_identifier)
+            .with_for_update()
+            .all()
+        )
+        for counter in counters:
+            delta = deltas[(counter.question_id, counter.test_session_identifier)]
+            counter.responses_count += delta["responses"]
+            counter.correct_count += delta["correct"]
+            option_counts = dict(counter.option_counts or {})
+            for option_id, change in delta["options"].items():
+                option_counts[option_id] = option_counts.get(option_id, 0) + change
+            counter.option_counts = {k: v for k, v in option_counts.items() if v > 0}
+        db.flush()
+
+    def rebuild(self, db: Session, *, test_session_identifier: Optional[str] = None) -> int:
+        """
+        Menghitung ulang penghitung dari tabel student_responses, untuk semua sesi atau hanya
+        `test_session_identifier` ('' untuk respons tanpa sesi). Dipakai jika penghitung menyimpang
+        karena respons diubah di luar `insert_bulk` (mis. penilaian esai atau penghapusan langsung).
+
+        Tabel penghitung dikunci (SHARE ROW EXCLUSIVE) selama rebuild, sehingga penyimpanan respons
+        yang berjalan bersamaan menunggu dan menerapkan selisihnya setelah rebuild selesai.
+        Tidak melakukan commit. Mengembalikan jumlah baris penghitung yang dibuat.
+        """
+        session_key = None if test_session_identifier is None else _session_key(test_session_identifier)
+        db.execute(text(f"LOCK TABLE {self.model.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+        delete_query = db.query(self.model)
+        if session_key is not None:
+            delete_query = delete_query.filter(self.model.test_session_identifier == session_key)
+        delete_query.delete(synchronize_session=False)
+        result = db.execute(text(_REBUILD_SQL), {"session_key": session_key})
+        return result.rowcount
+
+    def get_aggregates(
+        self, db: Session, *, question_id: UUID, test_session_identifier: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Membaca jumlah respons, jumlah jawaban benar dan jumlah pemilih per opsi dari penghitung.
+        Tanpa `test_session_identifier`, penghitung dari semua sesi untuk soal tersebut dijumlahkan.
+        Mengembalikan None jika belum ada penghitung untuk soal/sesi tersebut.
+        """
+        query = db.query(self.model).filter(self.model.question_id == question_id)
+        if test_session_identifier:
+            query = query.filter(self.model.test_session_identifier == test_session_identifier)
+        counters = query.all()
+        if not counters:
+            return None
+
+        option_counts: Counter = Counter()
+        for counter in counters:
+            option_counts.update({UUID(k): v for k, v in (counter.option_counts or {}).items()})
+        return {
+            "responses_count": sum(c.responses_count for c in counters),
+            "graded_correct_count": sum(c.correct_count for c in counters),
+            "option_counts": dict(option_counts),
+        }
+
+item_response_counter = CRUDItemResponseCounter()
@@ -1,17 +1,34 @@
 # backend/app/crud/crud_question.py
-from typing import List, Optional, Any, Union, Dict
+import json
+from typing import Iterable, List, Literal, Optional, Any, Union, Dict, Tuple
 from uuid import UUID
 
+from sqlalchemy import cast, func, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, REGCONFIG
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 from fastapi.encoders import jsonable_encoder
 
-from app.crud.base import CRUDBase
-from app.models.question import Question
+from app.crud.base import AsyncCRUDBase, CRUDBase
+from app.core.config import settings
+from app.core.content_hash import question_content_hash
+from app.core.pagination import CountCache, InvalidCursorError, decode_cursor, encode_cursor
+from app.models.question import QUESTION_SEARCH_CONFIG, Question
 from app.models.answer_option import AnswerOption
 from app.schemas.question import QuestionCreate, QuestionUpdate
 # AnswerOptionCreate tidak lagi dipakai di sini, bisa dihapus jika tidak ada referensi lain
 # from app.schemas.answer_option import AnswerOptionCreate
 
+TotalMode = Literal["exact", "cached", "estimated"]
+
+# Cache jumlah total daftar soal per kombinasi filter; dikosongkan setelah commit setiap kali soal dibuat,
+# diubah atau dihapus. Cache ini per proses: perubahan dari proses lain (mis. import soal oleh worker)
+# baru terlihat setelah entri kedaluwarsa, paling lama QUESTION_COUNT_CACHE_SECONDS.
+question_count_cache = CountCache(
+    settings.QUESTION_COUNT_CACHE_SECONDS, max_entries=settings.QUESTION_COUNT_CACHE_MAX_ENTRIES
+)
+
 class CRUDQuestion(CRUDBase[Question, QuestionCreate, QuestionUpdate]):
     def create_with_owner(
         self, db: Session, *, obj_in: QuestionCreate, owner_id: UUID
@@ -21,7 +38,9 @@ class CRUDQuestion(CRUDBase[Question, QuestionCreate, QuestionUpdate]):
         Juga menangani pembuatan answer_options jika ada.
         """
         obj_in_data = jsonable_encoder(obj_in, exclude={"answer_options"})
-        db_obj = self.model(**obj_in_data, created_by_user_id=owner_id)
+        db_obj = self.model(
+            **obj_in_data, content_hash=question_content_hash(obj_in.content), created_by_user_id=owner_id
+        )
         
         if obj_in.answer_options:
             for option_in in obj_in.answer_options:
@@ -31,8 +50,75 @@ class CRUDQuestion(CRUDBase[Question, QuestionCreate, QuestionUpdate]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        question_count_cache.clear()
         return db_obj
 
+    def create_many_with_owner(
+        self, db: Session, *, objs_in: List[QuestionCreate], owner_id: UUID
+    ) -> Tuple[List[Optional[UUID]], Dict[int, str]]:
+        """
+        Membuat banyak soal sekaligus dalam satu SAVEPOINT: soal disisipkan dengan INSERT multi-baris
+        ... RETURNING id, lalu semua answer_options dengan satu INSERT multi-baris.
+        Jika batch gagal, setiap soal diulang dalam SAVEPOINT masing-masing agar hanya baris yang
+        bermasalah yang gagal. Tidak melakukan commit; batas transaksi ditentukan pemanggil.
+
+        Mengembalikan ID soal yang dibuat sesuai urutan `objs_in` (None untuk yang gagal)
+        dan pesan error per indeks. Pemanggil mengosongkan `question_count_cache` setelah commit.
+        """
+        try:
+            with db.begin_nested():
+                return self._insert_many(db, objs_in=objs_in, owner_id=owner_id), {}
+        except SQLAlchemyError:
+            pass
+
+        created_ids: List[Optional[UUID]] = []
+        errors: Dict[int, str] = {}
+        for index, obj_in in enumerate(objs_in):
+            try:
+                with db.begin_nested():
+                    created_ids.extend(self._insert_many(db, objs_in=[obj_in], owner_id=owner_id))
+            except SQLAlchemyError as e:
+                created_ids.append(None)
+                errors[index] = str(getattr(e, "orig", None) or e).strip()
+        return created_ids, errors
+
+    def _insert_many(self, db: Session, *, objs_in: List[QuestionCreate], owner_id: UUID) -> List[UUID]:
+        question_rows = [
+            {
+                **obj_in.model_dump(exclude={"answer_options"}),
+                "content_hash": question_content_hash(obj_in.content),
+                "created_by_user_id": owner_id,
+            }
+            for obj_in in objs_in
+        ]
+        question_ids = db.scalars(
+            insert(self.model).returning(self.model.id, sort_by_parameter_order=True), question_rows
+        ).all()
+
+        option_rows = [
+            {**option_in.model_dump(), "question_id": question_id}
+            for obj_in, question_id in zip(objs_in, question_ids)
+            for option_in in obj_in.answer_options or []
+        ]
+        if option_rows:
+            db.execute(insert(AnswerOption), option_rows)
+        return list(question_ids)
+
+    def get_contents_by_hashes(
+        self, db: Session, *, content_hashes: Iterable[str], owner_id: Optional[UUID] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Mengambil pasangan (content_hash, content) soal yang hash-nya ada di `content_hashes`,
+        opsional hanya milik `owner_id`. Memakai indeks (content_hash, created_by_user_id).
+        """
+        content_hashes = list(content_hashes)
+        if not content_hashes:
+            return []
+        query = db.query(self.model.content_hash, self.model.content).filter(self.model.content_hash.in_(content_hashes))
+        if owner_id is not None:
+            query = query.filter(self.model.created_by_user_id == owner_id)
+        return [(row.content_hash, row.content) for row in query.all()]
+
     def get(self, db: Session, id: UUID) -> Optional[Question]:
         """Mengambil satu soal berdasarkan ID dengan eager loading untuk relasi."""
         return (
@@ -45,46 +131,116 @@ class CRUDQuestion(CRUDBase[Question, QuestionCreate, QuestionUpdate]):
             .first()
         )
 
-    # --- METODE INI DIMODIFIKASI ---
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100,
         subject: Optional[str] = None,
         topic: Optional[str] = None,
-        question_type: Optional[str] = None
-    ) -> Dict[str, Any]: # Mengembalikan Dict, bukan List
-        """Mengambil beberapa soal dengan paginasi dan filter, mengembalikan items dan total."""
-        query = db.query(self.model).options(
-            selectinload(self.model.creator),
-            selectinload(self.model.answer_options)
-        )
+        question_type: Optional[str] = None,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = "cached"
+    ) -> Dict[str, Any]:
+        """
+        Mengambil beberapa soal dengan paginasi dan filter, mengembalikan items, total dan next_cursor.
+        `search` dicocokkan dengan kolom search_vector (indeks GIN) memakai sintaks websearch
+        (kata, "frasa", -kecuali, OR) dan hasilnya diurutkan berdasarkan relevansi (ts_rank_cd).
+        """
+        filters = []
+        rank = None
+        if search:
+            ts_query = func.websearch_to_tsquery(cast(QUESTION_SEARCH_CONFIG, REGCONFIG), search)
+            filters.append(self.model.search_vector.op("@@")(ts_query))
+            # float4 dari ts_rank_cd di-cast ke float8 agar nilai di cursor sama persis saat dibandingkan
+            rank = cast(func.ts_rank_cd(self.model.search_vector, ts_query), DOUBLE_PRECISION)
         if subject:
-            query = query.filter(self.model.subject.ilike(f"%{subject}%"))
+            filters.append(self.model.subject.ilike(f"%{subject}%"))
         if topic:
-            query = query.filter(self.model.topic.ilike(f"%{topic}%"))
+            filters.append(self.model.topic.ilike(f"%{topic}%"))
         if question_type:
-            query = query.filter(self.model.question_type == question_type)
-        
-        total = query.count() # Hitung total item yang cocok dengan filter
-        items = query.order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
-        
-        return {"items": items, "total": total} # Kembalikan dalam format yang baru
+            filters.append(self.model.question_type == question_type)
+        return self._get_page(
+            db, filters=filters, count_key=("all", subject, topic, question_type, search),
+            skip=skip, limit=limit, cursor=cursor, total_mode=total_mode, rank=rank
+        )
 
-    # get_multi_by_owner juga bisa dimodifikasi dengan cara yang sama jika diperlukan
     def get_multi_by_owner(
-        self, db: Session, *, owner_id: UUID, skip: int = 0, limit: int = 100
+        self, db: Session, *, owner_id: UUID, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, total_mode: TotalMode = "cached"
     ) -> Dict[str, Any]:
         """Mengambil beberapa soal milik owner tertentu dengan paginasi."""
+        return self._get_page(
+            db, filters=[self.model.created_by_user_id == owner_id], count_key=("owner", owner_id),
+            skip=skip, limit=limit, cursor=cursor, total_mode=total_mode
+        )
+
+    def _get_page(
+        self, db: Session, *, filters: List[Any], count_key: Tuple[Any, ...],
+        skip: int, limit: int, cursor: Optional[str], total_mode: TotalMode, rank: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Satu halaman soal terurut (created_at, id) menurun, didahului `rank` menurun untuk hasil pencarian.
+        Dengan `cursor` dipakai paginasi keyset: hanya soal setelah posisi cursor yang dibaca melalui
+        indeks (created_at, id), sehingga halaman dalam sama murahnya dengan halaman pertama.
+        Tanpa cursor, `skip` (OFFSET) tetap didukung. `next_cursor` selalu diisi jika masih ada halaman berikutnya.
+        """
+        sort_keys = [self.model.created_at, self.model.id] if rank is None else [rank, self.model.created_at, self.model.id]
         query = (
-            db.query(self.model)
-            .filter(self.model.created_by_user_id == owner_id)
+            db.query(self.model, *([] if rank is None else [rank.label("rank")]))
             .options(
-                selectinload(self.model.creator), 
+                selectinload(self.model.creator),
                 selectinload(self.model.answer_options)
             )
+            .filter(*filters)
         )
-        total = query.count()
-        items = query.order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
-        return {"items": items, "total": total}
+        if cursor is not None:
+            position = decode_cursor(cursor)
+            values = [position.created_at, position.id]
+            if rank is not None:
+                if position.rank is None:
+                    raise InvalidCursorError("Invalid pagination cursor for a search query.")
+                values.insert(0, position.rank)
+            query = query.filter(tuple_(*sort_keys) < tuple_(*values))
+        query = query.order_by(*[key.desc() for key in sort_keys])
+        if cursor is None and skip:
+            query = query.offset(skip)
+        # Satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+        rows = query.limit(limit + 1).all()
+        page = rows[:limit]
+        items = page if rank is None else [row[0] for row in page]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id, rank=None if rank is None else page[-1].rank)
+
+        total, total_is_estimate = self._count(db, filters=filters, count_key=count_key, total_mode=total_mode)
+        return {"items": items, "total": total, "total_is_estimate": total_is_estimate, "next_cursor": next_cursor}
+
+    def _count(
+        self, db: Session, *, filters: List[Any], count_key: Tuple[Any, ...], total_mode: TotalMode
+    ) -> Tuple[int, bool]:
+        """
+        Jumlah total soal yang cocok dengan filter, beserta penanda apakah nilainya perkiraan.
+        'cached': COUNT(*) disimpan per kombinasi filter selama QUESTION_COUNT_CACHE_SECONDS
+        (bisa tertinggal selama itu setelah soal diimpor oleh worker, karena cache-nya per proses),
+        'exact': selalu COUNT(*), 'estimated': perkiraan planner PostgreSQL tanpa memindai tabel.
+        """
+        if total_mode == "estimated":
+            return self._estimate_count(db, filters=filters), True
+        if total_mode == "cached":
+            total = question_count_cache.get(count_key)
+            if total is not None:
+                return total, False
+        total = db.query(func.count(self.model.id)).filter(*filters).scalar()
+        question_count_cache.set(count_key, total)
+        return total, False
+
+    def _estimate_count(self, db: Session, *, filters: List[Any]) -> int:
+        """Perkiraan jumlah baris dari rencana query (EXPLAIN), biayanya konstan berapa pun ukuran tabel."""
+        compiled = select(self.model.id).where(*filters).compile(dialect=db.get_bind().dialect)
+        params = {key: str(value) if isinstance(value, UUID) else value for key, value in compiled.params.items()}
+        plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
 
     def update(
         self,
@@ -106,6 +262,8 @@ class CRUDQuestion(CRUDBase[Question, QuestionCreate, QuestionUpdate]):
         for field in obj_data:
             if field in update_data and field != "answer_options":
                 setattr(db_obj, field, update_data[field])
+        if update_data.get("content"):
+            db_obj.content_hash = question_content_hash(update_data["content"])
 
         if "answer_options" in update_data and update_data["answer_options"] is not None:
             # Hapus semua answer_options lama
@@ -123,6 +281,64 @@ class CRUDQuestion(CRUDBase[Question, QuestionCreate, QuestionUpdate]):
         db.commit()
         db.refresh(db_obj)
         db.refresh(db_obj, attribute_names=['answer_options', 'creator'])
+        question_count_cache.clear()
         return db_obj
 
+    def remove(self, db: Session, *, id: UUID) -> Optional[Question]:
+        obj = super().remove(db, id=id)
+        question_count_cache.clear()
+        return obj
+
 question = CRUDQuestion(Question)
+
+class CRUDQuestionAsync(AsyncCRUDBase[Question, QuestionCreate, QuestionUpdate]):
+    """Varian async CRUDQuestion untuk endpoint baca dan ubah soal."""
+    async def get(self, db: AsyncSession, id: UUID) -> Optional[Question]:
+        """Mengambil satu soal berdasarkan ID dengan eager loading untuk relasi."""
+        return await db.scalar(
+            select(self.model)
+            .options(
+                selectinload(self.model.creator),
+                selectinload(self.model.answer_options)
+            )
+            .where(self.model.id == id)
+        )
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Question,
+        obj_in: Union[QuestionUpdate, Dict[str, Any]]
+    ) -> Question:
+        """
+        Memperbarui soal, termasuk mengganti seluruh answer_options jika dikirim.
+        `db_obj` harus dimuat dengan `get` agar answer_options lama sudah ada di sesi;
+        opsi lama dihapus oleh cascade delete-orphan saat koleksinya diganti.
+        """
+        obj_data = jsonable_encoder(db_obj)
+
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+
+        for field in obj_data:
+            if field in update_data and field != "answer_options":
+                setattr(db_obj, field, update_data[field])
+        if update_data.get("content"):
+            db_obj.content_hash = question_content_hash(update_data["content"])
+
+        if "answer_options" in update_data and update_data["answer_options"] is not None:
+            db_obj.answer_options = [
+                AnswerOption(**(option_in_data if isinstance(option_in_data, dict) else option_in_data.model_dump()))
+                for option_in_data in update_data["answer_options"]
+            ]
+
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj, attribute_names=['updated_at', 'answer_options', 'creator'])
+        question_count_cache.clear()
+        return db_obj
+
+question_async = CRUDQuestionAsync(Question)
@@ -1,68 +1,300 @@
 # backend/app/crud/crud_student_response.py
-from typing import List, Optional, Dict
+import io
+import uuid
+from typing import Any, List, Optional, Dict, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session, selectinload
-
-from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Boolean, Float, String, and_, case, func, literal, select, text, update
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Query, Session, selectinload
 
+from app.core.grading import GradingKeyCache
 from app.crud.base import CRUDBase
 from app.models.student_response import StudentResponse
 from app.models.question import Question # Impor Question untuk mendapatkan kunci jawaban
+from app.models.answer_option import AnswerOption
+from app.crud.crud_item_response_counter import item_response_counter
 from app.schemas.student_response import StudentResponseCreate
 
+_COPY_COLUMNS = (
+    "id", "question_id", "student_identifier", "test_session_identifier",
+    "response_text", "selected_option_id", "is_response_correct",
+)
+_COPY_CHUNK_ROWS = 50_000
+_STAGING_TABLE = "student_responses_staging"
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def _copy_value(value: Any) -> str:
+    """Format satu nilai untuk COPY format teks: NULL sebagai \\N, boolean t/f, escape backslash dan pemisah."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(_COPY_ESCAPES)
+
 class CRUDStudentResponse(CRUDBase[StudentResponse, StudentResponseCreate, StudentResponseCreate]):
     
-    def create_bulk(self, db: Session, *, responses_in: List[StudentResponseCreate]) -> List[StudentResponse]:
+    def insert_bulk(
+        self, db: Session, *, responses_in: List[StudentResponseCreate], on_conflict: str = "update",
+        grading_keys: Optional[GradingKeyCache] = None
+    ) -> Dict[str, int]:
         """
-        Membuat beberapa student response sekaligus dengan auto-grading untuk pilihan ganda.
+        Menyimpan banyak student response sekaligus dengan auto-grading pilihan ganda di memori.
+
+        Respons diidentifikasi dengan kunci alami (question_id, student_identifier, test_session_identifier).
+        Jika kunci sudah ada: `on_conflict="update"` memperbarui jawaban yang berbeda di tempat
+        (jawaban yang sama persis tidak disentuh; `is_response_correct` NULL, mis. esai yang belum dinilai,
+        tidak menimpa nilai yang sudah ada), `on_conflict="ignore"` mempertahankan jawaban lama.
+        Jika kunci muncul lebih dari sekali dalam `responses_in`, hanya baris terakhir yang disimpan.
+
+        Baris dialirkan ke tabel staging sementara dengan `COPY ... FROM STDIN`, lalu dipindahkan
+        dengan satu `INSERT ... ON CONFLICT`. Ingestion hanya didukung di PostgreSQL (model memakai
+        JSONB dan UUID PostgreSQL, penghitung item memakai `INSERT ... ON CONFLICT` PostgreSQL).
+        Penghitung statistik item disesuaikan dalam transaksi yang sama (jawaban lama dikurangkan,
+        jawaban baru ditambahkan). Tidak melakukan commit.
+
+        Kunci jawaban diambil dari `grading_keys`; kirim cache yang sama untuk beberapa batch agar
+        soal tidak dimuat ulang.
+
+        Mengembalikan jumlah respons `inserted`, `updated` dan `unchanged` (respons untuk soal yang
+        tidak ada dilewati dan tidak dihitung).
         """
-        # 1. Ambil semua ID soal yang unik dari data input
-        question_ids = {res.question_id for res in responses_in}
-        
-        # 2. Ambil semua soal tersebut dari DB dalam satu query untuk efisiensi
-        questions_map: Dict[UUID, Question] = {
-            q.id: q for q in db.query(Question).filter(Question.id.in_(question_ids)).all()
-        }
+        grading_keys = grading_keys or GradingKeyCache()
+        grading_keys.load(db, {res.question_id for res in responses_in})
 
-        # 3. Buat peta kunci jawaban untuk akses cepat
-        correct_options_map: Dict[UUID, Optional[UUID]] = {}
-        for q_id, question in questions_map.items():
-            correct_option_id = None
-            if question.question_type == 'multiple_choice':
-                for option in question.answer_options:
-                    if option.is_correct:
-                        correct_option_id = option.id
-                        break
-            correct_options_map[q_id] = correct_option_id
-
-        # 4. Proses setiap respons
-        db_responses = []
+        rows_by_key: Dict[Tuple[UUID, str, str], Dict[str, Any]] = {}
+        accepted_count = 0 # Termasuk baris yang tergantikan baris berikutnya dengan kunci sama (dihitung unchanged)
         for response_in in responses_in:
-            question = questions_map.get(response_in.question_id)
-            if not question:
+            grading_key = grading_keys.get(response_in.question_id)
+            if not grading_key:
                 continue # Lewati jika soal tidak ditemukan
+            accepted_count += 1
 
-            response_data = response_in.model_dump()
-            
             # --- Logika Auto-Grading ---
             is_correct = response_in.is_response_correct # Gunakan nilai dari input jika ada (untuk esai)
-            if question.question_type == 'multiple_choice' and is_correct is None:
-                # Jika tipe MC dan is_correct tidak diisi, tentukan secara otomatis
-                correct_id = correct_options_map.get(question.id)
-                is_correct = (response_in.selected_option_id == correct_id) if correct_id else False
+            if grading_key.question_type == 'multiple_choice' and is_correct is None:
+                is_correct = grading_key.grade_option(response_in.selected_option_id)
             # ---------------------------
 
-            # Update data dengan is_correct yang sudah ditentukan
-            response_data['is_response_correct'] = is_correct
-
-            db_obj = self.model(**response_data)
-            db.add(db_obj)
-            db_responses.append(db_obj)
-            
-        db.commit()
-        for db_obj in db_responses: # Refresh setiap objek setelah commit
-            db.refresh(db_obj)
-        return db_responses
+            natural_key = (response_in.question_id, response_in.student_identifier, response_in.test_session_identifier or "")
+            rows_by_key[natural_key] = {
+                "id": uuid.uuid4(),
+                "question_id": response_in.question_id,
+                "student_identifier": response_in.student_identifier,
+                "test_session_identifier": response_in.test_session_identifier,
+                "response_text": response_in.response_text,
+                "selected_option_id": response_in.selected_option_id,
+                "is_response_correct": is_correct,
+            }
+        rows = list(rows_by_key.values())
+        if not rows:
+            return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+        written = self._upsert_rows_copy(db, rows, on_conflict=on_conflict)
+
+        # Perbarui penghitung statistik item dalam transaksi yang sama dengan respons baru
+        item_response_counter.apply_responses(db, responses=written)
+        replaced = [
+            {
+                "question_id": row["question_id"],
+                "test_session_identifier": row["test_session_identifier"],
+                "selected_option_id": row["old_selected_option_id"],
+                "is_response_correct": row["old_is_response_correct"],
+            }
+            for row in written if not row["inserted"]
+        ]
+        if replaced:
+            item_response_counter.apply_responses(db, responses=replaced, sign=-1)
+
+        inserted = sum(1 for row in written if row["inserted"])
+        updated = len(replaced)
+        return {"inserted": inserted, "updated": updated, "unchanged": accepted_count - inserted - updated}
+
+    def _upsert_rows_copy(self, db: Session, rows: List[Dict[str, Any]], *, on_conflict: str) -> List[Dict[str, Any]]:
+        """
+        COPY ke tabel staging sementara (format teks, per potongan berukuran tetap),
+        lalu satu INSERT ... SELECT ... ON CONFLICT. CTE `existing` dan INSERT melihat snapshot yang
+        sama, sehingga nilai lama baris yang diperbarui bisa dikembalikan bersama hasilnya.
+        """
+        table = self.model.__tablename__
+        columns = ", ".join(_COPY_COLUMNS)
+        db.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {_STAGING_TABLE} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        ))
+        db.execute(text(f"TRUNCATE {_STAGING_TABLE}"))
+        with db.connection().connection.cursor() as cursor:
+            for start in range(0, len(rows), _COPY_CHUNK_ROWS):
+                buffer = io.StringIO()
+                buffer.writelines(
+                    "\t".join(_copy_value(row[column]) for column in _COPY_COLUMNS) + "\n"
+                    for row in rows[start:start + _COPY_CHUNK_ROWS]
+                )
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {_STAGING_TABLE} ({columns}) FROM STDIN", buffer)
+
+        if on_conflict == "ignore":
+            conflict_action = "DO NOTHING"
+        else:
+            # Upload tanpa nilai (NULL, mis. esai) tidak menghapus nilai yang sudah diberikan sebelumnya
+            is_correct = f"COALESCE(EXCLUDED.is_response_correct, {table}.is_response_correct)"
+            conflict_action = f"""DO UPDATE SET
+                    response_text = EXCLUDED.response_text,
+                    selected_option_id = EXCLUDED.selected_option_id,
+                    is_response_correct = {is_correct},
+                    submitted_at = now()
+                WHERE ({table}.response_text, {table}.selected_option_id, {table}.is_response_correct)
+                    IS DISTINCT FROM (EXCLUDED.response_text, EXCLUDED.selected_option_id, {is_correct})"""
+        result = db.execute(text(f"""
+            WITH existing AS (
+                SELECT r.id, r.selected_option_id, r.is_response_correct
+                FROM {table} r
+                JOIN {_STAGING_TABLE} s
+                  ON r.question_id = s.question_id
+                 AND r.student_identifier = s.student_identifier
+                 AND COALESCE(r.test_session_identifier, '') = COALESCE(s.test_session_identifier, '')
+            ), written AS (
+                INSERT INTO {table} ({columns})
+                SELECT {columns} FROM {_STAGING_TABLE}
+                ON CONFLICT (question_id, student_identifier, (COALESCE(test_session_identifier, '')))
+                {conflict_action}
+                RETURNING id, question_id, test_session_identifier, selected_option_id, is_response_correct
+            )
+            SELECT w.question_id, w.test_session_identifier, w.selected_option_id, w.is_response_correct,
+                   e.id IS NULL AS inserted,
+                   e.selected_option_id AS old_selected_option_id,
+                   e.is_response_correct AS old_is_response_correct
+            FROM written w
+            LEFT JOIN existing e ON e.id = w.id
+        """).columns(
+            question_id=PG_UUID(as_uuid=True),
+            test_session_identifier=String,
+            selected_option_id=PG_UUID(as_uuid=True),
+            is_response_correct=Boolean,
+            inserted=Boolean,
+            old_selected_option_id=PG_UUID(as_uuid=True),
+            old_is_response_correct=Boolean,
+        ))
+        return [dict(row) for row in result.mappings()]
+
+    def get_total_scores_by_session(
+        self, db: Session, *, test_session_identifier: str
+    ) -> Dict[str, float]:
+        """
+        Menghitung skor total (jumlah jawaban benar) setiap siswa dalam satu sesi tes
+        dengan satu query agregat, dikelompokkan per student_identifier.
+        """
+        rows = (
+            db.query(
+                self.model.student_identifier,
+                func.count().filter(self.model.is_response_correct.is_(True)).label("total_score")
+            )
+            .filter(self.model.test_session_identifier == test_session_identifier)
+            .group_by(self.model.student_identifier)
+            .all()
+        )
+        return {row.student_identifier: float(row.total_score) for row in rows}
+
+    def has_responses(self, db: Session, *, test_session_identifier: str) -> bool:
+        """True jika ada minimal satu respons dengan test_session_identifier ini (query EXISTS)."""
+        return db.query(
+            select(self.model.id).where(self.model.test_session_identifier == test_session_identifier).exists()
+        ).scalar()
+
+    def get_export_query(self, db: Session, *, test_session_identifier: str) -> Query:
+        """Query kolom respons satu sesi tes untuk ekspor (dibaca bertahap dengan `yield_per` oleh pemanggil)."""
+        response = self.model
+        return (
+            db.query(
+                response.id, response.question_id, response.student_identifier, response.test_session_identifier,
+                response.response_text, response.selected_option_id, response.is_response_correct, response.submitted_at,
+            )
+            .filter(response.test_session_identifier == test_session_identifier)
+            .order_by(response.student_identifier, response.question_id)
+        )
+
+    def get_scores_export_query(self, db: Session, *, test_session_identifier: str) -> Query:
+        """Query skor total per siswa dalam satu sesi tes untuk ekspor, satu baris per student_identifier."""
+        response = self.model
+        return (
+            db.query(
+                response.student_identifier,
+                func.count().label("answered_count"),
+                func.count().filter(response.is_response_correct.is_(True)).label("total_score"),
+            )
+            .filter(response.test_session_identifier == test_session_identifier)
+            .group_by(response.student_identifier)
+            .order_by(response.student_identifier)
+        )
+
+    def get_discrimination_group_counts(
+        self, db: Session, *, test_session_identifier: str, question_ids: List[UUID], group_fraction: float
+    ) -> Dict[UUID, Dict[str, Any]]:
+        """
+        Menghitung jumlah jawaban benar di kelompok atas dan bawah untuk banyak soal sekaligus
+        dengan window function di database (tanpa memuat respons ke Python).
+
+        Penjawab setiap soal diurutkan berdasarkan skor total sesi (menurun) dengan
+        `ROW_NUMBER()`; seri skor di batas kelompok dipecah berdasarkan student_identifier
+        (menaik) sehingga hasilnya selalu sama. Ukuran kelompok = min(ceil(n x fraksi), n // 2).
+        Kebenaran pilihan ganda ditentukan dari kunci jawaban, tipe lain dari `is_response_correct`.
+        """
+        if not question_ids:
+            return {}
+        response = self.model
+        scores = (
+            select(
+                response.student_identifier,
+                func.count().filter(response.is_response_correct.is_(True)).label("total_score"),
+            )
+            .where(response.test_session_identifier == test_session_identifier)
+            .group_by(response.student_identifier)
+            .cte("session_scores")
+        )
+        is_correct = case(
+            (Question.question_type == "multiple_choice", func.coalesce(AnswerOption.is_correct, False)),
+            else_=func.coalesce(response.is_response_correct, False),
+        )
+        ranked = (
+            select(
+                response.question_id,
+                is_correct.label("is_correct"),
+                func.row_number().over(
+                    partition_by=response.question_id,
+                    order_by=(scores.c.total_score.desc(), response.student_identifier.asc()),
+                ).label("score_rank"),
+                func.count().over(partition_by=response.question_id).label("n_responses"),
+            )
+            .join(scores, scores.c.student_identifier == response.student_identifier)
+            .join(Question, Question.id == response.question_id)
+            .outerjoin(AnswerOption, AnswerOption.id == response.selected_option_id)
+            .where(
+                response.test_session_identifier == test_session_identifier,
+                response.question_id.in_(question_ids),
+            )
+            .cte("ranked_responses")
+        )
+        group_size = func.least(
+            func.ceil(ranked.c.n_responses * literal(group_fraction, Float)), ranked.c.n_responses // 2
+        )
+        rows = db.execute(
+            select(
+                ranked.c.question_id,
+                func.max(ranked.c.n_responses).label("responses_count"),
+                func.max(group_size).label("group_size"),
+                func.count().filter(and_(ranked.c.is_correct, ranked.c.score_rank <= group_size)).label("upper_correct"),
+                func.count().filter(
+                    and_(ranked.c.is_correct, ranked.c.score_rank > ranked.c.n_responses - group_size)
+                ).label("lower_correct"),
+            ).group_by(ranked.c.question_id)
+        ).all()
+        return {
+            row.question_id: {
+                "responses_count": int(row.responses_count),
+                "group_size": int(row.group_size),
+                "upper_correct": int(row.upper_correct),
+                "lower_correct": int(row.lower_correct),
+            }
+            for row in rows
+        }
 
     def get_multi_by_question(
         self, db: Session, *, question_id: UUID, skip: int = 0, limit: int = 100
@@ -0,0 +1,31 @@
+# backend/app/crud/crud_test_reliability_result.py
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.test_reliability_result import TestReliabilityResult
+
+class CRUDTestReliabilityResult:
+    model = TestReliabilityResult
+
+    def get_by_session(self, db: Session, *, test_session_identifier: str) -> Optional[TestReliabilityResult]:
+        """Mengambil hasil reliabilitas terakhir untuk sebuah sesi tes."""
+        return db.query(self.model).filter(self.model.test_session_identifier == test_session_identifier).first()
+
+    def upsert(self, db: Session, *, values: Dict[str, Any]) -> TestReliabilityResult:
+        """Menyimpan atau menimpa hasil reliabilitas sebuah sesi tes (satu baris per sesi)."""
+        stmt = insert(self.model).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.test_session_identifier],
+            set_={
+                **{key: stmt.excluded[key] for key in values if key != "test_session_identifier"},
+                "last_analyzed_at": func.now(),
+            }
+        ).returning(self.model)
+        result = db.scalars(stmt, execution_options={"populate_existing": True}).one()
+        db.commit()
+        return result
+
+test_reliability_result = CRUDTestReliabilityResult()
@@ -2,10 +2,13 @@
 from typing import Any, Dict, Optional, Union, List
 from uuid import UUID
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
 
-from app.crud.base import CRUDBase
+from app.crud.base import AsyncCRUDBase, CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserUpdateByAdmin
 from app.core.security import get_password_hash # Untuk hashing password
@@ -73,4 +76,65 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     # Fungsi authenticate bisa tetap di endpoint auth, atau dipindahkan ke sini jika preferensi.
     # Untuk saat ini, endpoint auth bisa memanggil get_by_username dan verify_password secara terpisah.
 
-user = CRUDUser(User)
\ No newline at end of file
+user = CRUDUser(User)
+
+class CRUDUserAsync(AsyncCRUDBase[User, UserCreate, UserUpdate]):
+    """
+    Varian async CRUDUser untuk endpoint autentikasi dan pengguna.
+    Hashing password (bcrypt) dijalankan di threadpool karena memakan CPU dan akan memblokir event loop.
+    """
+    async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
+        """Mengambil pengguna berdasarkan alamat email."""
+        return await db.scalar(select(User).where(User.email == email))
+
+    async def get_by_username(self, db: AsyncSession, *, username: str) -> Optional[User]:
+        """Mengambil pengguna berdasarkan username."""
+        return await db.scalar(select(User).where(User.username == username))
+
+    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+        """
+        Membuat pengguna baru.
+        Password akan di-hash sebelum disimpan.
+        """
+        db_obj = User(
+            email=obj_in.email,
+            username=obj_in.username,
+            hashed_password=await run_in_threadpool(get_password_hash, obj_in.password),
+            full_name=obj_in.full_name,
+            role=obj_in.role,
+            is_active=obj_in.is_active if obj_in.is_active is not None else True,
+        )
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[User]:
+        """Mengambil beberapa pengguna dengan paginasi."""
+        result = await db.scalars(select(self.model).order_by(self.model.full_name).offset(skip).limit(limit))
+        return list(result.all())
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: User,
+        obj_in: Union[UserUpdate, UserUpdateByAdmin, Dict[str, Any]]
+    ) -> User:
+        """
+        Memperbarui pengguna.
+        Jika password ada di obj_in, password akan di-hash.
+        """
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+
+        if "password" in update_data and update_data["password"]:
+            update_data["hashed_password"] = await run_in_threadpool(get_password_hash, update_data.pop("password"))
+
+        return await super().update(db, db_obj=db_obj, obj_in=update_data)
+
+user_async = CRUDUserAsync(User)
@@ -1,5 +1,7 @@
 # backend/app/db/session.py
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
@@ -10,6 +12,17 @@ engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 # Membuat SessionLocal class yang akan menjadi factory untuk sesi database baru.
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _async_database_url() -> str:
+    """URL engine async: ASYNC_DATABASE_URL jika diisi, selain itu DATABASE_URL dengan driver asyncpg."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+# Engine dan session factory async untuk endpoint `async def` agar query tidak memblokir event loop.
+# expire_on_commit=False karena atribut yang kedaluwarsa tidak bisa dimuat ulang secara implisit di mode async.
+async_engine = create_async_engine(_async_database_url(), pool_pre_ping=True)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     """
     Dependensi FastAPI untuk menyediakan sesi database per request.
@@ -19,4 +32,12 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """
+    Dependensi FastAPI untuk sesi database async per request.
+    Dipakai oleh endpoint `async def`; endpoint `def` biasa tetap memakai `get_db` di threadpool.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -10,7 +10,11 @@ from .comment import Comment
 from .student_response import StudentResponse
 from .test_session import TestSession
 from .item_analysis_result import ItemAnalysisResult
+from .item_response_counter import ItemResponseCounter
 from .roster import Roster, Student
+from .background_job import BackgroundJob
+from .irt_person_ability import IRTPersonAbility
+from .test_reliability_result import TestReliabilityResult
 
 # Anda bisa mendefinisikan __all__ jika ingin mengontrol apa yang diimpor dengan 'from app.models import *'
 # __all__ = ["User", "Question", "AnswerOption", "StudentResponse", "ItemAnalysisResult"]
\ No newline at end of file
@@ -0,0 +1,32 @@
+# backend/app/models/background_job.py
+import uuid
+from sqlalchemy import Column, String, Text, Integer, DateTime, func, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB
+from app.db.base import Base
+
+class BackgroundJob(Base):
+    """
+    Antrean pekerjaan latar belakang berbasis database (tanpa broker eksternal).
+    Pekerjaan diambil oleh worker (`python -m app.worker`) dengan SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    __tablename__ = "background_jobs"
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_type = Column(String(50), nullable=False, index=True) # contoh: 'question_analysis', 'test_session_analysis'
+    status = Column(String(20), nullable=False, default="queued", index=True) # 'queued', 'running', 'completed', 'failed'
+    params = Column(JSONB, nullable=False, default=dict)
+
+    progress_current = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer, nullable=True)
+    progress_info = Column(JSONB, nullable=True) # Detail progres khusus tipe pekerjaan, mis. baris/error/throughput upload
+    result = Column(JSONB, nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    created_by_user_id = Column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<BackgroundJob(id={self.id}, type='{self.job_type}', status='{self.status}')>"
@@ -0,0 +1,29 @@
+# backend/app/models/irt_person_ability.py
+import uuid
+from sqlalchemy import Column, String, Integer, DateTime, func, Numeric, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from app.db.base import Base
+
+class IRTPersonAbility(Base):
+    """
+    Estimasi kemampuan (theta) setiap siswa hasil kalibrasi IRT terakhir untuk sebuah sesi tes.
+    Parameter item disimpan bersama hasil analisis di tabel item_analysis_results.
+    """
+    __tablename__ = "irt_person_abilities"
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    test_session_identifier = Column(String(100), nullable=False, index=True)
+    student_identifier = Column(String(100), nullable=False, index=True)
+    irt_model = Column(String(10), nullable=False) # 'rasch' atau '2pl'
+
+    theta = Column(Numeric(8, 4), nullable=True)
+    theta_se = Column(Numeric(8, 4), nullable=True)
+    raw_score = Column(Integer, nullable=True)
+    items_answered = Column(Integer, nullable=True)
+
+    calibrated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (UniqueConstraint('test_session_identifier', 'student_identifier', name='uq_session_student_ability'),)
+
+    def __repr__(self):
+        return f"<IRTPersonAbility(student='{self.student_identifier}', theta={self.theta})>"
@@ -15,6 +15,18 @@ class ItemAnalysisResult(Base):
     difficulty_index_p_value = Column(Numeric(5, 4), nullable=True) # Presisi 5 digit, 4 di belakang koma
     discrimination_index = Column(Numeric(5, 4), nullable=True)
     responses_analyzed_count = Column(Integer, nullable=True)
+
+    # Interval kepercayaan bootstrap untuk P-value dan D-index (hanya diisi jika analisis diminta dengan ci=true)
+    p_value_ci_lower = Column(Numeric(5, 4), nullable=True)
+    p_value_ci_upper = Column(Numeric(5, 4), nullable=True)
+    discrimination_ci_lower = Column(Numeric(5, 4), nullable=True)
+    discrimination_ci_upper = Column(Numeric(5, 4), nullable=True)
+    ci_replicates = Column(Integer, nullable=True)
+
+    # Parameter item hasil kalibrasi IRT (Rasch/2PL) untuk sesi tes ini
+    irt_model = Column(String(10), nullable=True)
+    irt_difficulty = Column(Numeric(8, 4), nullable=True) # Parameter b
+    irt_discrimination = Column(Numeric(8, 4), nullable=True) # Parameter a
     
     last_analyzed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -0,0 +1,28 @@
+# backend/app/models/item_response_counter.py
+import uuid
+from sqlalchemy import Column, String, Integer, DateTime, func, ForeignKey, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB
+from app.db.base import Base
+
+class ItemResponseCounter(Base):
+    """
+    Penghitung berjalan per (soal, sesi tes) yang diperbarui setiap kali respons siswa disimpan.
+    Memungkinkan P-value dan statistik opsi dibaca tanpa memindai ulang tabel student_responses.
+    """
+    __tablename__ = "item_response_counters"
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    question_id = Column(PG_UUID(as_uuid=True), ForeignKey("questions.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Respons tanpa sesi tes disimpan dengan string kosong agar kunci unik tetap berlaku (NULL != NULL di PostgreSQL)
+    test_session_identifier = Column(String(100), nullable=False, server_default="", index=True)
+
+    responses_count = Column(Integer, nullable=False, server_default="0")
+    correct_count = Column(Integer, nullable=False, server_default="0") # Jumlah respons dengan is_response_correct = True
+    option_counts = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb")) # {option_id: jumlah pemilih}
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (UniqueConstraint('question_id', 'test_session_identifier', name='uq_question_session_counter'),)
+
+    def __repr__(self):
+        return f"<ItemResponseCounter(question_id={self.question_id}, session='{self.test_session_identifier}', n={self.responses_count})>"
@@ -1,18 +1,28 @@
 # backend/app/models/question.py
 import uuid
-from sqlalchemy import Column, String, Text, DateTime, func, ForeignKey, ARRAY, Table
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, String, Text, DateTime, func, ForeignKey, ARRAY, Table, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID as PG_UUID
+from sqlalchemy.orm import deferred, relationship
 from app.db.base import Base
 
 from .test_session import test_session_questions
 
+# Konfigurasi teks 'simple' (tanpa stemming) karena bank soal berisi teks berbagai bahasa
+QUESTION_SEARCH_CONFIG = "simple"
+# Dokumen pencarian: subjek (bobot A), topik (B) dan konten soal (C)
+_SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{QUESTION_SEARCH_CONFIG}'::regconfig, coalesce(subject, '')), 'A') || "
+    f"setweight(to_tsvector('{QUESTION_SEARCH_CONFIG}'::regconfig, coalesce(topic, '')), 'B') || "
+    f"setweight(to_tsvector('{QUESTION_SEARCH_CONFIG}'::regconfig, content), 'C')"
+)
+
 class Question(Base):
     __tablename__ = "questions"
 
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     created_by_user_id = Column(PG_UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     content = Column(Text, nullable=False)
+    content_hash = Column(String(64), nullable=False) # SHA-256 konten yang dinormalisasi, lihat app.core.content_hash
     question_type = Column(String(50), nullable=False) # contoh: 'multiple_choice', 'essay'
     subject = Column(String(100), nullable=True, index=True)
     topic = Column(String(100), nullable=True, index=True)
@@ -21,6 +31,8 @@ class Question(Base):
     correct_answer_text = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Kolom generated untuk full-text search; deferred agar tidak ikut dibaca saat memuat soal
+    search_vector = deferred(Column(TSVECTOR, Computed(_SEARCH_VECTOR_EXPRESSION, persisted=True)))
 
     # Relasi dengan User (pembuat soal)
     creator = relationship("User", back_populates="questions_created")
@@ -38,5 +50,14 @@ class Question(Base):
 
     test_sessions = relationship("TestSession", secondary=test_session_questions, back_populates="questions")
 
+    __table_args__ = (
+        Index('ix_questions_content_hash_owner', 'content_hash', 'created_by_user_id'),
+        Index('ix_questions_created_at_id', 'created_at', 'id'), # Paginasi keyset daftar soal
+        Index('ix_questions_search_vector', 'search_vector', postgresql_using='gin'),
+        # Indeks trigram (pg_trgm) agar filter ILIKE '%...%' pada subjek dan topik tidak memindai seluruh tabel
+        Index('ix_questions_subject_trgm', 'subject', postgresql_using='gin', postgresql_ops={'subject': 'gin_trgm_ops'}),
+        Index('ix_questions_topic_trgm', 'topic', postgresql_using='gin', postgresql_ops={'topic': 'gin_trgm_ops'}),
+    )
+
     def __repr__(self):
         return f"<Question(id={self.id}, type='{self.question_type}', subject='{self.subject}')>"
\ No newline at end of file
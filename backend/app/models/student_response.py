@@ -1,6 +1,6 @@
 # backend/app/models/student_response.py
 import uuid
-from sqlalchemy import Column, String, Text, Boolean, DateTime, func, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, DateTime, func, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -26,4 +26,14 @@ class StudentResponse(Base):
     selected_option = relationship("AnswerOption", back_populates="chosen_by_responses")
 
     def __repr__(self):
-        return f"<StudentResponse(id={self.id}, question_id={self.question_id}, student='{self.student_identifier}')>"
\ No newline at end of file
+        return f"<StudentResponse(id={self.id}, question_id={self.question_id}, student='{self.student_identifier}')>"
+
+# Kunci alami satu jawaban: satu siswa hanya punya satu jawaban per soal per sesi (sesi kosong dianggap '').
+# Dipakai sebagai target ON CONFLICT saat upload ulang lembar jawaban.
+Index(
+    'uq_student_responses_natural_key',
+    StudentResponse.question_id,
+    StudentResponse.student_identifier,
+    func.coalesce(StudentResponse.test_session_identifier, ''),
+    unique=True,
+)
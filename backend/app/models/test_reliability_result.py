@@ -0,0 +1,30 @@
+# backend/app/models/test_reliability_result.py
+import uuid
+from sqlalchemy import Column, String, Integer, DateTime, func, Numeric
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB
+from app.db.base import Base
+
+class TestReliabilityResult(Base):
+    """
+    Hasil analisis reliabilitas tingkat sesi tes: KR-20 / Cronbach's alpha beserta
+    statistik item-total setiap soal (point-biserial terkoreksi dan alpha jika soal dihapus).
+    """
+    __tablename__ = "test_reliability_results"
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    test_session_identifier = Column(String(100), nullable=False, unique=True, index=True)
+
+    students_count = Column(Integer, nullable=False)
+    items_count = Column(Integer, nullable=False)
+    cronbach_alpha = Column(Numeric(5, 4), nullable=True) # Sama dengan KR-20 untuk skor benar/salah
+    score_mean = Column(Numeric(8, 4), nullable=True)
+    score_std = Column(Numeric(8, 4), nullable=True)
+    standard_error_of_measurement = Column(Numeric(8, 4), nullable=True)
+
+    # Daftar statistik per soal: [{question_id, p_value, point_biserial, alpha_if_deleted}, ...]
+    item_stats = Column(JSONB, nullable=False, default=list)
+
+    last_analyzed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<TestReliabilityResult(session='{self.test_session_identifier}', alpha={self.cronbach_alpha})>"
@@ -7,11 +7,15 @@ from .answer_option import AnswerOptionCreate, AnswerOptionRead, AnswerOptionUpd
 from .comment import CommentBase, CommentCreate, CommentRead, CommentUpdate
 from .question import QuestionCreate, QuestionRead, QuestionUpdate, QuestionBase, QuestionPage
 from .student_response import StudentResponseCreate, StudentResponseRead, StudentResponseBase
-from .item_analysis_result import ItemAnalysisResultRead, ItemAnalysisResultBase
+from .item_analysis_result import ItemAnalysisResultRead, ItemAnalysisResultBase, TestSessionAnalysisRead, IRTCalibrationRead, IRTCalibrationRequest, PersonAbilityRead
 from .statistics import OptionStatData, QuestionOptionStatsRead, AdminDashboardStats, TeacherDashboardStats, ItemAnalysisResultReadForStats, StudentScoresInput
 from .test_session import TestSessionBase, TestSessionCreate, TestSessionRead, TestSessionUpdate, QuestionIDList
-from .bulk_upload import BulkUploadResponse, UploadErrorDetail
+from .bulk_upload import BulkUploadResponse, UploadErrorDetail, QuestionBatchCreateResponse, ResponseBulkUploadResponse
 from .roster import StudentBase, StudentCreate, StudentRead, RosterBase, RosterCreate, RosterRead, RosterUpdate
+from .background_job import BackgroundJobRead, AnalysisJobCreate
+from .test_reliability import TestReliabilityRead, ItemReliabilityStats
+from .dif import DIFGroupSelector, DIFAnalysisRequest, ItemDIFResult, DIFAnalysisRead
+from .similarity import SimilarPairRead, SessionSimilarityRead
 
 # Anda bisa menambahkan __all__ jika ingin mengontrol apa yang diimpor dengan 'from app.schemas import *'
 # __all__ = [
@@ -0,0 +1,43 @@
+# backend/app/schemas/background_job.py
+from pydantic import BaseModel, ConfigDict, model_validator
+from typing import Optional, Dict, Any
+from uuid import UUID
+from datetime import datetime
+
+class BackgroundJobRead(BaseModel):
+    """
+    Skema untuk membaca status dan progres pekerjaan latar belakang.
+    """
+    id: UUID
+    job_type: str
+    status: str
+    params: Dict[str, Any]
+    progress_current: int
+    progress_total: Optional[int] = None
+    progress_info: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error_message: Optional[str] = None
+    created_by_user_id: Optional[UUID] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class AnalysisJobCreate(BaseModel):
+    """
+    Skema untuk mengantrekan analisis item.
+    Isi `question_id` untuk menganalisis satu soal, atau `test_session_id`
+    untuk menganalisis semua soal dalam sebuah sesi ujian.
+    """
+    question_id: Optional[UUID] = None
+    test_session_identifier: Optional[str] = None # Untuk test_session_id, default-nya ID sesi ujian
+    test_session_id: Optional[UUID] = None
+    group_fraction: float = 0.27 # Fraksi kelompok atas/bawah untuk D-index: 0.27, 0.33 atau 0.5
+    ci: bool = False # Hitung interval kepercayaan bootstrap
+
+    @model_validator(mode="after")
+    def check_target(self) -> "AnalysisJobCreate":
+        if (self.question_id is None) == (self.test_session_id is None):
+            raise ValueError("Isi salah satu dari 'question_id' atau 'test_session_id'.")
+        return self
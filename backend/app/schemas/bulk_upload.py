@@ -2,6 +2,7 @@
 
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+from uuid import UUID
 
 class UploadErrorDetail(BaseModel):
     """
@@ -18,3 +19,18 @@ class BulkUploadResponse(BaseModel):
     total_processed: int
     successfully_created: int
     errors: List[UploadErrorDetail]
+
+class ResponseBulkUploadResponse(BulkUploadResponse):
+    """
+    Skema respons upload jawaban siswa. `successfully_created` sama dengan `inserted_count`;
+    jawaban yang sudah ada dengan kunci sama diperbarui (`updated_count`) atau dibiarkan (`unchanged_count`).
+    """
+    inserted_count: int = 0
+    updated_count: int = 0
+    unchanged_count: int = 0
+
+class QuestionBatchCreateResponse(BulkUploadResponse):
+    """
+    Skema respons pembuatan soal massal, termasuk ID soal yang berhasil dibuat.
+    """
+    created_question_ids: List[UUID] = []
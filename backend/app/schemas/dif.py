@@ -0,0 +1,53 @@
+# backend/app/schemas/dif.py
+from pydantic import BaseModel, model_validator
+from typing import Optional, List
+from uuid import UUID
+
+class DIFGroupSelector(BaseModel):
+    """
+    Pemilihan satu kelompok siswa untuk analisis DIF: berdasarkan Roster (kelas)
+    atau daftar student_identifier secara langsung.
+    """
+    roster_id: Optional[UUID] = None
+    student_identifiers: Optional[List[str]] = None
+
+    @model_validator(mode="after")
+    def check_source(self) -> "DIFGroupSelector":
+        if (self.roster_id is None) == (self.student_identifiers is None):
+            raise ValueError("Isi salah satu dari 'roster_id' atau 'student_identifiers'.")
+        return self
+
+class DIFAnalysisRequest(BaseModel):
+    """
+    Skema permintaan analisis Differential Item Functioning (Mantel-Haenszel)
+    antara kelompok referensi dan kelompok fokus.
+    """
+    reference_group: DIFGroupSelector
+    focal_group: DIFGroupSelector
+    test_session_identifier: Optional[str] = None # Default: ID sesi ujian
+
+class ItemDIFResult(BaseModel):
+    """
+    Hasil DIF Mantel-Haenszel untuk satu soal.
+    `mh_d_dif` adalah skala delta ETS (-2.35 x ln odds ratio); nilai negatif berarti soal
+    lebih sulit bagi kelompok fokus pada tingkat kemampuan yang sama.
+    """
+    question_id: UUID
+    reference_count: int
+    focal_count: int
+    mh_odds_ratio: Optional[float] = None
+    mh_d_dif: Optional[float] = None
+    mh_d_dif_se: Optional[float] = None
+    mh_chi_square: Optional[float] = None
+    ets_class: Optional[str] = None # 'A' (dapat diabaikan), 'B' (sedang), 'C' (besar)
+
+class DIFAnalysisRead(BaseModel):
+    """
+    Skema hasil analisis DIF untuk semua soal dalam satu sesi ujian.
+    """
+    test_session_id: UUID
+    test_session_identifier: str
+    reference_students_count: int
+    focal_students_count: int
+    strata_count: int
+    items: List[ItemDIFResult]
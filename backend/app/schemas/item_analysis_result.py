@@ -1,9 +1,11 @@
 # backend/app/schemas/item_analysis_result.py
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import Dict, Optional, List
 from uuid import UUID
 from datetime import datetime
 
+from .statistics import QuestionOptionStatsRead
+
 class ItemAnalysisResultBase(BaseModel):
     """
     Atribut dasar untuk hasil analisis item.
@@ -13,6 +15,14 @@ class ItemAnalysisResultBase(BaseModel):
     difficulty_index_p_value: Optional[float] = None
     discrimination_index: Optional[float] = None
     responses_analyzed_count: Optional[int] = None
+    p_value_ci_lower: Optional[float] = None
+    p_value_ci_upper: Optional[float] = None
+    discrimination_ci_lower: Optional[float] = None
+    discrimination_ci_upper: Optional[float] = None
+    ci_replicates: Optional[int] = None
+    irt_model: Optional[str] = None
+    irt_difficulty: Optional[float] = None
+    irt_discrimination: Optional[float] = None
 
 class ItemAnalysisResultRead(ItemAnalysisResultBase):
     """
@@ -23,5 +33,55 @@ class ItemAnalysisResultRead(ItemAnalysisResultBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class TestSessionAnalysisRead(BaseModel):
+    """
+    Skema hasil analisis item untuk semua soal dalam satu sesi ujian.
+    """
+    test_session_id: UUID
+    test_session_identifier: str
+    students_analyzed_count: int
+    items_analyzed_count: int
+    results: List[ItemAnalysisResultRead]
+    options_stats: List[QuestionOptionStatsRead]
+
+class IRTCalibrationRead(BaseModel):
+    """
+    Skema ringkasan hasil kalibrasi IRT untuk satu sesi ujian.
+    Parameter setiap soal ada di `items` (field irt_*).
+    """
+    test_session_id: UUID
+    test_session_identifier: str
+    model: str
+    students_count: int
+    items_count: int
+    response_patterns_count: int
+    iterations: int
+    converged: bool
+    log_likelihood: float
+    items: List[ItemAnalysisResultRead]
+
+class IRTCalibrationRequest(BaseModel):
+    """
+    Skema untuk meminta kalibrasi IRT beberapa sesi ujian sekaligus.
+    """
+    test_session_ids: List[UUID]
+    model: str = "2pl" # 'rasch' atau '2pl'
+    # Identifier respons per sesi, hanya untuk sesi yang responsnya tidak disimpan dengan ID sesi
+    test_session_identifiers: Dict[UUID, str] = {}
+
+class PersonAbilityRead(BaseModel):
+    """
+    Skema estimasi kemampuan (theta) seorang siswa pada sebuah sesi tes.
+    """
+    student_identifier: str
+    irt_model: str
+    theta: Optional[float] = None
+    theta_se: Optional[float] = None
+    raw_score: Optional[int] = None
+    items_answered: Optional[int] = None
+    calibrated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
 # Anda mungkin tidak memerlukan skema Create atau Update untuk ItemAnalysisResult
 # karena biasanya ini dihasilkan oleh sistem setelah proses analisis.
\ No newline at end of file
@@ -59,6 +59,9 @@ class QuestionPage(BaseModel):
     """
     Skema untuk respons paginasi.
     Berisi daftar soal (items) dan jumlah total soal (total).
+    `next_cursor` dikirim kembali sebagai parameter `cursor` untuk halaman berikutnya (None di halaman terakhir).
     """
     items: List[QuestionRead]
-    total: int
\ No newline at end of file
+    total: int
+    total_is_estimate: bool = False # True jika total adalah perkiraan planner database
+    next_cursor: Optional[str] = None
@@ -0,0 +1,32 @@
+# backend/app/schemas/similarity.py
+from pydantic import BaseModel
+from typing import List
+from uuid import UUID
+
+class SimilarPairRead(BaseModel):
+    """
+    Pasangan siswa dengan pola jawaban salah identik yang mencurigakan.
+    `z_score` membandingkan jumlah jawaban salah identik dengan nilai harapannya jika kedua siswa
+    memilih pengecoh secara independen sesuai popularitas pengecoh setiap soal.
+    """
+    student_identifier_a: str
+    student_identifier_b: str
+    identical_wrong_count: int
+    expected_identical_wrong: float
+    z_score: float
+    identical_answer_count: int
+    common_items_count: int
+
+class SessionSimilarityRead(BaseModel):
+    """
+    Skema hasil deteksi kemiripan jawaban untuk satu sesi ujian.
+    """
+    test_session_id: UUID
+    test_session_identifier: str
+    students_count: int
+    items_count: int # Soal pilihan ganda yang ikut dibandingkan
+    pairs_compared: int
+    candidate_students_count: int # Siswa dengan cukup jawaban salah untuk dibandingkan
+    z_threshold: float
+    min_identical_wrong: int
+    flagged_pairs: List[SimilarPairRead]
@@ -0,0 +1,31 @@
+# backend/app/schemas/test_reliability.py
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List
+from uuid import UUID
+from datetime import datetime
+
+class ItemReliabilityStats(BaseModel):
+    """
+    Statistik item-total sebuah soal dalam analisis reliabilitas sesi.
+    """
+    question_id: UUID
+    p_value: Optional[float] = None
+    point_biserial: Optional[float] = None # Korelasi item dengan skor total tanpa item tersebut
+    alpha_if_deleted: Optional[float] = None
+
+class TestReliabilityRead(BaseModel):
+    """
+    Skema untuk membaca hasil analisis reliabilitas sebuah sesi ujian.
+    """
+    id: UUID
+    test_session_identifier: str
+    students_count: int
+    items_count: int
+    cronbach_alpha: Optional[float] = None
+    score_mean: Optional[float] = None
+    score_std: Optional[float] = None
+    standard_error_of_measurement: Optional[float] = None
+    item_stats: List[ItemReliabilityStats]
+    last_analyzed_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
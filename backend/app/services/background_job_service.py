@@ -0,0 +1,153 @@
+# backend/app/services/background_job_service.py
+
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.db.session import SessionLocal
+from app.models.background_job import BackgroundJob
+from app.services.item_analysis_service import ItemAnalysisService, DISCRIMINATION_GROUP_FRACTION
+from app.services.bulk_upload_service import bulk_upload_service
+from app.services.irt_service import irt_service
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[..., None] # (current, total) atau (current, total, info)
+
+
+class JobProgressReporter:
+    """
+    Mencatat progres pekerjaan melalui sesi database terpisah, sehingga progres
+    terlihat oleh endpoint status walaupun transaksi utama pekerjaan belum di-commit.
+    Pembaruan dibatasi agar tidak menulis ke database untuk setiap item.
+    """
+    def __init__(self, db: Session, job_id: UUID, min_interval_seconds: float = 0.5):
+        self.db = db
+        self.job_id = job_id
+        self.min_interval_seconds = min_interval_seconds
+        self._last_write = 0.0
+        self._pending: Optional[tuple] = None
+
+    def __call__(self, current: int, total: int, info: Optional[Dict[str, Any]] = None) -> None:
+        self._pending = (current, total, info)
+        now = time.monotonic()
+        if current >= total or now - self._last_write >= self.min_interval_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending is None:
+            return
+        current, total, info = self._pending
+        crud.background_job.update_progress(self.db, job_id=self.job_id, current=current, total=total, info=info)
+        self._last_write = time.monotonic()
+        self._pending = None
+
+
+def _run_question_analysis(db: Session, job: BackgroundJob, report_progress: ProgressCallback) -> Dict[str, Any]:
+    report_progress(0, 1)
+    result = ItemAnalysisService().get_or_create_analysis_for_question(
+        db=db,
+        question_id=UUID(job.params["question_id"]),
+        test_session_identifier=job.params.get("test_session_identifier"),
+        group_fraction=job.params.get("group_fraction", DISCRIMINATION_GROUP_FRACTION),
+        ci=job.params.get("ci", False),
+    )
+    report_progress(1, 1)
+    return result.model_dump(mode="json")
+
+
+def _run_test_session_analysis(db: Session, job: BackgroundJob, report_progress: ProgressCallback) -> Dict[str, Any]:
+    result = ItemAnalysisService().analyze_test_session(
+        db=db,
+        session_id=UUID(job.params["test_session_id"]),
+        progress_callback=report_progress,
+        group_fraction=job.params.get("group_fraction", DISCRIMINATION_GROUP_FRACTION),
+        ci=job.params.get("ci", False),
+        test_session_identifier=job.params.get("test_session_identifier"),
+    )
+    return result.model_dump(mode="json")
+
+
+def _run_irt_calibration(db: Session, job: BackgroundJob, report_progress: ProgressCallback) -> Dict[str, Any]:
+    calibrations = irt_service.calibrate_test_sessions(
+        db,
+        session_ids=[UUID(session_id) for session_id in job.params["test_session_ids"]],
+        model=job.params.get("model", "2pl"),
+        test_session_identifiers={
+            UUID(session_id): identifier for session_id, identifier in job.params.get("test_session_identifiers", {}).items()
+        },
+        progress_callback=report_progress,
+    )
+    return {"calibrations": [calibration.model_dump(mode="json") for calibration in calibrations]}
+
+
+def _run_counter_rebuild(db: Session, job: BackgroundJob, report_progress: ProgressCallback) -> Dict[str, Any]:
+    report_progress(0, 1)
+    counters_count = crud.item_response_counter.rebuild(
+        db, test_session_identifier=job.params.get("test_session_identifier")
+    )
+    db.commit()
+    report_progress(1, 1)
+    return {"counters_count": counters_count}
+
+
+def _run_question_upload(db: Session, job: BackgroundJob, report_progress: ProgressCallback) -> Dict[str, Any]:
+    owner = crud.user.get(db, id=job.created_by_user_id) if job.created_by_user_id else None
+    return bulk_upload_service.process_staged_upload(
+        db, upload_type="questions", params=job.params, owner=owner, progress_callback=report_progress
+    )
+
+
+def _run_response_upload(db: Session, job: BackgroundJob, report_progress: ProgressCallback) -> Dict[str, Any]:
+    return bulk_upload_service.process_staged_upload(
+        db, upload_type="responses", params=job.params, owner=None, progress_callback=report_progress
+    )
+
+
+# Peta job_type -> fungsi yang mengerjakannya. Setiap fungsi menerima (db, job, report_progress)
+# dan mengembalikan hasil dalam bentuk dict yang bisa disimpan sebagai JSON.
+JOB_HANDLERS: Dict[str, Callable[[Session, BackgroundJob, ProgressCallback], Dict[str, Any]]] = {
+    "question_analysis": _run_question_analysis,
+    "test_session_analysis": _run_test_session_analysis,
+    "irt_calibration": _run_irt_calibration,
+    "counter_rebuild": _run_counter_rebuild,
+    "question_upload": _run_question_upload,
+    "response_upload": _run_response_upload,
+}
+
+
+def run_job(job_id: UUID) -> None:
+    """
+    Menjalankan satu pekerjaan yang sudah diklaim worker. Fungsi ini dieksekusi di proses
+    anak (ProcessPoolExecutor), sehingga membuka sesi database sendiri.
+    """
+    db = SessionLocal()
+    progress_db = SessionLocal()
+    try:
+        job = crud.background_job.get(db, id=job_id)
+        if not job:
+            return
+        handler = JOB_HANDLERS.get(job.job_type)
+        if handler is None:
+            crud.background_job.mark_finished(
+                progress_db, job_id=job_id, error_message=f"Tipe pekerjaan '{job.job_type}' tidak dikenal."
+            )
+            return
+
+        reporter = JobProgressReporter(progress_db, job_id)
+        result = handler(db, job, reporter)
+        reporter.flush()
+        crud.background_job.mark_finished(progress_db, job_id=job_id, result=result)
+    except Exception as e:
+        logger.exception(f"Pekerjaan {job_id} gagal.")
+        db.rollback()
+        progress_db.rollback()
+        error_message = getattr(e, "detail", None) or str(e) or e.__class__.__name__
+        crud.background_job.mark_finished(progress_db, job_id=job_id, error_message=str(error_message))
+    finally:
+        db.close()
+        progress_db.close()
@@ -1,17 +1,46 @@
 # backend/app/services/bulk_upload_service.py
 
 import csv
+import itertools
 import json
-import io
-from typing import List, Dict, Any
-from sqlalchemy.orm import Session, selectinload
+import shutil
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Set, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy.orm import Session
 from fastapi import UploadFile, HTTPException, status
 from pydantic import ValidationError
 
 from app import crud, schemas
+from app.core.config import settings
+from app.core.content_hash import exact_content_hash, question_content_hash
+from app.core.grading import GradingKeyCache
+from app.crud.crud_question import question_count_cache
 from app.models.user import User
-from app.models.question import Question
 from app.models.roster import Roster
+from app.services.template_service import ANSWER_COLUMN, QUESTION_ID_COLUMN, WIDE_REFERENCE_ROW_MARKER
+from app.services.upload_stream import (
+    UploadParseError, check_upload_content_type, iter_csv_rows, iter_file_rows, iter_row_batches, iter_upload_rows
+)
+
+# Dipanggil setelah setiap batch dengan (jumlah baris yang sudah diproses, jumlah error sejauh ini)
+UploadProgressCallback = Callable[[int, int], None]
+# Dipanggil dengan (byte terbaca, ukuran file, info progres) saat upload diproses di latar belakang
+StagedUploadProgressCallback = Callable[[int, int, Dict[str, Any]], None]
+
+STAGED_UPLOAD_FILENAME = "upload"
+UPLOAD_ERRORS_FILENAME = "errors.csv"
+_STAGING_COPY_CHUNK = 1024 * 1024
+
+def _parse_uuid(value: Any) -> Optional[UUID]:
+    try:
+        return UUID(str(value))
+    except ValueError:
+        return None
+
+def _is_uuid(value: Any) -> bool:
+    return value is not None and _parse_uuid(value) is not None
 
 class BulkUploadService:
     def process_question_upload(
@@ -19,48 +48,107 @@ class BulkUploadService:
     ) -> schemas.BulkUploadResponse:
         """
         Memproses file upload (CSV atau JSON) untuk membuat soal secara massal.
+        File dibaca secara streaming sehingga penggunaan memori tidak bergantung pada ukuran file.
+        """
+        rows = iter_upload_rows(file)
+        return self._process_question_rows(db, rows=rows, owner=owner)
+
+    def process_question_batch(
+        self, db: Session, *, rows: List[Dict[str, Any]], owner: User
+    ) -> schemas.QuestionBatchCreateResponse:
+        """
+        Membuat soal secara massal dari payload JSON (array objek soal dengan format yang sama seperti file upload).
         """
-        content = file.file.read().decode('utf-8')
-        
-        if file.content_type == 'application/json':
-            try:
-                rows = json.loads(content)
-                if not isinstance(rows, list):
-                    raise json.JSONDecodeError("JSON root must be an array of objects.", content, 0)
-            except json.JSONDecodeError as e:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON format: {e}")
-        elif file.content_type == 'text/csv':
-            rows = list(csv.DictReader(io.StringIO(content)))
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-                detail="Unsupported file type. Please upload a CSV or JSON file."
-            )
         return self._process_question_rows(db, rows=rows, owner=owner)
 
     def _process_question_rows(
-        self, db: Session, *, rows: iter, owner: User
-    ) -> schemas.BulkUploadResponse:
+        self, db: Session, *, rows: Iterable[Dict[str, Any]], owner: User,
+        progress_callback: Optional[UploadProgressCallback] = None
+    ) -> schemas.QuestionBatchCreateResponse:
         """
-        Memvalidasi dan menyimpan baris data soal, dengan pencegahan duplikasi.
+        Memvalidasi baris data soal per batch (dengan pencegahan duplikasi), lalu menyimpan setiap batch
+        dengan INSERT multi-baris. Seluruh upload di-commit dalam satu transaksi di akhir.
+
+        Duplikat dicek per batch lewat kolom `content_hash` yang terindeks (bukan memuat seluruh bank soal),
+        dengan cakupan dan normalisasi sesuai QUESTION_DUPLICATE_SCOPE dan QUESTION_DUPLICATE_NORMALIZE.
         """
         successfully_created = 0
         errors: List[schemas.UploadErrorDetail] = []
-        
-        existing_questions_content = {q.content for q in db.query(Question.content).all()}
+        created_question_ids: List[UUID] = []
+
+        duplicate_key = question_content_hash if settings.QUESTION_DUPLICATE_NORMALIZE else exact_content_hash
+        duplicate_owner_id = owner.id if settings.QUESTION_DUPLICATE_SCOPE == "owner" else None
+        seen_keys: Set[str] = set() # Kunci duplikat dari database dan dari baris file yang sudah diterima
 
         total_processed_count = 0
-        for i, row in enumerate(rows, start=1):
-            total_processed_count = i
+        try:
+            for batch in iter_row_batches(rows, settings.UPLOAD_BATCH_SIZE):
+                total_processed_count = batch[-1][0]
+                content_hashes = {
+                    question_content_hash(row['content']) for _, row in batch
+                    if isinstance(row, dict) and isinstance(row.get('content'), str)
+                }
+                for _, content in crud.question.get_contents_by_hashes(
+                    db, content_hashes=content_hashes, owner_id=duplicate_owner_id
+                ):
+                    seen_keys.add(duplicate_key(content))
+
+                validated = self._validate_question_batch(batch, seen_keys=seen_keys, duplicate_key=duplicate_key, errors=errors)
+                if not validated:
+                    if progress_callback:
+                        progress_callback(total_processed_count, len(errors))
+                    continue
+
+                created_ids, insert_errors = crud.question.create_many_with_owner(
+                    db, objs_in=[question_in for _, _, question_in in validated], owner_id=owner.id
+                )
+                for index, (i, row, question_in) in enumerate(validated):
+                    if created_ids[index] is None:
+                        seen_keys.discard(duplicate_key(question_in.content))
+                        errors.append(schemas.UploadErrorDetail(
+                            row_number=i, error_message=f"Gagal menyimpan soal: {insert_errors[index]}", row_data=row
+                        ))
+                    else:
+                        created_question_ids.append(created_ids[index])
+                successfully_created += len(validated) - len(insert_errors)
+                if progress_callback:
+                    progress_callback(total_processed_count, len(errors))
+        except UploadParseError as e:
+            errors.append(self._parse_error_detail(e))
+
+        db.commit()
+        question_count_cache.clear()
+        return schemas.QuestionBatchCreateResponse(
+            total_processed=total_processed_count,
+            successfully_created=successfully_created,
+            errors=errors,
+            created_question_ids=created_question_ids
+        )
+
+    def _validate_question_batch(
+        self, batch: List[Tuple[int, Any]], *, seen_keys: Set[str], duplicate_key: Callable[[str], str],
+        errors: List[schemas.UploadErrorDetail]
+    ) -> List[Tuple[int, Any, schemas.QuestionCreate]]:
+        """
+        Memvalidasi satu batch baris soal. Kunci duplikat baris yang valid langsung dicatat di `seen_keys`
+        agar duplikat di dalam file yang sama juga terdeteksi.
+        """
+        duplicate_message = (
+            "Soal sudah ada (konten sama, mengabaikan spasi dan huruf besar/kecil). Dilewati."
+            if duplicate_key is question_content_hash else "Soal sudah ada (konten sama persis). Dilewati."
+        )
+        validated: List[Tuple[int, Any, schemas.QuestionCreate]] = []
+        for i, row in batch:
             try:
                 question_content = row.get('content')
                 if not question_content:
                     raise ValueError("Kolom 'content' tidak boleh kosong.")
                 
-                if question_content in existing_questions_content:
+                content_key = duplicate_key(str(question_content))
+                if content_key in seen_keys:
                     errors.append(schemas.UploadErrorDetail(
                         row_number=i,
-                        error_message="Soal sudah ada (konten sama persis). Dilewati.",
+                        error_message=duplicate_message,
                         row_data=row
                     ))
                     continue
@@ -75,73 +163,249 @@ class BulkUploadService:
                         row['answer_options'] = []
 
                 question_in = schemas.QuestionCreate(**row)
-                crud.question.create_with_owner(db, obj_in=question_in, owner_id=owner.id)
-                
-                existing_questions_content.add(question_content)
-                successfully_created += 1
+                seen_keys.add(content_key)
+                validated.append((i, row, question_in))
 
             except (ValidationError, ValueError) as e:
                 errors.append(schemas.UploadErrorDetail(row_number=i, error_message=str(e), row_data=row))
             except Exception as e:
                 errors.append(schemas.UploadErrorDetail(row_number=i, error_message=f"Error tak terduga: {str(e)}", row_data=row))
-        
-        return schemas.BulkUploadResponse(
-            total_processed=total_processed_count,
-            successfully_created=successfully_created,
-            errors=errors
+        return validated
+
+    def get_staging_root(self) -> Path:
+        """
+        Direktori staging upload (UPLOAD_STAGING_DIR, path absolut). Melempar RuntimeError jika
+        direktorinya tidak ada, agar API dan worker gagal lebih awal alih-alih menulis/membaca
+        file di lokasi yang berbeda.
+        """
+        staging_root = Path(settings.UPLOAD_STAGING_DIR)
+        if not staging_root.is_dir():
+            raise RuntimeError(
+                f"Direktori staging upload '{staging_root}' tidak ada. Buat direktori tersebut "
+                "(atau atur DATA_DIR/UPLOAD_STAGING_DIR) di lokasi yang bisa diakses API dan worker."
+            )
+        return staging_root
+
+    def stage_upload(self, *, file: UploadFile) -> Dict[str, Any]:
+        """
+        Menyalin file upload ke direktori staging lokal (UPLOAD_STAGING_DIR) agar bisa diproses
+        worker latar belakang. Mengembalikan parameter pekerjaan yang menunjuk ke file tersebut.
+        Worker harus berjalan di mesin yang sama (atau berbagi direktori staging) dengan API.
+        """
+        check_upload_content_type(file.content_type)
+        try:
+            staging_root = self.get_staging_root()
+        except RuntimeError as e:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+        staging_dir = staging_root / uuid4().hex
+        staging_dir.mkdir()
+        upload_path = staging_dir / STAGED_UPLOAD_FILENAME
+        with open(upload_path, "wb") as staged:
+            shutil.copyfileobj(file.file, staged, _STAGING_COPY_CHUNK)
+        return {
+            "staging_dir": str(staging_dir),
+            "content_type": file.content_type,
+            "filename": file.filename,
+            "size_bytes": upload_path.stat().st_size,
+        }
+
+    def process_staged_upload(
+        self, db: Session, *, upload_type: str, params: Dict[str, Any], owner: Optional[User],
+        progress_callback: Optional[StagedUploadProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Memproses file yang sudah di-staging (`upload_type` 'questions' atau 'responses').
+        Progres dilaporkan dalam byte file yang sudah dibaca, beserta jumlah baris, jumlah error dan
+        throughput (baris per detik). Semua error ditulis ke `errors.csv` di direktori staging;
+        hasil yang dikembalikan hanya berisi ringkasan jumlahnya.
+        """
+        staging_dir = Path(params["staging_dir"])
+        upload_path = staging_dir / STAGED_UPLOAD_FILENAME
+        size_bytes = params.get("size_bytes") or upload_path.stat().st_size
+        started = time.monotonic()
+
+        with open(upload_path, "rb") as staged:
+            def _report(rows_processed: int, errors_count: int) -> None:
+                if not progress_callback:
+                    return
+                elapsed = time.monotonic() - started
+                progress_callback(staged.tell(), size_bytes, {
+                    "rows_processed": rows_processed,
+                    "errors_count": errors_count,
+                    "rows_per_second": round(rows_processed / elapsed, 1) if elapsed > 0 else None,
+                })
+
+            rows = iter_file_rows(staged, params["content_type"])
+            if upload_type == "questions":
+                if owner is None:
+                    raise ValueError("Upload soal memerlukan pengguna pemilik.")
+                result = self._process_question_rows(db, rows=rows, owner=owner, progress_callback=_report)
+            else:
+                result = self._process_response_rows(
+                    db, rows=rows, on_conflict=params.get("on_conflict", "update"), progress_callback=_report
+                )
+            _report(result.total_processed, len(result.errors))
+
+        self._write_errors_csv(staging_dir / UPLOAD_ERRORS_FILENAME, result.errors)
+        upload_path.unlink(missing_ok=True)
+
+        summary = result.model_dump(mode="json", exclude={"errors", "created_question_ids"})
+        summary["errors_count"] = len(result.errors)
+        summary["rows_per_second"] = round(result.total_processed / max(time.monotonic() - started, 1e-9), 1)
+        return summary
+
+    def _write_errors_csv(self, path: Path, errors: List[schemas.UploadErrorDetail]) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["row_number", "error_message", "row_data"])
+            for error in errors:
+                writer.writerow([
+                    error.row_number,
+                    error.error_message,
+                    json.dumps(error.row_data, ensure_ascii=False, default=str) if error.row_data is not None else "",
+                ])
+
+    def get_errors_csv_path(self, params: Dict[str, Any]) -> Optional[Path]:
+        """Lokasi file error pekerjaan upload, atau None jika belum/tidak tersedia."""
+        if not params.get("staging_dir"):
+            return None
+        path = Path(params["staging_dir"]) / UPLOAD_ERRORS_FILENAME
+        return path if path.exists() else None
+
+    def _parse_error_detail(self, error: UploadParseError) -> schemas.UploadErrorDetail:
+        """Baris yang tidak dapat di-parse menghentikan pembacaan file; batch sebelumnya tetap tersimpan."""
+        return schemas.UploadErrorDetail(
+            row_number=error.row_number,
+            error_message=f"Invalid JSON format: {error}. Baris berikutnya tidak diproses."
         )
     
     def process_roster_upload(self, db: Session, *, roster: Roster, file: UploadFile) -> Roster:
-        content = file.file.read().decode('utf-8')
-        reader = csv.DictReader(io.StringIO(content))
-        student_identifiers = {row['student_identifier'].strip() for row in reader if row.get('student_identifier')}
+        student_identifiers = {
+            row['student_identifier'].strip() for row in iter_csv_rows(file.file) if row.get('student_identifier')
+        }
         
         if not student_identifiers:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File CSV tidak berisi data atau header 'student_identifier' tidak ditemukan.")
             
         return crud.roster.add_students_to_roster(db=db, roster=roster, student_identifiers=student_identifiers)
     
-    def process_response_upload(self, db: Session, *, file: UploadFile) -> schemas.BulkUploadResponse:
+    def process_response_upload(
+        self, db: Session, *, file: UploadFile, on_conflict: str = "update"
+    ) -> schemas.ResponseBulkUploadResponse:
         """
         Memproses file upload (CSV atau JSON) untuk membuat jawaban siswa secara massal.
+        File dibaca secara streaming sehingga penggunaan memori tidak bergantung pada ukuran file.
+        Upload ulang lembar jawaban yang sama tidak membuat jawaban ganda (lihat `on_conflict`).
         """
-        content = file.file.read().decode('utf-8')
-        
-        if file.content_type == 'application/json':
-            try:
-                rows = json.loads(content)
-                if not isinstance(rows, list): raise json.JSONDecodeError("JSON root must be an array of objects.", content, 0)
-            except json.JSONDecodeError as e:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON format: {e}")
-        elif file.content_type == 'text/csv':
-            rows = list(csv.DictReader(io.StringIO(content)))
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-                detail="Unsupported file type. Please upload a CSV or JSON file."
-            )
-        return self._process_response_rows(db, rows=rows)
+        rows = iter_upload_rows(file)
+        return self._process_response_rows(db, rows=rows, on_conflict=on_conflict)
 
-    def _process_response_rows(self, db: Session, *, rows: List[Dict[str, Any]]) -> schemas.BulkUploadResponse:
+    def _process_response_rows(
+        self, db: Session, *, rows: Iterable[Dict[str, Any]], on_conflict: str = "update",
+        progress_callback: Optional[UploadProgressCallback] = None
+    ) -> schemas.ResponseBulkUploadResponse:
         """
-        Memvalidasi dan menyimpan baris data jawaban siswa dari file.
+        Memvalidasi dan menyimpan baris data jawaban siswa dari file per batch.
         Termasuk logika untuk mencocokkan teks jawaban dengan ID opsi.
+        Soal hanya dimuat sekali; batch berikutnya hanya memuat soal yang belum pernah terlihat.
+        Format panjang maupun lebar (lihat `_iter_wide_batches`) dikenali dari baris pertama.
         """
-        successfully_created = 0
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
         errors: List[schemas.UploadErrorDetail] = []
-        validated_responses: List[schemas.StudentResponseCreate] = []
-
-        question_ids_from_file = {row.get('question_id (jangan diubah)') for row in rows if row.get('question_id (jangan diubah)')}
-        questions_map = {
-            str(q.id): q for q in db.query(Question).options(selectinload(Question.answer_options)).filter(Question.id.in_(question_ids_from_file)).all()
-        }
+        grading_keys = GradingKeyCache() # Dipakai ulang oleh semua batch dan oleh penyimpanan respons
 
         total_processed_count = 0
-        for i, row in enumerate(rows, start=1):
-            total_processed_count = i
+        try:
+            for last_row_number, batch in self._iter_response_batches(rows):
+                total_processed_count = last_row_number
+                grading_keys.load(db, {
+                    question_id for _, row in batch
+                    if isinstance(row, dict) and (question_id := _parse_uuid(row.get(QUESTION_ID_COLUMN)))
+                })
+                validated_responses = self._validate_response_batch(batch, grading_keys=grading_keys, errors=errors)
+
+                if validated_responses:
+                    batch_counts = crud.student_response.insert_bulk(
+                        db, responses_in=validated_responses, on_conflict=on_conflict, grading_keys=grading_keys
+                    )
+                    db.commit()
+                    for key, value in batch_counts.items():
+                        counts[key] += value
+                if progress_callback:
+                    progress_callback(total_processed_count, len(errors))
+        except UploadParseError as e:
+            errors.append(self._parse_error_detail(e))
+        
+        return schemas.ResponseBulkUploadResponse(
+            total_processed=total_processed_count,
+            successfully_created=counts["inserted"],
+            errors=errors,
+            inserted_count=counts["inserted"],
+            updated_count=counts["updated"],
+            unchanged_count=counts["unchanged"]
+        )
+
+    def _iter_response_batches(self, rows: Iterable[Dict[str, Any]]) -> Iterator[Tuple[int, List[Tuple[int, Any]]]]:
+        """Menghasilkan (nomor baris terakhir, batch baris format panjang) untuk file format panjang atau lebar."""
+        iterator = iter(rows)
+        try:
+            first_row = next(iterator)
+        except StopIteration:
+            return
+        rows = itertools.chain([first_row], iterator)
+        if isinstance(first_row, dict) and QUESTION_ID_COLUMN not in first_row and any(_is_uuid(key) for key in first_row):
+            yield from self._iter_wide_batches(rows, question_columns=[key for key in first_row if _is_uuid(key)])
+            return
+        for batch in iter_row_batches(rows, settings.UPLOAD_BATCH_SIZE):
+            yield batch[-1][0], batch
+
+    def _iter_wide_batches(
+        self, rows: Iterable[Dict[str, Any]], *, question_columns: List[str]
+    ) -> Iterator[Tuple[int, List[Tuple[int, Any]]]]:
+        """
+        Lembar jawaban format lebar: satu baris per siswa, kolom `student_identifier`,
+        `test_session_identifier` (opsional) dan satu kolom per soal dengan ID soal sebagai nama kolom.
+        Setiap sel diubah menjadi baris format panjang dengan nomor baris lembar aslinya, sehingga
+        validasi dan penilaian memakai jalur yang sama. Baris referensi (diawali '#') dilewati dan
+        sel kosong dianggap tidak dijawab. Jumlah siswa per batch disesuaikan agar jumlah sel per
+        batch mendekati UPLOAD_BATCH_SIZE.
+        """
+        students_per_batch = max(1, settings.UPLOAD_BATCH_SIZE // max(len(question_columns), 1))
+        for batch in iter_row_batches(rows, students_per_batch):
+            long_batch: List[Tuple[int, Any]] = []
+            for i, row in batch:
+                if not isinstance(row, dict):
+                    long_batch.append((i, row)) # Dilaporkan sebagai error saat validasi
+                    continue
+                student_identifier = row.get('student_identifier') or ''
+                if str(student_identifier).startswith(WIDE_REFERENCE_ROW_MARKER):
+                    continue
+                for question_id in question_columns:
+                    answer = row.get(question_id)
+                    if answer is None or not str(answer).strip():
+                        continue
+                    long_batch.append((i, {
+                        QUESTION_ID_COLUMN: question_id,
+                        'student_identifier': student_identifier,
+                        'test_session_identifier': row.get('test_session_identifier') or None,
+                        ANSWER_COLUMN: str(answer),
+                    }))
+            yield batch[-1][0], long_batch
+
+    def _validate_response_batch(
+        self, batch: List[Tuple[int, Any]], *, grading_keys: GradingKeyCache, errors: List[schemas.UploadErrorDetail]
+    ) -> List[schemas.StudentResponseCreate]:
+        """
+        Mengubah baris file menjadi StudentResponseCreate. Jawaban pilihan ganda dicocokkan dengan teks opsi
+        atau label hurufnya (A/B/C/...), isian singkat dinilai terhadap kunci jawaban; keduanya
+        tanpa membedakan huruf besar/kecil dan spasi berlebih.
+        """
+        validated_responses: List[schemas.StudentResponseCreate] = []
+        for i, row in batch:
             try:
-                question_id_str = row.get('question_id (jangan diubah)')
-                question = questions_map.get(question_id_str)
+                question_id_str = row.get(QUESTION_ID_COLUMN)
+                question_id = _parse_uuid(question_id_str)
+                question = grading_keys.get(question_id) if question_id else None
                 if not question:
                     raise ValueError(f"Soal dengan ID '{question_id_str}' tidak ditemukan.")
                 
@@ -154,20 +418,13 @@ class BulkUploadService:
                     "test_session_identifier": row.get('test_session_identifier')
                 }
 
-                answer_text = row.get('answer (diisi oleh guru)', '').strip()
+                answer_text = row.get(ANSWER_COLUMN, '').strip()
 
                 if question.question_type == 'multiple_choice':
-                    if answer_text:
-                        matched_option = next((opt for opt in question.answer_options if opt.option_text.strip() == answer_text), None)
-                        if matched_option:
-                            response_payload['selected_option_id'] = matched_option.id
+                    response_payload['selected_option_id'] = question.match_option(answer_text)
                 elif question.question_type == 'short_answer':
                     response_payload['response_text'] = answer_text
-                    if question.correct_answer_text:
-                        if answer_text.lower() == question.correct_answer_text.lower():
-                            response_payload['is_response_correct'] = True
-                        else:
-                            response_payload['is_response_correct'] = False
+                    response_payload['is_response_correct'] = question.grade_text(answer_text)
                 else: # Essay
                     response_payload['response_text'] = answer_text
                 
@@ -178,16 +435,7 @@ class BulkUploadService:
                 errors.append(schemas.UploadErrorDetail(row_number=i, error_message=str(e), row_data=row))
             except Exception as e:
                 errors.append(schemas.UploadErrorDetail(row_number=i, error_message=f"Error tak terduga: {str(e)}", row_data=row))
-
-        if validated_responses:
-            created_objects = crud.student_response.create_bulk(db, responses_in=validated_responses)
-            successfully_created = len(created_objects)
-        
-        return schemas.BulkUploadResponse(
-            total_processed=total_processed_count,
-            successfully_created=successfully_created,
-            errors=errors
-        )
+        return validated_responses
 
 
 bulk_upload_service = BulkUploadService()
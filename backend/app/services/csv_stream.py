@@ -0,0 +1,37 @@
+# backend/app/services/csv_stream.py
+
+import csv
+import io
+from typing import Any, Iterable, Iterator, Sequence
+
+from fastapi.responses import StreamingResponse
+
+CSV_CHUNK_SIZE = 64 * 1024 # Ukuran kira-kira setiap potongan teks yang dikirim ke klien
+
+
+def iter_csv_chunks(rows: Iterable[Sequence[Any]], chunk_size: int = CSV_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Menulis baris CSV ke buffer kecil yang dipakai ulang dan menghasilkan isinya setiap kali
+    ukurannya mencapai `chunk_size`, sehingga memori tetap datar berapa pun jumlah barisnya.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def csv_streaming_response(rows: Iterable[Sequence[Any]], *, filename: str) -> StreamingResponse:
+    """
+    StreamingResponse CSV yang ditulis sambil dikirim. `rows` sebaiknya generator yang baru
+    mengambil data saat diiterasi; bila membutuhkan database, generator harus membuka sesinya
+    sendiri karena sesi milik request sudah ditutup ketika body response mulai dikirim.
+    """
+    response = StreamingResponse(iter_csv_chunks(rows), media_type="text/csv")
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
@@ -0,0 +1,185 @@
+# backend/app/services/dif_service.py
+
+from typing import Dict, Optional, Set
+from uuid import UUID
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.services.response_matrix import response_matrix_service, require_session_responses
+
+# Skala delta ETS dan batas klasifikasi A/B/C
+ETS_DELTA_SCALE = -2.35
+ETS_B_THRESHOLD = 1.0
+ETS_C_THRESHOLD = 1.5
+_CHI_SQUARE_CRITICAL = 3.841 # df=1, alpha 0.05
+_Z_ONE_SIDED_CRITICAL = 1.645
+
+
+def mantel_haenszel_dif(
+    answered: np.ndarray, correct: np.ndarray, matching_scores: np.ndarray, is_focal: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Menghitung statistik DIF Mantel-Haenszel untuk semua soal sekaligus.
+    Siswa dikelompokkan ke strata berdasarkan `matching_scores`; tabel 2x2 (kelompok x benar/salah)
+    setiap strata dan soal diakumulasi dengan perkalian matriks one-hot strata x respons.
+    Hanya siswa yang menjawab soal yang masuk ke tabel soal tersebut.
+    """
+    strata, stratum_index = np.unique(matching_scores, return_inverse=True)
+    onehot = np.zeros((len(strata), len(matching_scores)))
+    onehot[stratum_index, np.arange(len(matching_scores))] = 1.0
+
+    resp = answered.astype(np.float64)
+    hits = (correct & answered).astype(np.float64)
+
+    def _tables(mask: np.ndarray):
+        n = onehot[:, mask] @ resp[mask]
+        r = onehot[:, mask] @ hits[mask]
+        return r, n - r
+
+    a, b = _tables(~is_focal) # Referensi: benar, salah (strata x soal)
+    c, d = _tables(is_focal) # Fokus: benar, salah
+    t = a + b + c + d
+    t_safe = np.where(t > 0, t, 1.0)
+
+    r_term = a * d / t_safe
+    s_term = b * c / t_safe
+    sum_r = r_term.sum(axis=0)
+    sum_s = s_term.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        valid = (sum_r > 0) & (sum_s > 0)
+        odds_ratio = np.where(valid, sum_r / np.where(sum_s > 0, sum_s, 1.0), np.nan)
+        log_odds = np.log(odds_ratio)
+
+        # Varians ln(odds ratio) Robins-Breslow-Greenland
+        p_term = (a + d) / t_safe
+        q_term = (b + c) / t_safe
+        var_log_odds = (
+            (p_term * r_term).sum(axis=0) / (2 * sum_r ** 2)
+            + (p_term * s_term + q_term * r_term).sum(axis=0) / (2 * sum_r * sum_s)
+            + (q_term * s_term).sum(axis=0) / (2 * sum_s ** 2)
+        )
+
+        # Chi-square MH dengan koreksi kontinuitas (strata dengan minimal 2 siswa)
+        usable = t > 1
+        n_ref, n_focal = a + b, c + d
+        m_correct, m_wrong = a + c, b + d
+        expected_a = np.where(usable, n_ref * m_correct / t_safe, 0.0)
+        var_a = np.where(usable, n_ref * n_focal * m_correct * m_wrong / (t_safe ** 2 * np.where(usable, t - 1, 1.0)), 0.0)
+        observed_a = np.where(usable, a, 0.0).sum(axis=0)
+        sum_var_a = var_a.sum(axis=0)
+        chi_square = np.where(
+            sum_var_a > 0,
+            np.maximum(np.abs(observed_a - expected_a.sum(axis=0)) - 0.5, 0.0) ** 2 / np.where(sum_var_a > 0, sum_var_a, 1.0),
+            np.nan
+        )
+
+    delta = ETS_DELTA_SCALE * log_odds
+    delta_se = abs(ETS_DELTA_SCALE) * np.sqrt(var_log_odds)
+    return {
+        "strata_count": len(strata),
+        "reference_count": (resp[~is_focal]).sum(axis=0),
+        "focal_count": (resp[is_focal]).sum(axis=0),
+        "odds_ratio": odds_ratio,
+        "delta": np.where(valid, delta, np.nan),
+        "delta_se": np.where(valid, delta_se, np.nan),
+        "chi_square": chi_square,
+    }
+
+
+def classify_ets(delta: float, delta_se: float, chi_square: float) -> Optional[str]:
+    """
+    Klasifikasi DIF ETS:
+    A jika |delta| < 1 atau tidak signifikan, C jika |delta| >= 1.5 dan signifikan lebih besar dari 1, selain itu B.
+    """
+    if np.isnan(delta):
+        return None
+    abs_delta = abs(delta)
+    if abs_delta < ETS_B_THRESHOLD or np.isnan(chi_square) or chi_square < _CHI_SQUARE_CRITICAL:
+        return "A"
+    if abs_delta >= ETS_C_THRESHOLD and delta_se > 0 and (abs_delta - ETS_B_THRESHOLD) / delta_se > _Z_ONE_SIDED_CRITICAL:
+        return "C"
+    return "B"
+
+
+class DIFService:
+    def _resolve_group(self, db: Session, selector: schemas.DIFGroupSelector) -> Set[str]:
+        """Mengambil student_identifier anggota kelompok dari Roster atau daftar yang dikirim."""
+        if selector.roster_id is not None:
+            roster = crud.roster.get(db=db, id=selector.roster_id)
+            if not roster:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Roster {selector.roster_id} not found")
+            return {student.student_identifier for student in roster.students}
+        return set(selector.student_identifiers)
+
+    def analyze_test_session_dif(
+        self, db: Session, *, session_id: UUID, dif_in: schemas.DIFAnalysisRequest
+    ) -> schemas.DIFAnalysisRead:
+        """
+        Analisis DIF Mantel-Haenszel untuk semua soal sebuah sesi ujian antara kelompok
+        referensi dan fokus. Siswa distratifikasi berdasarkan skor total pada soal yang dapat dinilai.
+        """
+        session = crud.test_session.get(db=db, id=session_id)
+        if not session:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test Session not found")
+
+        reference_ids = self._resolve_group(db, dif_in.reference_group)
+        focal_ids = self._resolve_group(db, dif_in.focal_group)
+        if reference_ids & focal_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Kelompok referensi dan fokus tidak boleh memiliki siswa yang sama."
+            )
+
+        matrix = response_matrix_service.build_for_session(
+            db, session=session, test_session_identifier=dif_in.test_session_identifier
+        )
+        require_session_responses(matrix)
+        gradable = matrix.gradable
+        student_identifiers = np.array(matrix.student_identifiers, dtype=object)
+        in_reference = np.isin(student_identifiers, list(reference_ids))
+        in_focal = np.isin(student_identifiers, list(focal_ids))
+        if not in_reference.any() or not in_focal.any():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Kedua kelompok harus memiliki siswa yang mengikuti sesi ujian ini."
+            )
+
+        selected = in_reference | in_focal
+        answered = matrix.answered[selected][:, gradable]
+        correct = matrix.correct[selected][:, gradable]
+        matching_scores = (correct & answered).sum(axis=1)
+        stats = mantel_haenszel_dif(answered, correct, matching_scores, in_focal[selected])
+
+        def _as_optional(value: float) -> Optional[float]:
+            return None if not np.isfinite(value) else round(float(value), 4)
+
+        gradable_question_ids = [q_id for q_id, is_gradable in zip(matrix.question_ids, gradable) if is_gradable]
+        items = [
+            schemas.ItemDIFResult(
+                question_id=question_id,
+                reference_count=int(stats["reference_count"][i]),
+                focal_count=int(stats["focal_count"][i]),
+                mh_odds_ratio=_as_optional(stats["odds_ratio"][i]),
+                mh_d_dif=_as_optional(stats["delta"][i]),
+                mh_d_dif_se=_as_optional(stats["delta_se"][i]),
+                mh_chi_square=_as_optional(stats["chi_square"][i]),
+                ets_class=classify_ets(stats["delta"][i], stats["delta_se"][i], stats["chi_square"][i]),
+            )
+            for i, question_id in enumerate(gradable_question_ids)
+        ]
+
+        return schemas.DIFAnalysisRead(
+            test_session_id=session.id,
+            test_session_identifier=matrix.test_session_identifier,
+            reference_students_count=int(in_reference.sum()),
+            focal_students_count=int(in_focal.sum()),
+            strata_count=stats["strata_count"],
+            items=items,
+        )
+
+
+dif_service = DIFService()
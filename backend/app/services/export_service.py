@@ -0,0 +1,208 @@
+# backend/app/services/export_service.py
+
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, DateTime, Integer, Numeric
+from sqlalchemy.orm import Query, Session
+
+from app import crud
+from app.db.session import SessionLocal
+from app.models.test_session import TestSession
+from app.services.csv_stream import CSV_CHUNK_SIZE, iter_csv_chunks
+from app.services.response_matrix import get_session_identifier
+
+ExportFormat = Literal["csv", "ndjson", "parquet"]
+ExportDataset = Literal["responses", "scores", "item-analysis"]
+
+_FETCH_SIZE = 5000 # Jumlah baris per pengambilan dari server-side cursor
+_PARQUET_ROW_GROUP_SIZE = 100_000
+_PARQUET_COMPRESSION = "zstd"
+_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Pembuat query ekspor per dataset; query dibangun di dalam generator dengan sesi database milik generator
+_DATASET_QUERIES: Dict[str, Callable[[Session, str], Query]] = {
+    "responses": lambda db, identifier: crud.student_response.get_export_query(db, test_session_identifier=identifier),
+    "scores": lambda db, identifier: crud.student_response.get_scores_export_query(db, test_session_identifier=identifier),
+    "item-analysis": lambda db, identifier: crud.item_analysis_result.get_export_query(db, test_session_identifier=identifier),
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _iter_ndjson_chunks(names: List[str], rows: Iterator[Sequence[Any]], chunk_size: int = CSV_CHUNK_SIZE) -> Iterator[str]:
+    """Satu objek JSON per baris, dikirim per potongan sekitar `chunk_size` karakter."""
+    lines: List[str] = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(zip(names, row)), default=_json_default, ensure_ascii=False) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(lines)
+            lines, size = [], 0
+    if lines:
+        yield "".join(lines)
+
+
+def _iter_csv_export_chunks(names: List[str], rows: Iterator[Sequence[Any]]) -> Iterator[str]:
+    def _rows() -> Iterator[Sequence[Any]]:
+        yield names
+        for row in rows:
+            yield [value.isoformat() if isinstance(value, datetime) else value for value in row]
+    return iter_csv_chunks(_rows())
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Tujuan tulis ParquetWriter yang menampung byte hingga diambil dengan `drain`.
+    Posisi tetap dihitung dari awal file karena footer Parquet menyimpan offset absolut setiap row group.
+    """
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_type(column_type: Any):
+    import pyarrow as pa
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Numeric):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us", tz="UTC") if column_type.timezone else pa.timestamp("us")
+    return pa.string() # String, Text dan UUID
+
+
+def _arrow_converter(arrow_type: Any) -> Optional[Callable[[Any], Any]]:
+    """Konversi nilai Python yang tidak diterima langsung oleh Arrow (UUID ke string, Decimal ke float)."""
+    import pyarrow as pa
+    if pa.types.is_string(arrow_type):
+        return lambda value: None if value is None else str(value)
+    if pa.types.is_floating(arrow_type):
+        return lambda value: None if value is None else float(value)
+    return None
+
+
+def _iter_parquet_chunks(query: Query, rows: Iterator[Sequence[Any]]) -> Iterator[bytes]:
+    """
+    File Parquet (kolumnar, terkompresi) yang ditulis per row group: setiap `_PARQUET_ROW_GROUP_SIZE`
+    baris dikonversi ke kolom Arrow, ditulis, lalu byte-nya langsung dikirim.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column["name"], _arrow_type(column["type"])) for column in query.column_descriptions])
+    converters = [_arrow_converter(field.type) for field in schema]
+
+    def _to_batch(batch_rows: List[Sequence[Any]]):
+        columns = []
+        for index, convert in enumerate(converters):
+            values = [row[index] for row in batch_rows]
+            columns.append(values if convert is None else [convert(value) for value in values])
+        return pa.RecordBatch.from_arrays([pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema)
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression=_PARQUET_COMPRESSION) as writer:
+        batch_rows: List[Sequence[Any]] = []
+        for row in rows:
+            batch_rows.append(row)
+            if len(batch_rows) >= _PARQUET_ROW_GROUP_SIZE:
+                writer.write_batch(_to_batch(batch_rows))
+                batch_rows = []
+                yield sink.drain()
+        if batch_rows:
+            writer.write_batch(_to_batch(batch_rows))
+    yield sink.drain() # Row group terakhir dan footer (juga untuk hasil kosong) ditulis saat writer ditutup
+
+
+def _require_parquet_support() -> None:
+    try:
+        import pyarrow.parquet # noqa: F401
+    except ImportError:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Ekspor Parquet membutuhkan paket 'pyarrow' yang belum terpasang di server."
+        )
+
+
+class ExportService:
+    def export_session_dataset(
+        self, db: Session, *, session: TestSession, dataset: ExportDataset, export_format: ExportFormat,
+        test_session_identifier: Optional[str] = None
+    ) -> StreamingResponse:
+        """
+        Ekspor data satu sesi ujian (respons, skor total per siswa, atau hasil analisis soal)
+        dalam format CSV, NDJSON atau Parquet. Baris dibaca dari server-side cursor (`yield_per`)
+        dan langsung ditulis ke body response, sehingga hasil query tidak pernah dimuat utuh ke memori.
+        Sesi tanpa respons dengan identifier tersebut ditolak (404) sebelum streaming dimulai.
+        """
+        if export_format == "parquet":
+            _require_parquet_support()
+        session_identifier = get_session_identifier(session, test_session_identifier)
+        if not crud.student_response.has_responses(db, test_session_identifier=session_identifier):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Tidak ada respons siswa dengan test_session_identifier '{session_identifier}'."
+            )
+        content = self._iter_export(dataset, session_identifier, export_format)
+        response = StreamingResponse(content, media_type=_MEDIA_TYPES[export_format])
+        filename = f"{dataset.replace('-', '_')}_{session.name.replace(' ', '_')}.{export_format}"
+        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+        return response
+
+    def _iter_export(self, dataset: str, session_identifier: str, export_format: str) -> Iterator[Any]:
+        # Sesi database sendiri: sesi milik request sudah ditutup ketika body response mulai dikirim
+        db = SessionLocal()
+        try:
+            query = _DATASET_QUERIES[dataset](db, session_identifier)
+            rows = (tuple(row) for row in query.yield_per(_FETCH_SIZE))
+            names = [column["name"] for column in query.column_descriptions]
+            if export_format == "parquet":
+                yield from _iter_parquet_chunks(query, rows)
+            elif export_format == "ndjson":
+                yield from _iter_ndjson_chunks(names, rows)
+            else:
+                yield from _iter_csv_export_chunks(names, rows)
+        finally:
+            db.close()
+
+
+export_service = ExportService()
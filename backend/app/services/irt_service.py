@@ -0,0 +1,307 @@
+# backend/app/services/irt_service.py
+
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.services.response_matrix import response_matrix_service, require_session_responses
+
+IRT_MODELS = ("rasch", "2pl")
+
+# Titik kuadratur untuk integrasi kemampuan laten theta ~ N(0, 1)
+_QUADRATURE_NODES = np.linspace(-6.0, 6.0, 41)
+_QUADRATURE_LOG_WEIGHTS = -0.5 * _QUADRATURE_NODES ** 2 - np.log(np.exp(-0.5 * _QUADRATURE_NODES ** 2).sum())
+
+_RIDGE = 1e-6
+_MAX_STEP = 1.0
+
+# Parameter b dibatasi pada rentang skala theta yang masuk akal (dan muat di kolom Numeric(8, 4)).
+# Untuk soal 2PL dengan |a| sangat kecil, b = -intercept / a tidak stabil sehingga dikosongkan.
+MAX_ABS_DIFFICULTY = 10.0
+MIN_SLOPE_FOR_DIFFICULTY = 0.05
+
+
+def _expit(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def _compress_patterns(correct: np.ndarray, answered: np.ndarray):
+    """
+    Memadatkan matriks siswa x soal menjadi pola respons unik beserta frekuensinya.
+    Kode sel: 0 = tidak menjawab, 1 = salah, 2 = benar.
+    """
+    codes = answered.astype(np.uint8) + (correct & answered).astype(np.uint8)
+    patterns, inverse, counts = np.unique(codes, axis=0, return_inverse=True, return_counts=True)
+    return patterns == 2, patterns == 1, inverse.reshape(-1), counts.astype(np.float64)
+
+
+def _e_step(right, wrong, counts, slopes, intercepts, theta, chunk_size, want_person_moments=False):
+    """
+    Langkah E: posterior theta untuk setiap pola respons (diproses per blok agar memori tetap kecil),
+    lalu diakumulasikan menjadi jumlah harapan benar (r) dan jumlah harapan menjawab (n) per soal per titik kuadratur.
+    """
+    logits = slopes[:, None] * theta[None, :] + intercepts[:, None]
+    log_p = -np.logaddexp(0.0, -logits)
+    log_q = -np.logaddexp(0.0, logits)
+
+    n_items, n_nodes = logits.shape
+    r = np.zeros((n_items, n_nodes))
+    n = np.zeros((n_items, n_nodes))
+    log_likelihood = 0.0
+    eap = np.empty(len(counts)) if want_person_moments else None
+    psd = np.empty(len(counts)) if want_person_moments else None
+
+    for start in range(0, len(counts), chunk_size):
+        stop = start + chunk_size
+        right_block = right[start:stop].astype(np.float64)
+        wrong_block = wrong[start:stop].astype(np.float64)
+        log_post = right_block @ log_p + wrong_block @ log_q + _QUADRATURE_LOG_WEIGHTS[None, :]
+        log_max = log_post.max(axis=1, keepdims=True)
+        post = np.exp(log_post - log_max)
+        norm = post.sum(axis=1, keepdims=True)
+        post /= norm
+
+        block_counts = counts[start:stop]
+        log_likelihood += float((block_counts * (np.log(norm[:, 0]) + log_max[:, 0])).sum())
+        weighted = post * block_counts[:, None]
+        r += right_block.T @ weighted
+        n += (right_block + wrong_block).T @ weighted
+
+        if want_person_moments:
+            mean = post @ theta
+            eap[start:stop] = mean
+            psd[start:stop] = np.sqrt(np.maximum(post @ theta ** 2 - mean ** 2, 0.0))
+
+    return r, n, log_likelihood, eap, psd
+
+
+def _m_step_2pl(slopes, intercepts, r, n, theta, newton_steps=3):
+    """Langkah M 2PL: Newton-Raphson 2x2 (slope, intercept) untuk semua soal sekaligus."""
+    for _ in range(newton_steps):
+        p = _expit(slopes[:, None] * theta[None, :] + intercepts[:, None])
+        resid = r - n * p
+        weight = n * p * (1.0 - p)
+        g_a = (resid * theta).sum(axis=1)
+        g_c = resid.sum(axis=1)
+        h_aa = (weight * theta ** 2).sum(axis=1) + _RIDGE
+        h_ac = (weight * theta).sum(axis=1)
+        h_cc = weight.sum(axis=1) + _RIDGE
+        det = h_aa * h_cc - h_ac ** 2
+        det = np.where(det > _RIDGE, det, _RIDGE)
+        slopes = slopes + np.clip((h_cc * g_a - h_ac * g_c) / det, -_MAX_STEP, _MAX_STEP)
+        intercepts = intercepts + np.clip((h_aa * g_c - h_ac * g_a) / det, -_MAX_STEP, _MAX_STEP)
+        slopes = np.clip(slopes, -4.0, 6.0)
+        intercepts = np.clip(intercepts, -20.0, 20.0)
+    return slopes, intercepts
+
+
+def _m_step_rasch(slope, intercepts, r, n, theta, newton_steps=3):
+    """
+    Langkah M Rasch: satu slope bersama untuk semua soal (setara dengan variansi kemampuan
+    pada skala Rasch) dan intercept per soal.
+    """
+    for _ in range(newton_steps):
+        p = _expit(slope * theta[None, :] + intercepts[:, None])
+        resid = r - n * p
+        weight = n * p * (1.0 - p)
+        intercepts = intercepts + np.clip(resid.sum(axis=1) / (weight.sum(axis=1) + _RIDGE), -_MAX_STEP, _MAX_STEP)
+        intercepts = np.clip(intercepts, -20.0, 20.0)
+
+        p = _expit(slope * theta[None, :] + intercepts[:, None])
+        resid = r - n * p
+        weight = n * p * (1.0 - p)
+        step = (resid * theta).sum() / ((weight * theta ** 2).sum() + _RIDGE)
+        slope = float(np.clip(slope + np.clip(step, -_MAX_STEP, _MAX_STEP), 0.05, 6.0))
+    return slope, intercepts
+
+
+def fit_irt_model(
+    correct: np.ndarray,
+    answered: np.ndarray,
+    model: str = "2pl",
+    max_iter: int = 500,
+    tol: float = 1e-4,
+    chunk_size: int = 20000,
+) -> Dict[str, Any]:
+    """
+    Mengkalibrasi parameter item Rasch atau 2PL dengan EM (marginal maximum likelihood)
+    pada matriks benar/salah siswa x soal, lalu mengestimasi kemampuan siswa (EAP).
+
+    Siswa dengan pola respons identik digabung terlebih dahulu dan langkah E diproses per blok,
+    sehingga sesi dengan ratusan ribu siswa tetap bisa dihitung dengan memori terbatas.
+    Fungsi ini murni NumPy (tanpa database) agar bisa dijalankan di proses terpisah.
+    """
+    if model not in IRT_MODELS:
+        raise ValueError(f"Model IRT '{model}' tidak dikenal. Pilih salah satu dari {IRT_MODELS}.")
+
+    n_students, n_items = correct.shape
+    right, wrong, inverse, counts = _compress_patterns(correct, answered)
+
+    n_answered = answered.sum(axis=0)
+    p_values = (correct & answered).sum(axis=0) / np.maximum(n_answered, 1)
+    p_clipped = np.clip(p_values, 0.02, 0.98)
+    intercepts = np.log(p_clipped / (1.0 - p_clipped))
+    slopes = np.ones(n_items)
+    slope = 1.0
+    theta = _QUADRATURE_NODES
+
+    converged = False
+    iterations = 0
+    log_likelihood = float("nan")
+    for iterations in range(1, max_iter + 1):
+        current_slopes = slopes if model == "2pl" else np.full(n_items, slope)
+        r, n, log_likelihood, _, _ = _e_step(right, wrong, counts, current_slopes, intercepts, theta, chunk_size)
+
+        if model == "2pl":
+            new_slopes, new_intercepts = _m_step_2pl(slopes, intercepts, r, n, theta)
+            change = max(np.abs(new_slopes - slopes).max(initial=0.0), np.abs(new_intercepts - intercepts).max(initial=0.0))
+            slopes, intercepts = new_slopes, new_intercepts
+        else:
+            new_slope, new_intercepts = _m_step_rasch(slope, intercepts, r, n, theta)
+            change = max(abs(new_slope - slope), np.abs(new_intercepts - intercepts).max(initial=0.0))
+            slope, intercepts = new_slope, new_intercepts
+
+        if change < tol:
+            converged = True
+            break
+
+    current_slopes = slopes if model == "2pl" else np.full(n_items, slope)
+    _, _, log_likelihood, eap, psd = _e_step(
+        right, wrong, counts, current_slopes, intercepts, theta, chunk_size, want_person_moments=True
+    )
+
+    if model == "2pl":
+        discrimination = slopes
+        with np.errstate(divide="ignore", invalid="ignore"):
+            difficulty = np.where(np.abs(slopes) >= MIN_SLOPE_FOR_DIFFICULTY, -intercepts / slopes, np.nan)
+        person_scale = 1.0
+    else:
+        # Skala Rasch: theta' = slope * theta sehingga diskriminasi semua soal = 1
+        discrimination = np.ones(n_items)
+        difficulty = -intercepts
+        person_scale = slope
+
+    no_data = n_answered == 0
+    difficulty = np.where(no_data, np.nan, np.clip(difficulty, -MAX_ABS_DIFFICULTY, MAX_ABS_DIFFICULTY))
+    discrimination = np.where(no_data, np.nan, discrimination)
+
+    return {
+        "model": model,
+        "difficulty": difficulty,
+        "discrimination": discrimination,
+        "theta": eap[inverse] * person_scale,
+        "theta_se": psd[inverse] * person_scale,
+        "iterations": iterations,
+        "converged": converged,
+        "log_likelihood": log_likelihood,
+        "n_students": n_students,
+        "n_patterns": len(counts),
+    }
+
+
+def validate_irt_model(model: str) -> None:
+    if model not in IRT_MODELS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Model IRT harus salah satu dari {IRT_MODELS}.")
+
+
+class IRTService:
+    def calibrate_test_sessions(
+        self, db: Session, *, session_ids: List[UUID], model: str = "2pl",
+        test_session_identifiers: Optional[Dict[UUID, str]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> List[schemas.IRTCalibrationRead]:
+        """
+        Mengkalibrasi model IRT untuk beberapa sesi ujian secara berurutan, satu sesi per langkah
+        `progress_callback(selesai, total)`. Matriks respons dibangun per sesi tepat sebelum
+        dikalibrasi, sehingga hanya satu matriks yang ada di memori. `POST /irt/calibrate`
+        mengantrekan satu pekerjaan 'irt_calibration' per sesi agar worker menjalankannya paralel.
+        `test_session_identifiers` memetakan ID sesi ke identifier respons yang bukan ID sesi itu sendiri.
+        """
+        validate_irt_model(model)
+
+        sessions = []
+        for session_id in session_ids:
+            session = crud.test_session.get(db=db, id=session_id)
+            if not session:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Test Session {session_id} not found")
+            sessions.append(session)
+
+        test_session_identifiers = test_session_identifiers or {}
+        calibrations: List[schemas.IRTCalibrationRead] = []
+        if progress_callback:
+            progress_callback(0, len(sessions))
+        for session in sessions:
+            matrix = response_matrix_service.build_for_session(
+                db, session=session, test_session_identifier=test_session_identifiers.get(session.id)
+            )
+            require_session_responses(matrix)
+            if not matrix.gradable.any():
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Sesi {matrix.test_session_identifier} belum memiliki respons untuk dikalibrasi."
+                )
+            # Hanya soal yang dapat dinilai benar/salah yang ikut dikalibrasi
+            fit = fit_irt_model(matrix.correct[:, matrix.gradable], matrix.answered[:, matrix.gradable], model)
+            calibrations.append(self._store_calibration(db, session=session, matrix=matrix, fit=fit))
+            if progress_callback:
+                progress_callback(len(calibrations), len(sessions))
+        return calibrations
+
+    def _store_calibration(self, db: Session, *, session, matrix, fit: Dict[str, Any]) -> schemas.IRTCalibrationRead:
+        """Menyimpan parameter item ke ItemAnalysisResult dan kemampuan siswa ke irt_person_abilities."""
+        def _as_optional(value: float) -> Optional[float]:
+            return None if not np.isfinite(value) else round(float(value), 4)
+
+        items_in = [
+            schemas.ItemAnalysisResultBase(
+                question_id=question_id,
+                test_session_identifier=matrix.test_session_identifier,
+                irt_model=fit["model"],
+                irt_difficulty=_as_optional(fit["difficulty"][i]),
+                irt_discrimination=_as_optional(fit["discrimination"][i]),
+            )
+            for i, question_id in enumerate(
+                q_id for q_id, gradable in zip(matrix.question_ids, matrix.gradable) if gradable
+            )
+        ]
+        results_orm = crud.item_analysis_result.upsert_many(
+            db=db, objs_in=items_in, fields=("irt_model", "irt_difficulty", "irt_discrimination")
+        )
+
+        raw_scores = matrix.total_scores()
+        items_answered = matrix.answered[:, matrix.gradable].sum(axis=1)
+        abilities_in = [
+            {
+                "test_session_identifier": matrix.test_session_identifier,
+                "student_identifier": identifier,
+                "irt_model": fit["model"],
+                "theta": round(float(fit["theta"][s]), 4),
+                "theta_se": round(float(fit["theta_se"][s]), 4),
+                "raw_score": int(raw_scores[s]),
+                "items_answered": int(items_answered[s]),
+            }
+            for s, identifier in enumerate(matrix.student_identifiers)
+        ]
+        crud.irt_person_ability.replace_for_session(
+            db=db, test_session_identifier=matrix.test_session_identifier, abilities_in=abilities_in
+        )
+
+        return schemas.IRTCalibrationRead(
+            test_session_id=session.id,
+            test_session_identifier=matrix.test_session_identifier,
+            model=fit["model"],
+            students_count=matrix.n_students,
+            items_count=matrix.n_items,
+            response_patterns_count=fit["n_patterns"],
+            iterations=fit["iterations"],
+            converged=fit["converged"],
+            log_likelihood=round(fit["log_likelihood"], 4),
+            items=[schemas.ItemAnalysisResultRead.model_validate(res) for res in results_orm],
+        )
+
+
+irt_service = IRTService()
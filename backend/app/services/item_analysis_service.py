@@ -1,18 +1,56 @@
 # backend/app/services/item_analysis_service.py
+from sqlalchemy import func
 from sqlalchemy.orm import Session, selectinload
-from typing import Optional, List, Dict # Tambahkan Dict
+from typing import Optional, List, Dict, Any, Callable # Tambahkan Dict
 from uuid import UUID
 from fastapi import HTTPException, status
 import math # Untuk pembulatan dalam pengelompokan
+import warnings
+import numpy as np
 
 from app import schemas, crud
 from app.models.student_response import StudentResponse
 from app.models.question import Question
-from app.models.answer_option import AnswerOption
 from app.models.item_analysis_result import ItemAnalysisResult
-from app.core.config import settings # Jika ada setting terkait analisis
+from app.services.response_matrix import response_matrix_service, SessionResponseMatrix, GRADABLE_QUESTION_TYPES, get_session_identifier, require_session_responses
+
+# Proporsi kelompok atas/bawah untuk Indeks Daya Pembeda dan jumlah respons minimal
+DISCRIMINATION_GROUP_FRACTION = 0.27
+DISCRIMINATION_GROUP_FRACTIONS = (0.27, 0.33, 0.5) # 27%, 33%, atau median split
+MIN_RESPONSES_FOR_DISCRIMINATION = 10
+
+# Pengaturan interval kepercayaan bootstrap (persentil) untuk P-value dan D-index
+BOOTSTRAP_REPLICATES = 2000
+BOOTSTRAP_CI_LEVEL = 0.95
+BOOTSTRAP_SEED = 20240601 # Seed tetap agar interval dapat direproduksi
+_BOOTSTRAP_CHUNK_ELEMENTS = 4_000_000 # Batas elemen array per potongan replikasi bootstrap
+
+
+def validate_group_fraction(group_fraction: float) -> float:
+    """Memastikan fraksi kelompok atas/bawah adalah salah satu nilai yang didukung."""
+    if group_fraction not in DISCRIMINATION_GROUP_FRACTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"group_fraction harus salah satu dari {DISCRIMINATION_GROUP_FRACTIONS}."
+        )
+    return group_fraction
 
 class ItemAnalysisService:
+    def __init__(self):
+        # Cache skor total siswa per sesi tes, berlaku selama satu kali proses analisis (satu request)
+        self._total_scores_cache: Dict[str, Dict[str, float]] = {}
+
+    def get_student_total_scores(self, db: Session, test_session_identifier: str) -> Dict[str, float]:
+        """
+        Mengambil skor total setiap siswa pada sebuah sesi tes, dihitung di server
+        dari `student_responses.is_response_correct` dan di-cache selama proses analisis berjalan.
+        """
+        if test_session_identifier not in self._total_scores_cache:
+            self._total_scores_cache[test_session_identifier] = crud.student_response.get_total_scores_by_session(
+                db, test_session_identifier=test_session_identifier
+            )
+        return self._total_scores_cache[test_session_identifier]
+
     def _get_responses_for_analysis(
         self, db: Session, question_id: UUID, test_session_identifier: Optional[str] = None
     ) -> List[StudentResponse]:
@@ -34,6 +72,59 @@ class ItemAnalysisService:
             return [] 
         return responses
 
+    def _get_response_aggregates(
+        self, db: Session, question: Question, test_session_identifier: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Menghitung jumlah respons, jumlah jawaban benar, dan jumlah pemilih setiap opsi.
+        Diambil dari tabel penghitung jika ada, jika tidak langsung di database
+        (GROUP BY selected_option_id), tanpa memuat objek ORM.
+        Mengembalikan None untuk tipe soal yang tidak bisa ditangani jalur SQL ini.
+        """
+        if question.question_type not in GRADABLE_QUESTION_TYPES:
+            return None
+
+        # Baca dari penghitung berjalan (O(1)) jika sudah tersedia untuk soal/sesi ini
+        counter_aggregates = crud.item_response_counter.get_aggregates(
+            db, question_id=question.id, test_session_identifier=test_session_identifier
+        )
+        if counter_aggregates is not None:
+            return counter_aggregates
+
+        query = (
+            db.query(
+                StudentResponse.selected_option_id,
+                func.count().label("selection_count"),
+                func.count().filter(StudentResponse.is_response_correct.is_(True)).label("graded_correct_count"),
+            )
+            .filter(StudentResponse.question_id == question.id)
+        )
+        if test_session_identifier:
+            query = query.filter(StudentResponse.test_session_identifier == test_session_identifier)
+        rows = query.group_by(StudentResponse.selected_option_id).all()
+
+        return {
+            "responses_count": sum(row.selection_count for row in rows),
+            "graded_correct_count": sum(row.graded_correct_count for row in rows),
+            "option_counts": {row.selected_option_id: row.selection_count for row in rows},
+        }
+
+    def _get_response_rows_for_discrimination(
+        self, db: Session, question_id: UUID, test_session_identifier: Optional[str] = None
+    ) -> List[Any]:
+        """
+        Mengambil hanya kolom yang dibutuhkan untuk Indeks Daya Pembeda
+        (student_identifier, selected_option_id, is_response_correct) tanpa eager loading relasi.
+        """
+        query = db.query(
+            StudentResponse.student_identifier,
+            StudentResponse.selected_option_id,
+            StudentResponse.is_response_correct,
+        ).filter(StudentResponse.question_id == question_id)
+        if test_session_identifier:
+            query = query.filter(StudentResponse.test_session_identifier == test_session_identifier)
+        return query.all()
+
     def _get_correct_answer_option_id_for_question(self, question: Question) -> Optional[UUID]:
         """Helper untuk mendapatkan ID opsi jawaban yang benar untuk soal pilihan ganda."""
         if question and question.question_type == "multiple_choice":
@@ -74,15 +165,36 @@ class ItemAnalysisService:
         )
         return p_value
 
+    def calculate_difficulty_index_from_aggregates(
+        self, question: Question, aggregates: Dict[str, Any]
+    ) -> Optional[float]:
+        """Menghitung P-value dari hasil agregasi `_get_response_aggregates`."""
+        responses_analyzed_count = aggregates["responses_count"]
+        if responses_analyzed_count == 0:
+            return None
+
+        if question.question_type == "multiple_choice":
+            correct_option_id = self._get_correct_answer_option_id_for_question(question)
+            if correct_option_id is None:
+                return 0.0
+            correct_answers_count = aggregates["option_counts"].get(correct_option_id, 0)
+        else:
+            correct_answers_count = aggregates["graded_correct_count"]
+
+        return round(correct_answers_count / responses_analyzed_count, 4)
+
     def calculate_discrimination_index(
         self,
         question: Question,
         responses_for_question: List[StudentResponse],
-        all_student_total_scores: Dict[str, float] # Format: {student_identifier: total_score}
+        all_student_total_scores: Dict[str, float], # Format: {student_identifier: total_score}
+        group_fraction: float = DISCRIMINATION_GROUP_FRACTION
     ) -> Optional[float]:
         """
         Menghitung Indeks Daya Pembeda.
         Membutuhkan skor total semua siswa pada tes yang relevan.
+        Dipakai jika skor total dikirim oleh klien; jika tidak, kelompok dibentuk
+        di database (lihat `crud.student_response.get_discrimination_group_counts`).
         """
         if not responses_for_question or not all_student_total_scores or len(responses_for_question) < 10:
             # Butuh minimal data & skor total untuk analisis yang berarti
@@ -102,14 +214,15 @@ class ItemAnalysisService:
         if not relevant_students_with_scores or len(relevant_students_with_scores) < 10:
             return None # Tidak cukup data siswa yang relevan
 
-        # Urutkan siswa berdasarkan skor total
-        relevant_students_with_scores.sort(key=lambda x: x["total_score"], reverse=True)
+        # Urutkan siswa berdasarkan skor total; seri dipecah berdasarkan student_identifier
+        relevant_students_with_scores.sort(key=lambda x: (-x["total_score"], x["identifier"]))
 
         # Tentukan kelompok atas dan bawah (misal, 27% atau 33%)
         # Untuk S1, pembagian menjadi 2 kelompok (atas & bawah median) juga bisa jadi penyederhanaan.
         # Mari kita coba dengan 27% jika jumlah siswa memungkinkan, atau median split.
         n_total_relevant = len(relevant_students_with_scores)
-        n_group = math.ceil(n_total_relevant * 0.27) # Ambil 27% teratas dan terbawah
+        # Ambil fraksi teratas dan terbawah, tanpa tumpang tindih pada median split
+        n_group = min(math.ceil(n_total_relevant * group_fraction), n_total_relevant // 2)
 
         if n_group < 2: # Minimal 2 siswa per kelompok untuk perbandingan
             # Jika terlalu sedikit, bisa coba split median
@@ -135,45 +248,112 @@ class ItemAnalysisService:
 
         return None
 
+    def _calculate_discrimination_index_in_db(
+        self, db: Session, question_id: UUID, test_session_identifier: str, group_fraction: float
+    ) -> Optional[float]:
+        """Menghitung D-index dari Pu/Pl yang dikelompokkan dengan window function di database."""
+        counts = crud.student_response.get_discrimination_group_counts(
+            db, test_session_identifier=test_session_identifier,
+            question_ids=[question_id], group_fraction=group_fraction
+        ).get(question_id)
+        if not counts or counts["responses_count"] < MIN_RESPONSES_FOR_DISCRIMINATION or counts["group_size"] < 2:
+            return None
+        pu_value = counts["upper_correct"] / counts["group_size"]
+        pl_value = counts["lower_correct"] / counts["group_size"]
+        return round(pu_value - pl_value, 4)
+
+    def _bootstrap_question_statistics(
+        self, db: Session, question: Question, test_session_identifier: Optional[str],
+        all_student_total_scores: Optional[Dict[str, float]], group_fraction: float
+    ) -> Dict[str, np.ndarray]:
+        """
+        Menyusun vektor respons satu soal (urut skor total, seri dipecah berdasarkan student_identifier)
+        lalu menghitung interval kepercayaan bootstrap-nya.
+        """
+        rows = self._get_response_rows_for_discrimination(db, question.id, test_session_identifier)
+        if all_student_total_scores is None and test_session_identifier:
+            all_student_total_scores = self.get_student_total_scores(db, test_session_identifier)
+        scores = all_student_total_scores or {}
+        # Siswa tanpa skor total ditempatkan di urutan terbawah
+        rows = sorted(rows, key=lambda row: (-scores.get(row.student_identifier, -math.inf), row.student_identifier))
+
+        correct_option_id = self._get_correct_answer_option_id_for_question(question)
+        if question.question_type == "multiple_choice":
+            correct = [correct_option_id is not None and row.selected_option_id == correct_option_id for row in rows]
+        else:
+            correct = [row.is_response_correct is True for row in rows]
+
+        return self._bootstrap_item_statistics(
+            np.ones((len(rows), 1), dtype=bool), np.array(correct, dtype=bool).reshape(-1, 1), group_fraction
+        )
+
     def get_or_create_analysis_for_question(
         self,
         db: Session,
         question_id: UUID,
         test_session_identifier: Optional[str] = None,
         # Terima data skor total siswa secara opsional
-        all_student_total_scores_for_test: Optional[Dict[str, float]] = None
+        all_student_total_scores_for_test: Optional[Dict[str, float]] = None,
+        group_fraction: float = DISCRIMINATION_GROUP_FRACTION,
+        ci: bool = False
     ) -> schemas.ItemAnalysisResultRead:
         """
         Menghitung atau mengambil hasil analisis item untuk sebuah soal.
+        Jika skor total tidak diberikan dan `test_session_identifier` ada,
+        kelompok atas/bawah untuk Indeks Daya Pembeda dibentuk langsung di database
+        berdasarkan skor total siswa pada sesi tersebut.
+        Dengan `ci=True`, interval kepercayaan bootstrap P-value dan D-index ikut dihitung dan disimpan.
         """
+        validate_group_fraction(group_fraction)
         question = crud.question.get(db=db, id=question_id) # crud.question.get sudah eager load options & creator
         if not question:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Question with id {question_id} not found.")
 
-        relevant_responses = self._get_responses_for_analysis(db, question_id, test_session_identifier)
-
-        if not relevant_responses:
-             # Jika tidak ada respons, mungkin kita simpan hasil analisis dengan nilai None atau 0
-            p_value = None
-            d_index = None
-            responses_count = 0
+        aggregates = self._get_response_aggregates(db, question, test_session_identifier)
+        d_index = None
+        if aggregates is not None:
+            # Jalur utama: hitung langsung di database tanpa memuat objek ORM
+            responses_count = aggregates["responses_count"]
+            p_value = self.calculate_difficulty_index_from_aggregates(question, aggregates)
+            relevant_responses = []
+            if responses_count >= MIN_RESPONSES_FOR_DISCRIMINATION:
+                if all_student_total_scores_for_test is None and test_session_identifier:
+                    d_index = self._calculate_discrimination_index_in_db(
+                        db, question_id, test_session_identifier, group_fraction
+                    )
+                else:
+                    relevant_responses = self._get_response_rows_for_discrimination(
+                        db, question_id, test_session_identifier
+                    )
         else:
+            # Jalur cadangan untuk tipe soal yang tidak ditangani agregasi SQL
+            relevant_responses = self._get_responses_for_analysis(db, question_id, test_session_identifier)
             responses_count = len(relevant_responses)
             p_value = self.calculate_difficulty_index(question, relevant_responses)
 
-            # Hitung D-Index jika data skor total diberikan
-            d_index = None
+        if relevant_responses:
+            # Skor total dihitung di server jika tidak dikirim oleh klien
+            if all_student_total_scores_for_test is None and test_session_identifier:
+                all_student_total_scores_for_test = self.get_student_total_scores(db, test_session_identifier)
+
             if all_student_total_scores_for_test:
                 d_index = self.calculate_discrimination_index(
-                    question, relevant_responses, all_student_total_scores_for_test
+                    question, relevant_responses, all_student_total_scores_for_test, group_fraction
                 )
 
+        ci_stats = None
+        if ci and p_value is not None and aggregates is not None:
+            ci_stats = self._bootstrap_question_statistics(
+                db, question, test_session_identifier, all_student_total_scores_for_test, group_fraction
+            )
+
         analysis_data_in = schemas.ItemAnalysisResultBase(
             question_id=question_id,
             test_session_identifier=test_session_identifier,
             difficulty_index_p_value=p_value,
             discrimination_index=d_index,
             responses_analyzed_count=responses_count,
+            **self._confidence_interval_fields(ci_stats, 0, p_value, d_index),
         )
 
         analysis_result_orm = crud.item_analysis_result.create_or_update(db=db, obj_in=analysis_data_in)
@@ -183,6 +363,340 @@ class ItemAnalysisService:
 
         return schemas.ItemAnalysisResultRead.model_validate(analysis_result_orm)
     
+    def _compute_matrix_item_statistics(
+        self, matrix: SessionResponseMatrix, total_scores: np.ndarray,
+        group_fraction: float = DISCRIMINATION_GROUP_FRACTION
+    ) -> Dict[str, np.ndarray]:
+        """
+        Menghitung P-value, D-index dan jumlah respons untuk semua soal sekaligus
+        dari matriks respons sesi (tanpa loop per soal atau per siswa).
+        Aturan pengelompokan sama dengan `calculate_discrimination_index`.
+        """
+        answered = matrix.answered
+        correct = matrix.correct & answered
+        gradable = matrix.gradable
+
+        n_responses = answered.sum(axis=0)
+        n_correct = correct.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p_values = np.where(n_responses > 0, n_correct / np.maximum(n_responses, 1), np.nan)
+        p_values[~gradable] = np.nan
+
+        # Urutkan siswa berdasarkan skor total (menurun); seri dipecah berdasarkan student_identifier
+        order = np.lexsort((np.arange(matrix.n_students), -total_scores))
+        sorted_answered = answered[order]
+        sorted_correct = correct[order]
+
+        # Peringkat setiap siswa di antara siswa yang menjawab soal tersebut (1-based, per kolom)
+        rank = np.cumsum(sorted_answered, axis=0)
+        group_size = np.minimum(np.ceil(n_responses * group_fraction), n_responses // 2)
+        upper = sorted_answered & (rank <= group_size)
+        lower = sorted_answered & (rank > (n_responses - group_size))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pu = (sorted_correct & upper).sum(axis=0) / group_size
+            pl = (sorted_correct & lower).sum(axis=0) / group_size
+        d_index = pu - pl
+        d_index[~gradable | (n_responses < MIN_RESPONSES_FOR_DISCRIMINATION) | (group_size < 2)] = np.nan
+
+        return {
+            "responses_count": n_responses,
+            "p_values": p_values,
+            "d_index": d_index,
+            "option_counts": matrix.option_counts(),
+        }
+
+    def _compute_reliability_statistics(self, scores: np.ndarray) -> Dict[str, Any]:
+        """
+        Menghitung KR-20 / Cronbach's alpha, point-biserial terkoreksi dan alpha jika soal dihapus
+        untuk semua soal sekaligus dari matriks skor siswa x soal (0/1, tidak menjawab = 0).
+        Semua statistik item diturunkan dari varians item dan kovarians item-total,
+        sehingga cukup satu perkalian matriks O(siswa x soal).
+        """
+        n_students, n_items = scores.shape
+        totals = scores.sum(axis=1)
+        item_means = scores.mean(axis=0)
+        item_vars = scores.var(axis=0)
+        total_var = totals.var()
+        # Kovarians setiap soal dengan skor total
+        item_total_cov = (scores - item_means).T @ (totals - totals.mean()) / n_students
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            alpha = (n_items / (n_items - 1)) * (1 - item_vars.sum() / total_var) if n_items > 1 else np.nan
+
+            # Statistik terhadap skor total tanpa soal itu sendiri (T - X_i)
+            rest_var = total_var - 2 * item_total_cov + item_vars
+            point_biserial = (item_total_cov - item_vars) / np.sqrt(item_vars * rest_var)
+            if n_items > 2:
+                alpha_if_deleted = ((n_items - 1) / (n_items - 2)) * (1 - (item_vars.sum() - item_vars) / rest_var)
+            else:
+                alpha_if_deleted = np.full(n_items, np.nan)
+
+        score_std = float(np.sqrt(total_var))
+        return {
+            "cronbach_alpha": float(alpha),
+            "score_mean": float(totals.mean()) if n_students else np.nan,
+            "score_std": score_std,
+            "standard_error_of_measurement": score_std * np.sqrt(1 - alpha) if alpha <= 1 else np.nan,
+            "p_values": item_means,
+            "point_biserial": point_biserial,
+            "alpha_if_deleted": alpha_if_deleted,
+        }
+
+    def analyze_test_session_reliability(
+        self, db: Session, *, session_id: UUID, refresh: bool = False,
+        test_session_identifier: Optional[str] = None
+    ) -> schemas.TestReliabilityRead:
+        """
+        Mengambil hasil reliabilitas sebuah sesi ujian. Jika belum pernah dihitung atau `refresh`
+        bernilai True, reliabilitas dihitung ulang dari matriks respons sesi lalu disimpan.
+        Hanya soal yang dapat dinilai benar/salah yang ikut dihitung.
+        `test_session_identifier` menggantikan ID sesi sebagai identifier respons jika diberikan.
+        """
+        session = crud.test_session.get(db=db, id=session_id)
+        if not session:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test Session not found")
+
+        if not refresh:
+            existing = crud.test_reliability_result.get_by_session(
+                db, test_session_identifier=get_session_identifier(session, test_session_identifier)
+            )
+            if existing:
+                return schemas.TestReliabilityRead.model_validate(existing)
+
+        matrix = response_matrix_service.build_for_session(
+            db, session=session, test_session_identifier=test_session_identifier
+        )
+        require_session_responses(matrix)
+        gradable = matrix.gradable
+        if matrix.n_students < 2 or gradable.sum() < 2:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Reliabilitas membutuhkan minimal 2 siswa dan 2 soal yang dapat dinilai."
+            )
+        scores = (matrix.correct & matrix.answered)[:, gradable].astype(np.float64)
+        stats = self._compute_reliability_statistics(scores)
+
+        def _as_optional(value: float) -> Optional[float]:
+            return None if not np.isfinite(value) else round(float(value), 4)
+
+        gradable_question_ids = [q_id for q_id, is_gradable in zip(matrix.question_ids, gradable) if is_gradable]
+        result_orm = crud.test_reliability_result.upsert(db, values={
+            "test_session_identifier": matrix.test_session_identifier,
+            "students_count": matrix.n_students,
+            "items_count": len(gradable_question_ids),
+            "cronbach_alpha": _as_optional(stats["cronbach_alpha"]),
+            "score_mean": _as_optional(stats["score_mean"]),
+            "score_std": _as_optional(stats["score_std"]),
+            "standard_error_of_measurement": _as_optional(stats["standard_error_of_measurement"]),
+            "item_stats": [
+                {
+                    "question_id": str(question_id),
+                    "p_value": _as_optional(stats["p_values"][i]),
+                    "point_biserial": _as_optional(stats["point_biserial"][i]),
+                    "alpha_if_deleted": _as_optional(stats["alpha_if_deleted"][i]),
+                }
+                for i, question_id in enumerate(gradable_question_ids)
+            ],
+        })
+        return schemas.TestReliabilityRead.model_validate(result_orm)
+
+    def _bootstrap_item_statistics(
+        self, answered: np.ndarray, correct: np.ndarray, group_fraction: float,
+        replicates: int = BOOTSTRAP_REPLICATES
+    ) -> Dict[str, np.ndarray]:
+        """
+        Interval kepercayaan bootstrap persentil untuk P-value dan D-index semua soal.
+        Baris `answered`/`correct` harus sudah diurutkan dari skor total tertinggi.
+
+        Setiap replikasi menarik ulang siswa dengan pengembalian, direpresentasikan sebagai
+        bobot multinomial (berapa kali tiap siswa terambil). Siswa dibagi menjadi blok berurutan
+        berukuran ~sqrt(siswa); jumlah respons dan jawaban benar berbobot per blok dihitung untuk
+        semua replikasi sekaligus dengan perkalian matriks, lalu hanya blok yang memuat batas
+        kelompok atas/bawah setiap soal yang ditelusuri per siswa. Memori per potongan sebanding
+        dengan replikasi x soal x sqrt(siswa), bukan replikasi x siswa x soal.
+        """
+        n_students, n_items = answered.shape
+        rng = np.random.default_rng(BOOTSTRAP_SEED)
+        block = max(1, int(np.ceil(np.sqrt(n_students))))
+        n_blocks = -(-n_students // block)
+        padded = n_blocks * block
+        resp = np.zeros((padded, n_items))
+        resp[:n_students] = answered
+        hits = np.zeros((padded, n_items))
+        hits[:n_students] = correct & answered
+        resp_blocks = resp.reshape(n_blocks, block, n_items)
+        hits_blocks = hits.reshape(n_blocks, block, n_items)
+        p_reps = np.empty((replicates, n_items))
+        d_reps = np.empty((replicates, n_items))
+
+        # Elemen array per replikasi: bobot, jumlah per blok dan penelusuran satu blok per soal
+        per_replicate = padded + n_items * (4 * n_blocks + 4 * block)
+        chunk = max(1, _BOOTSTRAP_CHUNK_ELEMENTS // per_replicate)
+        cols = np.arange(n_items)
+        for start in range(0, replicates, chunk):
+            stop = min(start + chunk, replicates)
+            size = stop - start
+            weights = np.zeros((size, padded))
+            weights[:, :n_students] = rng.multinomial(n_students, np.full(n_students, 1.0 / n_students), size=size)
+            # (blok, replikasi, soal): jumlah berbobot per blok dan jumlah kumulatif sebelum blok tsb.
+            weight_blocks = weights.reshape(size, n_blocks, block).transpose(1, 0, 2)
+            resp_sums = weight_blocks @ resp_blocks
+            hit_sums = weight_blocks @ hits_blocks
+            resp_before = np.cumsum(resp_sums, axis=0) - resp_sums
+            hits_before = np.cumsum(hit_sums, axis=0) - hit_sums
+            n_responses = resp_before[-1] + resp_sums[-1]
+            n_hits = hits_before[-1] + hit_sums[-1]
+            group_size = np.minimum(np.ceil(n_responses * group_fraction), n_responses // 2)
+            rows = np.arange(size)[:, None]
+
+            def _hits_in_first(count: np.ndarray) -> np.ndarray:
+                """Jawaban benar di antara `count` respons berbobot teratas setiap (replikasi, soal)."""
+                k = np.minimum((resp_before + resp_sums < count).sum(axis=0), n_blocks - 1)
+                students = k[:, :, None] * block + np.arange(block)
+                units = weights[rows[:, :, None], students] * resp[students, cols[:, None]]
+                before = resp_before[k, rows, cols][:, :, None] + np.cumsum(units, axis=2) - units
+                partial = np.clip(count[:, :, None] - before, 0, units) * hits[students, cols[:, None]]
+                return hits_before[k, rows, cols] + partial.sum(axis=2)
+
+            upper = _hits_in_first(group_size)
+            lower = n_hits - _hits_in_first(n_responses - group_size)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                p_reps[start:stop] = n_hits / n_responses
+                d = (upper - lower) / group_size
+            d[(n_responses < MIN_RESPONSES_FOR_DISCRIMINATION) | (group_size < 2)] = np.nan
+            d_reps[start:stop] = d
+
+        tail = (1 - BOOTSTRAP_CI_LEVEL) / 2 * 100
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning) # Soal yang seluruh replikasinya NaN
+            p_ci = np.nanpercentile(p_reps, [tail, 100 - tail], axis=0)
+            d_ci = np.nanpercentile(d_reps, [tail, 100 - tail], axis=0)
+        return {"p_ci": p_ci, "d_ci": d_ci, "replicates": replicates}
+
+    def _confidence_interval_fields(
+        self, ci_stats: Optional[Dict[str, Any]], i: int, p_value: Optional[float], d_index: Optional[float]
+    ) -> Dict[str, Any]:
+        """
+        Field interval kepercayaan soal ke-i untuk ItemAnalysisResultBase.
+        Interval hanya diisi jika estimasi titiknya ada; tanpa `ci_stats` semua field dikosongkan.
+        """
+        def _bound(bounds: np.ndarray, k: int, estimate: Optional[float]) -> Optional[float]:
+            if ci_stats is None or estimate is None or np.isnan(bounds[k, i]):
+                return None
+            return round(float(bounds[k, i]), 4)
+
+        p_ci = ci_stats["p_ci"] if ci_stats else None
+        d_ci = ci_stats["d_ci"] if ci_stats else None
+        return {
+            "p_value_ci_lower": _bound(p_ci, 0, p_value),
+            "p_value_ci_upper": _bound(p_ci, 1, p_value),
+            "discrimination_ci_lower": _bound(d_ci, 0, d_index),
+            "discrimination_ci_upper": _bound(d_ci, 1, d_index),
+            "ci_replicates": ci_stats["replicates"] if ci_stats else None,
+        }
+
+    def analyze_test_session(
+        self, db: Session, *, session_id: UUID,
+        progress_callback: Optional[Callable[..., None]] = None,
+        group_fraction: float = DISCRIMINATION_GROUP_FRACTION,
+        ci: bool = False,
+        test_session_identifier: Optional[str] = None
+    ) -> schemas.TestSessionAnalysisRead:
+        """
+        Menganalisis semua soal dalam sebuah sesi ujian dalam satu kali jalan:
+        respons dimuat sekali, statistik dihitung secara vektor, dan semua
+        ItemAnalysisResult disimpan dalam satu transaksi.
+        `progress_callback(tahap_selesai, jumlah_tahap, {"stage": ...})` dipanggil di awal setiap tahap
+        (memuat matriks, statistik, bootstrap jika `ci=True`, penyimpanan) dan sekali lagi setelah selesai
+        (dipakai oleh worker). Perhitungannya vektor untuk semua soal, jadi progres tidak dilaporkan per soal.
+        Dengan `ci=True`, interval kepercayaan bootstrap P-value dan D-index ikut dihitung dan disimpan.
+        Respons dicari dengan ID sesi, atau dengan `test_session_identifier` jika diberikan;
+        sesi tanpa respons ditolak (404) sehingga tidak ada hasil analisis kosong yang disimpan.
+        """
+        validate_group_fraction(group_fraction)
+        session = crud.test_session.get(db=db, id=session_id)
+        if not session:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test Session not found")
+
+        stages = ["load_matrix", "statistics", *(["bootstrap"] if ci else []), "save_results"]
+
+        def _report(stage: str) -> None:
+            if progress_callback:
+                done = stages.index(stage) if stage in stages else len(stages)
+                progress_callback(done, len(stages), {"stage": stage})
+
+        _report("load_matrix")
+        matrix = response_matrix_service.build_for_session(
+            db, session=session, test_session_identifier=test_session_identifier
+        )
+        require_session_responses(matrix)
+        _report("statistics")
+        # Peringkat D-index memakai skor dari matriks yang sama dengan reliabilitas dan IRT:
+        # hanya soal sesi ini, dengan soal pilihan ganda dinilai ulang dari kunci jawaban
+        total_scores = matrix.total_scores()
+        stats = self._compute_matrix_item_statistics(matrix, total_scores, group_fraction)
+
+        def _as_optional(value: float) -> Optional[float]:
+            return None if np.isnan(value) else round(float(value), 4)
+
+        ci_stats = None
+        if ci and matrix.n_students > 0:
+            _report("bootstrap")
+            order = np.lexsort((np.arange(matrix.n_students), -total_scores))
+            ci_stats = self._bootstrap_item_statistics(
+                matrix.answered[order], matrix.correct[order], group_fraction
+            )
+
+        analyses_in: List[schemas.ItemAnalysisResultBase] = []
+        for i, question_id in enumerate(matrix.question_ids):
+            p_value = _as_optional(stats["p_values"][i])
+            d_index = _as_optional(stats["d_index"][i])
+            analyses_in.append(schemas.ItemAnalysisResultBase(
+                question_id=question_id,
+                test_session_identifier=matrix.test_session_identifier,
+                difficulty_index_p_value=p_value,
+                discrimination_index=d_index,
+                responses_analyzed_count=int(stats["responses_count"][i]),
+                **self._confidence_interval_fields(ci_stats, i, p_value, d_index),
+            ))
+        _report("save_results")
+        results_orm = crud.item_analysis_result.upsert_many(db=db, objs_in=analyses_in)
+        _report("done")
+
+        options_stats: List[schemas.QuestionOptionStatsRead] = []
+        for i, question in enumerate(session.questions):
+            if question.question_type != "multiple_choice":
+                continue
+            total = int(stats["responses_count"][i])
+            counts = stats["option_counts"][i]
+            options_by_id = {opt.id: opt for opt in question.answer_options}
+            options_stats.append(schemas.QuestionOptionStatsRead(
+                question_id=question.id,
+                question_content=question.content,
+                question_type=question.question_type,
+                total_responses_for_question=total,
+                options_stats=[
+                    schemas.OptionStatData(
+                        option_id=option_id,
+                        option_text=options_by_id[option_id].option_text,
+                        is_correct=options_by_id[option_id].is_correct,
+                        selection_count=int(counts[k]),
+                        selection_percentage=round(int(counts[k]) / total * 100, 2) if total > 0 else 0.0
+                    )
+                    for k, option_id in enumerate(matrix.option_ids[i], start=1)
+                ]
+            ))
+
+        return schemas.TestSessionAnalysisRead(
+            test_session_id=session.id,
+            test_session_identifier=matrix.test_session_identifier,
+            students_analyzed_count=matrix.n_students,
+            items_analyzed_count=matrix.n_items,
+            results=[schemas.ItemAnalysisResultRead.model_validate(res) for res in results_orm],
+            options_stats=options_stats
+        )
+
     def get_question_option_statistics(
         self, db: Session, question_id: UUID
     ) -> schemas.QuestionOptionStatsRead: # Menggunakan skema yang baru dibuat
@@ -197,8 +711,9 @@ class ItemAnalysisService:
         if question.question_type != "multiple_choice":
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Option statistics are only available for multiple-choice questions.")
 
-        student_responses = db.query(StudentResponse).filter(StudentResponse.question_id == question_id).all()
-        total_responses_for_question = len(student_responses)
+        aggregates = self._get_response_aggregates(db, question)
+        total_responses_for_question = aggregates["responses_count"]
+        selection_counts = aggregates["option_counts"]
 
         options_stats_data: List[schemas.OptionStatData] = []
 
@@ -212,10 +727,7 @@ class ItemAnalysisService:
             )
 
         for option in question.answer_options:
-            selection_count = 0
-            for response in student_responses:
-                if response.selected_option_id == option.id:
-                    selection_count += 1
+            selection_count = selection_counts.get(option.id, 0)
             
             selection_percentage = (
                 round((selection_count / total_responses_for_question) * 100, 2)
@@ -0,0 +1,339 @@
+# backend/app/services/response_matrix.py
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import uuid
+from typing import List, Dict, Optional
+from uuid import UUID
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.student_response import StudentResponse
+from app.models.test_session import TestSession
+
+# Tipe soal yang bisa dinilai benar/salah secara otomatis untuk analisis item
+GRADABLE_QUESTION_TYPES = ("multiple_choice", "essay", "short_answer")
+
+# Panjang kolom student_responses.test_session_identifier
+SESSION_IDENTIFIER_MAX_LENGTH = 100
+
+
+def validate_session_identifier(test_session_identifier: Optional[str]) -> Optional[str]:
+    """Memastikan `test_session_identifier` dari pengguna muat di kolomnya."""
+    if test_session_identifier is not None and len(test_session_identifier) > SESSION_IDENTIFIER_MAX_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"test_session_identifier maksimal {SESSION_IDENTIFIER_MAX_LENGTH} karakter."
+        )
+    return test_session_identifier
+
+
+def get_session_identifier(session: TestSession, test_session_identifier: Optional[str] = None) -> str:
+    """
+    Nilai `test_session_identifier` yang dipakai oleh respons siswa dari sebuah sesi ujian.
+    Konvensinya adalah ID sesi dalam bentuk string: template lembar jawaban (format panjang maupun
+    lebar) sudah mengisi kolom `test_session_identifier` dengan nilai ini. Respons yang diupload
+    dengan label lain dapat dianalisis dengan memberikan `test_session_identifier` secara eksplisit.
+    """
+    validate_session_identifier(test_session_identifier)
+    if test_session_identifier and test_session_identifier.strip():
+        return test_session_identifier.strip()
+    return str(session.id)
+
+
+def require_session_responses(matrix: "SessionResponseMatrix") -> None:
+    """
+    Menolak analisis sesi yang tidak memiliki respons sama sekali (404), agar identifier yang
+    tidak cocok tidak menghasilkan hasil analisis kosong yang tampak valid.
+    """
+    if matrix.n_students == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=(
+                f"Tidak ada respons siswa dengan test_session_identifier '{matrix.test_session_identifier}'. "
+                "Periksa kolom test_session_identifier pada file respons atau berikan identifier-nya secara eksplisit."
+            )
+        )
+
+
+class SessionResponseMatrix:
+    """
+    Representasi padat seluruh respons satu sesi ujian dalam bentuk matriks NumPy.
+    Baris adalah siswa (urut berdasarkan student_identifier), kolom adalah soal
+    (urut sesuai daftar soal pada sesi).
+
+    * `answered[s, i]`     : siswa s menjawab soal i
+    * `correct[s, i]`      : jawaban siswa s untuk soal i benar
+    * `option_index[s, i]` : nomor opsi yang dipilih (1-based, sesuai `option_ids[i]`), 0 jika tidak memilih opsi
+
+    `answered` dan `correct` dapat disimpan dalam bentuk bit-packed (8 soal per byte, lihat
+    `answered_bits`/`correct_bits`) dan baru dibuka menjadi array bool saat pertama kali diakses.
+    """
+    def __init__(
+        self,
+        *,
+        test_session_identifier: str,
+        student_identifiers: List[str],
+        question_ids: List[UUID],
+        question_types: List[str],
+        option_ids: List[List[UUID]],
+        option_index: np.ndarray,
+        answered: Optional[np.ndarray] = None,
+        correct: Optional[np.ndarray] = None,
+        answered_bits: Optional[np.ndarray] = None,
+        correct_bits: Optional[np.ndarray] = None,
+    ):
+        self.test_session_identifier = test_session_identifier
+        self.student_identifiers = student_identifiers
+        self.question_ids = question_ids
+        self.question_types = question_types
+        self.option_ids = option_ids
+        self.option_index = option_index
+        self._answered = answered
+        self._correct = correct
+        self._answered_bits = answered_bits
+        self._correct_bits = correct_bits
+
+    def _unpack(self, bits: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bits, axis=1, count=self.n_items).view(bool)
+
+    @property
+    def answered(self) -> np.ndarray:
+        if self._answered is None:
+            self._answered = self._unpack(self._answered_bits)
+        return self._answered
+
+    @property
+    def correct(self) -> np.ndarray:
+        if self._correct is None:
+            self._correct = self._unpack(self._correct_bits)
+        return self._correct
+
+    @property
+    def answered_bits(self) -> np.ndarray:
+        if self._answered_bits is None:
+            self._answered_bits = np.packbits(self._answered, axis=1)
+        return self._answered_bits
+
+    @property
+    def correct_bits(self) -> np.ndarray:
+        if self._correct_bits is None:
+            self._correct_bits = np.packbits(self._correct, axis=1)
+        return self._correct_bits
+
+    @property
+    def n_students(self) -> int:
+        return len(self.student_identifiers)
+
+    @property
+    def n_items(self) -> int:
+        return len(self.question_ids)
+
+    @property
+    def gradable(self) -> np.ndarray:
+        """Mask soal yang P-value-nya bisa dihitung otomatis."""
+        return np.array([t in GRADABLE_QUESTION_TYPES for t in self.question_types], dtype=bool)
+
+    def total_scores(self) -> np.ndarray:
+        """Skor total (jumlah jawaban benar) setiap siswa pada sesi ini."""
+        return self.correct.sum(axis=1, dtype=np.int64)
+
+    def option_counts(self) -> np.ndarray:
+        """
+        Jumlah pemilih setiap opsi untuk semua soal sekaligus, bentuk (n_items, max_options + 1).
+        Kolom 0 adalah respons tanpa opsi terpilih.
+        """
+        width = max((len(opts) for opts in self.option_ids), default=0) + 1
+        item_idx = np.broadcast_to(np.arange(self.n_items), self.option_index.shape)
+        codes = item_idx[self.answered] * width + self.option_index[self.answered]
+        return np.bincount(codes, minlength=self.n_items * width).reshape(self.n_items, width)
+
+
+class ResponseMatrixCache:
+    """
+    Cache matriks respons sesi di disk dalam bentuk file .npy yang dibuka dengan memory-map.
+    Setiap sesi punya satu direktori `<root>/<sha1(test_session_identifier)>/<key>/`, dengan `key`
+    diturunkan dari susunan soal/kunci jawaban dan watermark respons (jumlah dan waktu respons terakhir).
+    Jika ada respons baru atau soal sesi berubah, key berubah dan matriks dibangun ulang.
+    Nama direktori sesi selalu berupa hash, tidak pernah identifier mentah dari pengguna.
+    """
+    _ARRAYS = ("answered_bits", "correct_bits", "option_index")
+    # Key cache adalah hex sha1; hanya entri dengan pola ini yang boleh dihapus saat membersihkan versi lama
+    _KEY_PATTERN = re.compile(r"[0-9a-f]{40}")
+
+    def __init__(self, root: Optional[str]):
+        self.root = root
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root)
+
+    def _session_dir(self, test_session_identifier: str) -> str:
+        digest = hashlib.sha1(test_session_identifier.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, digest)
+
+    def load(self, *, test_session_identifier: str, key: str, layout: Dict[str, list]) -> Optional[SessionResponseMatrix]:
+        """Membuka matriks dari cache (zero-copy via memory-map). Mengembalikan None jika belum ada."""
+        path = os.path.join(self._session_dir(test_session_identifier), key)
+        try:
+            arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in self._ARRAYS}
+            student_identifiers = np.load(os.path.join(path, "student_identifiers.npy"))
+        except (FileNotFoundError, ValueError):
+            return None
+        return SessionResponseMatrix(
+            test_session_identifier=test_session_identifier,
+            student_identifiers=[identifier.decode("utf-8") for identifier in student_identifiers.tolist()],
+            **layout,
+            **arrays,
+        )
+
+    def store(self, matrix: SessionResponseMatrix, *, key: str) -> None:
+        """
+        Menulis matriks ke cache. File ditulis ke direktori sementara lalu di-rename,
+        sehingga proses lain tidak pernah membaca cache yang setengah jadi. Versi lama dihapus.
+        """
+        session_dir = self._session_dir(matrix.test_session_identifier)
+        os.makedirs(session_dir, exist_ok=True)
+        tmp_path = os.path.join(session_dir, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_path)
+        try:
+            for name in self._ARRAYS:
+                np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(getattr(matrix, name)))
+            np.save(
+                os.path.join(tmp_path, "student_identifiers.npy"),
+                np.array([identifier.encode("utf-8") for identifier in matrix.student_identifiers], dtype=bytes)
+            )
+            os.rename(tmp_path, os.path.join(session_dir, key))
+        except OSError:
+            # Versi yang sama sudah ditulis proses lain, atau disk tidak bisa ditulisi; cache bersifat opsional
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return
+        for entry in os.listdir(session_dir):
+            if entry != key and self._KEY_PATTERN.fullmatch(entry):
+                shutil.rmtree(os.path.join(session_dir, entry), ignore_errors=True)
+
+
+class ResponseMatrixService:
+    def __init__(self, cache: Optional[ResponseMatrixCache] = None):
+        self.cache = cache
+
+    def _get_cache_key(
+        self, db: Session, *, test_session_identifier: str, question_ids: List[UUID],
+        question_types: List[str], option_ids: List[List[UUID]], correct_option_ids: List[Optional[UUID]]
+    ) -> str:
+        """
+        Key cache dari susunan soal, kunci jawaban dan watermark respons sesi.
+        Watermark (jumlah respons dan waktu respons terakhir) dibaca dengan satu query agregat.
+        """
+        responses_count, last_submitted_at = (
+            db.query(func.count(StudentResponse.id), func.max(StudentResponse.submitted_at))
+            .filter(
+                StudentResponse.test_session_identifier == test_session_identifier,
+                StudentResponse.question_id.in_(question_ids),
+            )
+            .one()
+        )
+        fingerprint = json.dumps([
+            [str(q_id), q_type, [str(opt_id) for opt_id in opts], str(key) if key else None]
+            for q_id, q_type, opts, key in zip(question_ids, question_types, option_ids, correct_option_ids)
+        ] + [responses_count, last_submitted_at.isoformat() if last_submitted_at else None])
+        return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+    def build_for_session(
+        self, db: Session, *, session: TestSession, test_session_identifier: Optional[str] = None
+    ) -> SessionResponseMatrix:
+        """
+        Memuat seluruh respons sebuah sesi ujian dalam satu query (hanya kolom yang diperlukan,
+        tanpa objek ORM) dan menyusunnya menjadi matriks siswa x soal.
+        Jika cache aktif dan belum ada respons baru sejak matriks terakhir dibangun,
+        matriks dibaca langsung dari cache tanpa memuat ulang respons dari database.
+        Respons dicari dengan `test_session_identifier` jika diberikan, selain itu dengan ID sesi.
+        """
+        test_session_identifier = get_session_identifier(session, test_session_identifier)
+        questions = list(session.questions)
+        question_ids = [q.id for q in questions]
+        question_pos: Dict[UUID, int] = {q_id: i for i, q_id in enumerate(question_ids)}
+
+        option_ids: List[List[UUID]] = []
+        option_pos: List[Dict[UUID, int]] = []
+        correct_option_ids: List[Optional[UUID]] = []
+        for question in questions:
+            ordered = sorted(
+                question.answer_options,
+                key=lambda opt: (opt.display_order is None, opt.display_order or 0)
+            )
+            option_ids.append([opt.id for opt in ordered])
+            option_pos.append({opt.id: k for k, opt in enumerate(ordered, start=1)})
+            correct_option_ids.append(
+                next((opt.id for opt in ordered if opt.is_correct), None)
+                if question.question_type == "multiple_choice" else None
+            )
+
+        question_types = [q.question_type for q in questions]
+        layout = {"question_ids": question_ids, "question_types": question_types, "option_ids": option_ids}
+        cache_key = None
+        if self.cache and self.cache.enabled and question_ids:
+            cache_key = self._get_cache_key(
+                db, test_session_identifier=test_session_identifier, correct_option_ids=correct_option_ids, **layout
+            )
+            cached = self.cache.load(test_session_identifier=test_session_identifier, key=cache_key, layout=layout)
+            if cached is not None:
+                return cached
+
+        rows = []
+        if question_ids:
+            rows = (
+                db.query(
+                    StudentResponse.student_identifier,
+                    StudentResponse.question_id,
+                    StudentResponse.selected_option_id,
+                    StudentResponse.is_response_correct,
+                )
+                .filter(
+                    StudentResponse.test_session_identifier == test_session_identifier,
+                    StudentResponse.question_id.in_(question_ids),
+                )
+                .all()
+            )
+
+        student_identifiers = sorted({row.student_identifier for row in rows})
+        student_pos = {identifier: s for s, identifier in enumerate(student_identifiers)}
+
+        shape = (len(student_identifiers), len(question_ids))
+        answered = np.zeros(shape, dtype=bool)
+        correct = np.zeros(shape, dtype=bool)
+        option_index = np.zeros(shape, dtype=np.uint8)
+
+        for row in rows:
+            s = student_pos[row.student_identifier]
+            i = question_pos[row.question_id]
+            answered[s, i] = True
+            if questions[i].question_type == "multiple_choice":
+                k = option_pos[i].get(row.selected_option_id, 0)
+                option_index[s, i] = k
+                key = correct_option_ids[i]
+                correct[s, i] = key is not None and row.selected_option_id == key
+            else:
+                correct[s, i] = row.is_response_correct is True
+
+        matrix = SessionResponseMatrix(
+            test_session_identifier=test_session_identifier,
+            student_identifiers=student_identifiers,
+            answered=answered,
+            correct=correct,
+            option_index=option_index,
+            **layout,
+        )
+        if cache_key and matrix.n_students:
+            self.cache.store(matrix, key=cache_key)
+        return matrix
+
+
+response_matrix_service = ResponseMatrixService(cache=ResponseMatrixCache(settings.RESPONSE_MATRIX_CACHE_DIR))
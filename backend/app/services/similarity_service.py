@@ -0,0 +1,152 @@
+# backend/app/services/similarity_service.py
+
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.services.response_matrix import response_matrix_service, SessionResponseMatrix, require_session_responses
+
+DEFAULT_Z_THRESHOLD = 4.5
+DEFAULT_MIN_IDENTICAL_WRONG = 3
+_BLOCK_ROWS = 1024 # Jumlah siswa per blok perbandingan (blok x siswa skor float32 per langkah)
+
+
+def wrong_answer_features(matrix: SessionResponseMatrix) -> Dict[str, Any]:
+    """
+    Menyusun representasi pengecoh yang dipilih setiap siswa pada soal pilihan ganda.
+
+    * `selected[s, k]` : siswa s memilih pengecoh k (kolom = pasangan soal x opsi salah)
+    * `wrong[s, i]`    : siswa s memilih salah satu pengecoh soal i
+    * `match_prob[i]`  : peluang dua siswa yang sama-sama salah pada soal i memilih pengecoh yang sama
+      secara kebetulan, yaitu jumlah kuadrat popularitas pengecoh di antara penjawab salah soal i.
+      Kecocokan pada pengecoh populer dianggap wajar, pada pengecoh yang jarang dipilih mencurigakan.
+    """
+    is_mc = np.array([t == "multiple_choice" for t in matrix.question_types], dtype=bool)
+    option_index = matrix.option_index[:, is_mc]
+    wrong = matrix.answered[:, is_mc] & ~matrix.correct[:, is_mc] & (option_index > 0)
+    width = int(matrix.option_index.max(initial=0)) + 1
+    n_students, n_items = wrong.shape
+
+    student_idx, item_idx = np.nonzero(wrong)
+    columns = item_idx * width + option_index[student_idx, item_idx]
+    used_columns, column_idx = np.unique(columns, return_inverse=True)
+    column_item = used_columns // width
+
+    selected = np.zeros((n_students, len(used_columns)), dtype=bool)
+    selected[student_idx, column_idx] = True
+
+    share = selected.sum(axis=0) / wrong.sum(axis=0)[column_item]
+    match_prob = np.bincount(column_item, weights=share ** 2, minlength=n_items)
+    return {"selected": selected, "wrong": wrong, "match_prob": match_prob, "mc_mask": is_mc, "items_count": n_items}
+
+
+def find_similar_pairs(features: Dict[str, Any], z_threshold: float, min_identical_wrong: int, limit: int) -> Dict[str, Any]:
+    """
+    Mencari pasangan siswa yang memilih pengecoh yang sama lebih sering dari yang diharapkan.
+
+    Untuk pasangan (a, b): jumlah jawaban salah identik = selected_a . selected_b, dengan nilai harapan
+    sum(match_prob) dan varians sum(match_prob * (1 - match_prob)) atas soal yang sama-sama dijawab salah,
+    yang juga berbentuk perkalian dalam (wrong * match_prob) . wrong. Seluruh pasangan dalam satu blok
+    siswa dihitung dengan tiga perkalian matriks, dan hanya setengah atas matriks pasangan yang diperiksa.
+    Siswa dengan jawaban salah kurang dari `min_identical_wrong` dipangkas sebelum perbandingan.
+    """
+    selected = features["selected"]
+    n_students = selected.shape[0]
+    n_pairs = n_students * (n_students - 1) // 2
+
+    candidates = np.nonzero(features["wrong"].sum(axis=1) >= max(min_identical_wrong, 1))[0]
+    x = selected[candidates].astype(np.float32)
+    wrong = features["wrong"][candidates].astype(np.float32)
+    match_prob = features["match_prob"].astype(np.float32)
+    wrong_mean = wrong * match_prob
+    wrong_var = wrong * (match_prob * (1 - match_prob))
+
+    found: List[np.ndarray] = []
+    for start in range(0, len(candidates), _BLOCK_ROWS):
+        stop = start + _BLOCK_ROWS
+        identical = x[start:stop] @ x[start:].T
+        expected = wrong_mean[start:stop] @ wrong[start:].T
+        variance = wrong_var[start:stop] @ wrong[start:].T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z_scores = (identical - expected) / np.sqrt(variance)
+        rows, cols = np.nonzero((z_scores >= z_threshold) & (identical >= min_identical_wrong))
+        upper = cols > rows # Hanya pasangan j > i (setengah atas) dan bukan diri sendiri
+        rows, cols = rows[upper], cols[upper]
+        found.append(np.column_stack([
+            candidates[start + rows], candidates[start + cols],
+            identical[rows, cols], expected[rows, cols], z_scores[rows, cols],
+        ]))
+
+    pairs = np.concatenate(found) if found else np.empty((0, 5))
+    order = np.argsort(-pairs[:, 4], kind="stable")[:limit]
+    return {
+        "pairs_compared": n_pairs,
+        "candidates_count": len(candidates),
+        "pairs": [
+            {
+                "a": int(pairs[k, 0]), "b": int(pairs[k, 1]),
+                "identical_wrong": int(round(pairs[k, 2])), "expected": float(pairs[k, 3]), "z_score": float(pairs[k, 4]),
+            }
+            for k in order
+        ],
+    }
+
+
+class SimilarityService:
+    def detect_similar_responses(
+        self, db: Session, *, session_id: UUID, z_threshold: float = DEFAULT_Z_THRESHOLD,
+        min_identical_wrong: int = DEFAULT_MIN_IDENTICAL_WRONG, limit: int = 100,
+        test_session_identifier: Optional[str] = None
+    ) -> schemas.SessionSimilarityRead:
+        """
+        Mendeteksi pasangan siswa dalam satu sesi ujian yang memilih pengecoh (jawaban salah)
+        yang sama secara tidak wajar. Pasangan ditandai jika skor kemiripannya minimal
+        `z_threshold` simpangan baku di atas nilai harapannya (mengingat soal-soal yang sama-sama
+        dijawab salah) dan memiliki minimal `min_identical_wrong` jawaban salah identik.
+        """
+        session = crud.test_session.get(db=db, id=session_id)
+        if not session:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test Session not found")
+
+        matrix = response_matrix_service.build_for_session(
+            db, session=session, test_session_identifier=test_session_identifier
+        )
+        require_session_responses(matrix)
+        features = wrong_answer_features(matrix)
+        result = find_similar_pairs(features, z_threshold, min_identical_wrong, limit)
+
+        mc_mask = features["mc_mask"]
+        answered = matrix.answered[:, mc_mask]
+        option_index = matrix.option_index[:, mc_mask]
+        flagged_pairs = []
+        for pair in result["pairs"]:
+            a, b = pair["a"], pair["b"]
+            both_answered = answered[a] & answered[b]
+            flagged_pairs.append(schemas.SimilarPairRead(
+                student_identifier_a=matrix.student_identifiers[a],
+                student_identifier_b=matrix.student_identifiers[b],
+                expected_identical_wrong=round(pair["expected"], 4),
+                z_score=round(pair["z_score"], 4),
+                identical_wrong_count=pair["identical_wrong"],
+                identical_answer_count=int((both_answered & (option_index[a] == option_index[b])).sum()),
+                common_items_count=int(both_answered.sum()),
+            ))
+
+        return schemas.SessionSimilarityRead(
+            test_session_id=session.id,
+            test_session_identifier=matrix.test_session_identifier,
+            students_count=matrix.n_students,
+            items_count=features["items_count"],
+            pairs_compared=result["pairs_compared"],
+            candidate_students_count=result["candidates_count"],
+            z_threshold=z_threshold,
+            min_identical_wrong=min_identical_wrong,
+            flagged_pairs=flagged_pairs,
+        )
+
+
+similarity_service = SimilarityService()
@@ -1,53 +1,149 @@
 # backend/app/services/template_service.py
 
-import io
-import csv
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
 from fastapi.responses import StreamingResponse
 from uuid import UUID
-from app import crud
+from app.db.session import SessionLocal
+from app.models.answer_option import AnswerOption
+from app.models.question import Question
+from app.models.roster import Student
+from app.models.test_session import TestSession, test_session_questions
+from app.services.csv_stream import csv_streaming_response
+
+# Penanda baris referensi pada lembar jawaban format lebar; baris yang diawali tanda ini diabaikan saat upload
+WIDE_REFERENCE_ROW_MARKER = "#"
+# Kolom lembar jawaban format panjang (satu baris per siswa x soal) yang dibaca kembali saat upload
+QUESTION_ID_COLUMN = 'question_id (jangan diubah)'
+ANSWER_COLUMN = 'answer (diisi oleh guru)'
+_FETCH_SIZE = 1000 # Jumlah baris per pengambilan dari server-side cursor
+
+def _iter_roster_student_identifiers(db: Session, roster_id: UUID) -> Iterator[str]:
+    """Identifier siswa dalam roster, terurut, dibaca bertahap melalui server-side cursor."""
+    query = (
+        db.query(Student.student_identifier)
+        .filter(Student.roster_id == roster_id)
+        .order_by(Student.student_identifier)
+        .yield_per(_FETCH_SIZE)
+    )
+    for (student_identifier,) in query:
+        yield student_identifier
+
+def _iter_session_questions(db: Session, session_id: UUID) -> Iterator[Tuple[UUID, str]]:
+    """Pasangan (ID, konten) soal dalam sesi ujian, dibaca bertahap melalui server-side cursor."""
+    query = (
+        db.query(Question.id, Question.content)
+        .join(test_session_questions, test_session_questions.c.question_id == Question.id)
+        .filter(test_session_questions.c.test_session_id == session_id)
+        .order_by(Question.created_at, Question.id)
+        .yield_per(_FETCH_SIZE)
+    )
+    for question_id, content in query:
+        yield question_id, content
+
+def _get_session_option_texts(db: Session, session_id: UUID) -> Dict[UUID, List[str]]:
+    """Teks opsi jawaban per soal dalam sesi ujian, untuk baris referensi format lebar."""
+    query = (
+        db.query(AnswerOption.question_id, AnswerOption.option_text)
+        .join(test_session_questions, test_session_questions.c.question_id == AnswerOption.question_id)
+        .filter(test_session_questions.c.test_session_id == session_id)
+        .order_by(AnswerOption.question_id, AnswerOption.display_order, AnswerOption.id)
+        .yield_per(_FETCH_SIZE)
+    )
+    option_texts: Dict[UUID, List[str]] = {}
+    for question_id, option_text in query:
+        option_texts.setdefault(question_id, []).append(option_text)
+    return option_texts
 
 class TemplateService:
-    def generate_answer_sheet_template(self, db: Session, *, session_id: UUID) -> StreamingResponse:
-        session = crud.test_session.get(db, id=session_id)
+    def generate_answer_sheet_template(self, db: Session, *, session_id: UUID, layout: str = "long") -> Optional[StreamingResponse]:
+        """
+        Template lembar jawaban yang ditulis sambil dikirim: siswa dan soal dibaca melalui
+        server-side cursor oleh generator dengan sesi database sendiri, sehingga unduhan langsung
+        dimulai dan memori tetap datar berapa pun ukuran roster dan sesi ujiannya.
+        Di sini hanya keberadaan sesi ujian yang diperiksa agar 404 dapat dikembalikan sebelum streaming.
+        """
+        session = (
+            db.query(TestSession.id, TestSession.name, TestSession.roster_id)
+            .filter(TestSession.id == session_id)
+            .first()
+        )
         if not session: return None
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        headers = ["student_identifier", "question_id (jangan diubah)", "question_content (referensi)", "answer (diisi guru)"]
-        writer.writerow(headers)
-
-        if session.roster and session.roster.students:
-            sorted_students = sorted(session.roster.students, key=lambda s: s.student_identifier)
-            for student in sorted_students:
-                for question in session.questions:
-                    row = [student.student_identifier, question.id, question.content, ""]
-                    writer.writerow(row)
-        else:
-            for question in session.questions:
-                row = ["", question.id, question.content, ""]
-                writer.writerow(row)
-            
-        output.seek(0)
-        
-        response = StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv"
+        filename_suffix = session.name.replace(' ', '_')
+        if layout == "wide":
+            return csv_streaming_response(
+                self._iter_wide_answer_sheet_rows(session.id, session.roster_id),
+                filename=f"template_jawaban_lebar_{filename_suffix}.csv"
+            )
+        return csv_streaming_response(
+            self._iter_answer_sheet_rows(session.id, session.roster_id),
+            filename=f"template_jawaban_{filename_suffix}.csv"
         )
-        response.headers["Content-Disposition"] = f"attachment; filename=template_jawaban_{session.name.replace(' ', '_')}.csv"
-        return response
-    
+
+    def _iter_answer_sheet_rows(self, session_id: UUID, roster_id: Optional[UUID]) -> Iterator[Sequence[Any]]:
+        """
+        Lembar jawaban format panjang: satu baris per siswa x soal. Kolom `test_session_identifier`
+        sudah diisi ID sesi, yaitu identifier yang dipakai analisis sesi ujian untuk mencari respons.
+        """
+        db = SessionLocal()
+        try:
+            session_identifier = str(session_id)
+            yield [
+                "student_identifier", "test_session_identifier", QUESTION_ID_COLUMN,
+                "question_content (referensi)", ANSWER_COLUMN
+            ]
+            if roster_id is None:
+                for question_id, content in _iter_session_questions(db, session_id):
+                    yield ["", session_identifier, question_id, content, ""]
+                return
+
+            # Soal diulang untuk setiap siswa, jadi hanya (ID, konten) soal yang disimpan di memori
+            questions = list(_iter_session_questions(db, session_id))
+            has_students = False
+            for student_identifier in _iter_roster_student_identifiers(db, roster_id):
+                has_students = True
+                for question_id, content in questions:
+                    yield [student_identifier, session_identifier, question_id, content, ""]
+            if not has_students:
+                for question_id, content in questions:
+                    yield ["", session_identifier, question_id, content, ""]
+        finally:
+            db.close()
+
+    def _iter_wide_answer_sheet_rows(self, session_id: UUID, roster_id: Optional[UUID]) -> Iterator[Sequence[Any]]:
+        """
+        Lembar jawaban format lebar: satu baris per siswa dan satu kolom per soal.
+        Header berisi ID soal sebagai nama kolom; baris kedua (diawali '#') hanya referensi
+        nomor, konten dan opsi jawaban soal, dan diabaikan saat file di-upload kembali.
+        """
+        db = SessionLocal()
+        try:
+            questions = list(_iter_session_questions(db, session_id))
+            option_texts = _get_session_option_texts(db, session_id)
+            session_identifier = str(session_id)
+
+            yield ["student_identifier", "test_session_identifier", *[str(question_id) for question_id, _ in questions]]
+            reference = [f"{WIDE_REFERENCE_ROW_MARKER} referensi soal (baris ini diabaikan)", ""]
+            for number, (question_id, content) in enumerate(questions, start=1):
+                label = f"{number}. {content}"
+                if question_id in option_texts:
+                    label += " [Opsi: " + " | ".join(option_texts[question_id]) + "]"
+                reference.append(label)
+            yield reference
+
+            empty_answers = [""] * len(questions)
+            has_students = False
+            if roster_id is not None:
+                for student_identifier in _iter_roster_student_identifiers(db, roster_id):
+                    has_students = True
+                    yield [student_identifier, session_identifier, *empty_answers]
+            if not has_students:
+                yield ["", session_identifier, *empty_answers]
+        finally:
+            db.close()
+
     def generate_roster_template(self) -> StreamingResponse:
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["student_identifier"])
-        writer.writerow(["ContohSiswa01"])
-        writer.writerow(["ContohSiswa02"])
-        output.seek(0)
-
-        response = StreamingResponse(iter([output.getvalue()]), media_type="text/csv")
-        response.headers["Content-Disposition"] = "attachment; filename=template_daftar_siswa.csv"
-        return response
-
-template_service = TemplateService()
\ No newline at end of file
+        rows = [["student_identifier"], ["ContohSiswa01"], ["ContohSiswa02"]]
+        return csv_streaming_response(rows, filename="template_daftar_siswa.csv")
+
+template_service = TemplateService()
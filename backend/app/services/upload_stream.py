@@ -0,0 +1,190 @@
+# backend/app/services/upload_stream.py
+
+import csv
+import io
+import json
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import UploadFile, HTTPException, status
+
+_JSON_READ_CHUNK = 64 * 1024
+_JSON_WHITESPACE = " \t\n\r"
+_SUPPORTED_CONTENT_TYPES = ("application/json", "text/csv")
+
+
+class UploadParseError(ValueError):
+    """Isi file tidak dapat di-parse di tengah proses streaming (misalnya JSON terpotong)."""
+    def __init__(self, message: str, row_number: int = 0):
+        super().__init__(message)
+        self.row_number = row_number
+
+
+# Literal JSON (termasuk ekstensi yang diterima modul json) dan karakter angka yang bisa terpotong di ujung buffer
+_JSON_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+_JSON_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+def _is_number_tail(rest: str) -> bool:
+    """True jika `rest` (sampai ujung buffer) bisa jadi lanjutan angka yang terpotong, mis. '.' dari '0.5'."""
+    return bool(rest) and all(char in _JSON_NUMBER_CHARS for char in rest)
+
+
+def _is_truncated(error: json.JSONDecodeError, buffer: str) -> bool:
+    """
+    True jika error decode bisa jadi hanya karena nilai terpotong di ujung buffer, sehingga
+    perlu memuat potongan berikutnya. Error di tengah buffer adalah JSON yang memang rusak.
+    """
+    rest = buffer[error.pos:]
+    if error.msg.startswith("Unterminated string"):
+        return True # Tidak ada tanda kutip penutup hingga ujung buffer
+    if error.msg.startswith("Invalid \\"):
+        return len(rest) < 6 # Escape (mis. \uXXXX) terpotong
+    if error.msg == "Expecting value":
+        return any(literal.startswith(rest) for literal in _JSON_LITERALS) or _is_number_tail(rest)
+    return not rest.strip(_JSON_WHITESPACE) or _is_number_tail(rest)
+
+
+def _text_stream(binary: BinaryIO) -> io.TextIOWrapper:
+    # utf-8-sig agar BOM dari file yang disimpan Excel tidak ikut menjadi nama kolom pertama
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+def iter_csv_rows(binary: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Membaca baris CSV satu per satu dari file biner tanpa memuat seluruh isinya ke memori."""
+    text = _text_stream(binary)
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        text.detach() # Jangan menutup file milik UploadFile
+
+
+def iter_json_array(binary: BinaryIO, chunk_size: int = _JSON_READ_CHUNK) -> Iterator[Any]:
+    """
+    Parser inkremental untuk file berisi satu array JSON: membaca file per potongan dan
+    menghasilkan elemen array satu per satu, sehingga memori yang dipakai sebanding dengan
+    ukuran satu elemen, bukan ukuran file.
+    """
+    text = _text_stream(binary)
+    decoder = json.JSONDecoder()
+    buffer, pos = "", 0
+
+    def _fill() -> bool:
+        # Buffer hanya digeser jika ada data baru, sehingga posisi lama tetap valid saat EOF
+        nonlocal buffer, pos
+        chunk = text.read(chunk_size)
+        if not chunk:
+            return False
+        buffer, pos = buffer[pos:] + chunk, 0
+        return True
+
+    def _next_char() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _JSON_WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not _fill():
+                return ""
+
+    try:
+        if _next_char() != "[":
+            raise UploadParseError("JSON root must be an array of objects.")
+        pos += 1
+        expect_value = True
+        first = True
+        while True:
+            char = _next_char()
+            if char == "]" and (first or not expect_value):
+                return
+            if not expect_value:
+                if char != ",":
+                    raise UploadParseError("Expecting ',' or ']' between array elements.")
+                pos += 1
+                expect_value = True
+                continue
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    # Hanya nilai yang terpotong di ujung buffer yang menunggu potongan berikutnya;
+                    # selain itu error langsung dilaporkan tanpa membaca sisa file
+                    if not _is_truncated(e, buffer) or not _fill():
+                        raise UploadParseError(e.msg)
+                    continue
+                # Nilai yang berakhir tepat di ujung buffer (atau angka yang terpotong, mis. '1.' atau '2e')
+                # mungkin masih berlanjut di potongan berikutnya
+                may_continue = end == len(buffer) or (
+                    isinstance(value, (int, float)) and not isinstance(value, bool) and _is_number_tail(buffer[end:])
+                )
+                if not may_continue or not _fill():
+                    break
+            pos = end
+            first = False
+            expect_value = False
+            yield value
+    finally:
+        text.detach()
+
+
+def iter_upload_rows(file: UploadFile) -> Iterator[Any]:
+    """Membaca baris dari UploadFile secara streaming, lihat `iter_file_rows`."""
+    return iter_file_rows(file.file, file.content_type)
+
+
+def check_upload_content_type(content_type: Optional[str]) -> None:
+    """Menolak file selain CSV atau JSON dengan 415."""
+    if content_type not in _SUPPORTED_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Unsupported file type. Please upload a CSV or JSON file."
+        )
+
+
+def iter_file_rows(binary: BinaryIO, content_type: Optional[str]) -> Iterator[Any]:
+    """
+    Memilih parser streaming sesuai tipe file (CSV atau JSON).
+    Root JSON yang bukan array langsung ditolak sebelum ada baris yang diproses.
+    """
+    check_upload_content_type(content_type)
+    if content_type == "application/json":
+        rows = iter_json_array(binary)
+        try:
+            first_row = next(rows)
+        except StopIteration:
+            return iter(())
+        except UploadParseError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON format: {e}")
+        return _prepend(first_row, rows)
+    return iter_csv_rows(binary)
+
+
+def _prepend(first: Any, rest: Iterator[Any]) -> Iterator[Any]:
+    yield first
+    yield from rest
+
+
+def iter_row_batches(rows: Iterable[Any], batch_size: int) -> Iterator[List[Tuple[int, Any]]]:
+    """
+    Mengelompokkan baris menjadi batch berukuran tetap berisi (nomor_baris, baris), nomor baris mulai dari 1.
+    Error parsing di tengah file diteruskan sebagai UploadParseError dengan nomor baris tempat error terjadi.
+    """
+    batch: List[Tuple[int, Any]] = []
+    row_number = 0
+    iterator = iter(rows)
+    while True:
+        try:
+            row = next(iterator)
+        except StopIteration:
+            break
+        except UploadParseError as e:
+            if batch:
+                yield batch
+            raise UploadParseError(str(e), row_number=row_number + 1) from e
+        row_number += 1
+        batch.append((row_number, row))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
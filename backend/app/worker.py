@@ -0,0 +1,69 @@
+# backend/app/worker.py
+import argparse
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app import crud
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.background_job_service import run_job
+from app.services.bulk_upload_service import bulk_upload_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main() -> None:
+    """
+    Worker lokal untuk antrean pekerjaan di tabel background_jobs.
+    Proses utama mengambil pekerjaan dari database, lalu menjalankannya
+    di pool proses terpisah agar tidak membebani server API.
+    """
+    parser = argparse.ArgumentParser(description="Worker pekerjaan latar belakang SiManBaS")
+    parser.add_argument("--processes", type=int, default=settings.JOB_WORKER_PROCESSES)
+    parser.add_argument(
+        "--requeue-stale", action="store_true",
+        help="Kembalikan pekerjaan berstatus 'running' ke antrean (gunakan hanya jika tidak ada worker lain yang aktif)."
+    )
+    args = parser.parse_args()
+
+    try:
+        staging_root = bulk_upload_service.get_staging_root()
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+    logger.info(f"Direktori staging upload: {staging_root}")
+
+    if args.requeue_stale:
+        db = SessionLocal()
+        try:
+            requeued = crud.background_job.requeue_stale(db)
+            logger.info(f"{requeued} pekerjaan dikembalikan ke antrean.")
+        finally:
+            db.close()
+
+    logger.info(f"Worker berjalan dengan {args.processes} proses.")
+    # 'spawn' agar setiap proses anak membuat engine/koneksi database sendiri
+    mp_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=args.processes, mp_context=mp_context) as pool:
+        running = set()
+        try:
+            while True:
+                running = {future for future in running if not future.done()}
+                while len(running) < args.processes:
+                    db = SessionLocal()
+                    try:
+                        job = crud.background_job.claim_next(db)
+                    finally:
+                        db.close()
+                    if not job:
+                        break
+                    logger.info(f"Menjalankan pekerjaan {job.id} ({job.job_type}).")
+                    running.add(pool.submit(run_job, job.id))
+                time.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+        except KeyboardInterrupt:
+            logger.info("Worker dihentikan, menunggu pekerjaan yang sedang berjalan selesai...")
+
+if __name__ == "__main__":
+    # python -m app.worker --processes 2
+    main()
@@ -0,0 +1,51 @@
+# backend/tests/test_bootstrap.py
+import warnings
+
+import numpy as np
+import pytest
+
+from app.services import item_analysis_service
+from app.services.item_analysis_service import BOOTSTRAP_SEED, ItemAnalysisService, MIN_RESPONSES_FOR_DISCRIMINATION
+
+
+def _dense_reference(answered, correct, group_fraction, replicates):
+    """Replikasi bootstrap dengan array penuh (replikasi x siswa x soal) sebagai pembanding."""
+    n_students = answered.shape[0]
+    rng = np.random.default_rng(BOOTSTRAP_SEED)
+    weights = rng.multinomial(n_students, np.full(n_students, 1.0 / n_students), size=replicates).astype(float)
+    resp = answered.astype(float)
+    hits = (correct & answered).astype(float)
+    n_responses = weights @ resp
+    weighted = weights[:, :, None] * resp[None, :, :]
+    before = np.cumsum(weighted, axis=1) - weighted
+    after = n_responses[:, None, :] - before - weighted
+    group_size = np.minimum(np.ceil(n_responses * group_fraction), n_responses // 2)
+    upper = np.clip(group_size[:, None, :] - before, 0, weighted)
+    lower = np.clip(group_size[:, None, :] - after, 0, weighted)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = (weights @ hits) / n_responses
+        d = ((upper * hits).sum(axis=1) - (lower * hits).sum(axis=1)) / group_size
+    d[(n_responses < MIN_RESPONSES_FOR_DISCRIMINATION) | (group_size < 2)] = np.nan
+    return p, d
+
+
+@pytest.mark.parametrize("n_students, n_items", [(1, 3), (7, 4), (40, 9), (150, 6)])
+@pytest.mark.parametrize("group_fraction", [0.27, 0.5])
+def test_blocked_bootstrap_matches_dense_reference(monkeypatch, n_students, n_items, group_fraction):
+    rng = np.random.default_rng(n_students)
+    answered = rng.random((n_students, n_items)) < 0.8
+    correct = rng.random((n_students, n_items)) < 0.6
+    replicates = 50
+    # Potongan kecil agar beberapa potongan replikasi ikut diuji
+    monkeypatch.setattr(item_analysis_service, "_BOOTSTRAP_CHUNK_ELEMENTS", 1)
+
+    stats = ItemAnalysisService()._bootstrap_item_statistics(answered, correct, group_fraction, replicates=replicates)
+    p, d = _dense_reference(answered, correct, group_fraction, replicates)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning) # Soal yang seluruh replikasinya NaN
+        expected_p = np.nanpercentile(p, [2.5, 97.5], axis=0)
+        expected_d = np.nanpercentile(d, [2.5, 97.5], axis=0)
+    assert stats["replicates"] == replicates
+    assert np.allclose(stats["p_ci"], expected_p, equal_nan=True)
+    assert np.allclose(stats["d_ci"], expected_d, equal_nan=True)
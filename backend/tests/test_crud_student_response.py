@@ -0,0 +1,36 @@
+# backend/tests/test_crud_student_response.py
+import uuid
+
+import pytest
+
+from app.crud.crud_student_response import _copy_value
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, "\\N"),
+    (True, "t"),
+    (False, "f"),
+    ("jawaban biasa", "jawaban biasa"),
+    ("a\tb", "a\\tb"),
+    ("C:\\folder", "C:\\\\folder"),
+    ("baris1\nbaris2\r\n", "baris1\\nbaris2\\r\\n"),
+    ("\\N", "\\\\N"), # Teks '\N' tidak boleh terbaca sebagai NULL
+    ("", ""),
+])
+def test_copy_value_escapes_text_format(value, expected):
+    assert _copy_value(value) == expected
+
+
+def test_copy_value_formats_uuid_and_numbers():
+    value = uuid.UUID("12345678-1234-5678-1234-567812345678")
+
+    assert _copy_value(value) == "12345678-1234-5678-1234-567812345678"
+    assert _copy_value(0) == "0"
+
+
+def test_copy_row_has_one_field_per_column():
+    fields = [_copy_value(value) for value in ("a\tb", None, "c\nd")]
+    line = "\t".join(fields) + "\n"
+
+    assert line.count("\t") == 2
+    assert line.count("\n") == 1
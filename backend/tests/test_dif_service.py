@@ -0,0 +1,79 @@
+# backend/tests/test_dif_service.py
+import numpy as np
+import pytest
+
+from app.services.dif_service import classify_ets, mantel_haenszel_dif
+
+
+def _two_strata_table():
+    """
+    Satu soal, dua strata skor dengan tabel 2x2 yang sama:
+    referensi 30 benar / 20 salah, fokus 20 benar / 30 salah.
+    """
+    correct, is_focal, matching = [], [], []
+    for stratum in (0, 1):
+        for focal, n_correct, n_wrong in ((False, 30, 20), (True, 20, 30)):
+            correct += [True] * n_correct + [False] * n_wrong
+            is_focal += [focal] * (n_correct + n_wrong)
+            matching += [stratum] * (n_correct + n_wrong)
+    correct = np.array(correct)[:, None]
+    return np.ones_like(correct), correct, np.array(matching), np.array(is_focal)
+
+
+def test_mantel_haenszel_known_table():
+    answered, correct, matching, is_focal = _two_strata_table()
+
+    result = mantel_haenszel_dif(answered, correct, matching, is_focal)
+
+    # alpha_MH = sum(ad/t) / sum(bc/t) = (2 * 30*30/100) / (2 * 20*20/100)
+    assert result["strata_count"] == 2
+    assert result["odds_ratio"][0] == pytest.approx(2.25)
+    assert result["delta"][0] == pytest.approx(-2.35 * np.log(2.25))
+    # RBG untuk strata identik: var ln(OR) = (1/a + 1/b + 1/c + 1/d) / jumlah strata
+    assert result["delta_se"][0] == pytest.approx(2.35 * np.sqrt((1 / 30 + 1 / 20 + 1 / 20 + 1 / 30) / 2))
+    # Chi-square MH: (|60 - 50| - 0.5)^2 / (2 * 50*50*50*50 / (100^2 * 99))
+    assert result["chi_square"][0] == pytest.approx(9.5 ** 2 / (2 * 50 ** 4 / (100 ** 2 * 99)))
+    assert result["reference_count"][0] == 100
+    assert result["focal_count"][0] == 100
+
+
+def test_mantel_haenszel_without_dif_is_neutral():
+    answered, correct, matching, is_focal = _two_strata_table()
+    is_focal = np.arange(len(is_focal)) % 2 == 1 # Kedua kelompok punya pola jawaban yang sama
+
+    result = mantel_haenszel_dif(answered, correct, matching, is_focal)
+
+    assert result["odds_ratio"][0] == pytest.approx(1.0)
+    assert result["delta"][0] == pytest.approx(0.0, abs=1e-12)
+
+
+def test_unanswered_item_has_no_statistics():
+    answered, correct, matching, is_focal = _two_strata_table()
+    answered = np.hstack([answered, np.zeros_like(answered)])
+    correct = np.hstack([correct, np.zeros_like(correct)])
+
+    result = mantel_haenszel_dif(answered, correct, matching, is_focal)
+
+    assert np.isnan(result["odds_ratio"][1])
+    assert np.isnan(result["delta"][1])
+
+
+@pytest.mark.parametrize("delta, delta_se, chi_square, expected", [
+    (0.5, 0.2, 10.0, "A"), # |delta| < 1
+    (-2.0, 0.2, 2.0, "A"), # Tidak signifikan
+    (1.2, 0.2, 10.0, "B"),
+    (-2.0, 0.7, 10.0, "B"), # |delta| >= 1.5 tetapi tidak signifikan lebih besar dari 1
+    (-2.0, 0.6, 10.0, "C"),
+    (1.6, 0.05, 10.0, "C"),
+    (float("nan"), 0.2, 10.0, None),
+])
+def test_classify_ets(delta, delta_se, chi_square, expected):
+    assert classify_ets(delta, delta_se, chi_square) == expected
+
+
+def test_known_table_is_classified_b():
+    answered, correct, matching, is_focal = _two_strata_table()
+    result = mantel_haenszel_dif(answered, correct, matching, is_focal)
+
+    # |delta| = 1.906 dan signifikan, tetapi (1.906 - 1) / 0.678 < 1.645 sehingga bukan C
+    assert classify_ets(result["delta"][0], result["delta_se"][0], result["chi_square"][0]) == "B"
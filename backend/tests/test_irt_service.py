@@ -0,0 +1,101 @@
+# backend/tests/test_irt_service.py
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+
+from app import crud
+from app.services import irt_service as irt_module
+from app.services.irt_service import MAX_ABS_DIFFICULTY, fit_irt_model, irt_service
+from app.services.response_matrix import SessionResponseMatrix
+
+
+def _simulate_rasch(n_students: int, difficulties: np.ndarray, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    theta = rng.normal(0.0, 1.0, n_students)
+    prob = 1.0 / (1.0 + np.exp(-(theta[:, None] - difficulties[None, :])))
+    correct = rng.random(prob.shape) < prob
+    answered = np.ones_like(correct)
+    return theta, correct, answered
+
+
+def test_rasch_recovers_simulated_difficulties():
+    difficulties = np.linspace(-1.5, 1.5, 10)
+    theta, correct, answered = _simulate_rasch(3000, difficulties)
+
+    fit = fit_irt_model(correct, answered, model="rasch")
+
+    assert fit["converged"]
+    assert np.all(fit["discrimination"] == 1.0)
+    assert np.max(np.abs(fit["difficulty"] - difficulties)) < 0.15
+    assert np.corrcoef(fit["theta"], theta)[0, 1] > 0.75 # 10 soal: reliabilitas terbatas
+    assert fit["theta"].shape == (3000,)
+    assert np.all(fit["theta_se"] > 0)
+
+
+def test_response_patterns_are_compressed():
+    _, correct, answered = _simulate_rasch(2000, np.array([-1.0, 0.0, 1.0]))
+
+    fit = fit_irt_model(correct, answered, model="rasch")
+
+    assert fit["n_students"] == 2000
+    assert fit["n_patterns"] <= 2 ** 3
+
+
+def test_2pl_difficulty_stays_within_storable_range():
+    rng = np.random.default_rng(1)
+    correct = rng.random((400, 4)) < 0.5 # Soal tanpa daya beda: slope mendekati nol
+    correct[:, 0] = True
+    correct[:3, 0] = False # Soal hampir selalu benar: intercept sangat besar
+    answered = np.ones_like(correct)
+
+    fit = fit_irt_model(correct, answered, model="2pl")
+
+    finite = fit["difficulty"][np.isfinite(fit["difficulty"])]
+    assert np.all(np.abs(finite) <= MAX_ABS_DIFFICULTY)
+
+
+def test_items_without_responses_have_no_parameters():
+    _, correct, answered = _simulate_rasch(500, np.array([-0.5, 0.0, 0.5]))
+    answered[:, 2] = False
+    correct[:, 2] = False
+
+    fit = fit_irt_model(correct, answered, model="2pl")
+
+    assert np.isnan(fit["difficulty"][2])
+    assert np.isnan(fit["discrimination"][2])
+    assert np.all(np.isfinite(fit["difficulty"][:2]))
+
+
+def test_calibration_builds_each_session_matrix_just_before_fitting(monkeypatch):
+    _, correct, answered = _simulate_rasch(50, np.linspace(-1.0, 1.0, 4))
+    events = []
+
+    def _build_for_session(db, *, session, test_session_identifier=None):
+        events.append(("build", session.id))
+        return SessionResponseMatrix(
+            test_session_identifier=str(session.id),
+            student_identifiers=[f"S{s:02d}" for s in range(correct.shape[0])],
+            question_ids=[uuid.uuid4() for _ in range(correct.shape[1])],
+            question_types=["essay"] * correct.shape[1],
+            option_ids=[[] for _ in range(correct.shape[1])],
+            option_index=np.zeros(correct.shape, dtype=np.uint8),
+            answered=answered,
+            correct=correct,
+        )
+
+    def _store_calibration(db, *, session, matrix, fit):
+        events.append(("store", session.id))
+        return session.id
+
+    session_ids = [uuid.uuid4(), uuid.uuid4()]
+    monkeypatch.setattr(crud.test_session, "get", lambda db, id: SimpleNamespace(id=id))
+    monkeypatch.setattr(irt_module.response_matrix_service, "build_for_session", _build_for_session)
+    monkeypatch.setattr(irt_service, "_store_calibration", _store_calibration)
+
+    calibrations = irt_service.calibrate_test_sessions(None, session_ids=session_ids, model="rasch")
+
+    assert calibrations == session_ids
+    assert events == [
+        ("build", session_ids[0]), ("store", session_ids[0]), ("build", session_ids[1]), ("store", session_ids[1])
+    ]
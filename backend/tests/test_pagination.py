@@ -0,0 +1,29 @@
+# backend/tests/test_pagination.py
+from app.core import pagination
+from app.core.pagination import CountCache
+
+
+def test_count_cache_evicts_least_recently_used_above_max_entries():
+    cache = CountCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_count_cache_drops_expired_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(pagination.time, "monotonic", lambda: now[0])
+    cache = CountCache(ttl_seconds=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    now[0] = 111.0
+    assert cache.get("a") is None
+    cache.set("c", 3)
+
+    assert list(cache._entries) == ["c"]
@@ -0,0 +1,44 @@
+# backend/tests/test_reliability.py
+import numpy as np
+import pytest
+
+from app.services.item_analysis_service import ItemAnalysisService
+
+# Matriks Guttman 5 siswa x 4 soal: p = (0.8, 0.6, 0.4, 0.2), sum(pq) = 0.8, varians skor total = 2
+# KR-20 = 4/3 * (1 - 0.8 / 2) = 0.8
+TEXTBOOK_SCORES = np.array([
+    [1, 1, 1, 1],
+    [1, 1, 1, 0],
+    [1, 1, 0, 0],
+    [1, 0, 0, 0],
+    [0, 0, 0, 0],
+], dtype=float)
+
+
+def _alpha(scores: np.ndarray) -> float:
+    k = scores.shape[1]
+    return k / (k - 1) * (1 - scores.var(axis=0).sum() / scores.sum(axis=1).var())
+
+
+def test_kr20_on_textbook_matrix():
+    stats = ItemAnalysisService()._compute_reliability_statistics(TEXTBOOK_SCORES)
+
+    assert stats["cronbach_alpha"] == pytest.approx(0.8)
+    assert stats["score_mean"] == pytest.approx(2.0)
+    assert stats["score_std"] == pytest.approx(np.sqrt(2.0))
+    assert stats["standard_error_of_measurement"] == pytest.approx(np.sqrt(2.0) * np.sqrt(0.2))
+    assert np.allclose(stats["p_values"], [0.8, 0.6, 0.4, 0.2])
+
+
+def test_alpha_if_deleted_and_corrected_point_biserial_match_direct_computation():
+    rng = np.random.default_rng(0)
+    ability = rng.normal(size=200)
+    scores = (ability[:, None] + rng.normal(size=(200, 6)) > np.linspace(-1, 1, 6)).astype(float)
+
+    stats = ItemAnalysisService()._compute_reliability_statistics(scores)
+
+    for i in range(scores.shape[1]):
+        rest = np.delete(scores, i, axis=1)
+        assert stats["alpha_if_deleted"][i] == pytest.approx(_alpha(rest))
+        assert stats["point_biserial"][i] == pytest.approx(np.corrcoef(scores[:, i], rest.sum(axis=1))[0, 1])
+    assert stats["cronbach_alpha"] == pytest.approx(_alpha(scores))
@@ -0,0 +1,76 @@
+# backend/tests/test_response_matrix_cache.py
+import os
+import uuid
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.services.response_matrix import ResponseMatrixCache, SessionResponseMatrix, validate_session_identifier
+
+KEY = "a" * 40
+
+
+def _matrix(test_session_identifier: str) -> SessionResponseMatrix:
+    question_ids = [uuid.uuid4(), uuid.uuid4()]
+    return SessionResponseMatrix(
+        test_session_identifier=test_session_identifier,
+        student_identifiers=["S1", "S2"],
+        question_ids=question_ids,
+        question_types=["multiple_choice", "essay"],
+        option_ids=[[uuid.uuid4()], []],
+        option_index=np.array([[1, 0], [0, 0]], dtype=np.uint8),
+        answered=np.array([[True, True], [True, False]]),
+        correct=np.array([[True, False], [False, False]]),
+    )
+
+
+def test_store_and_load_round_trip(tmp_path):
+    cache = ResponseMatrixCache(str(tmp_path))
+    matrix = _matrix("sesi-1")
+    cache.store(matrix, key=KEY)
+
+    layout = {"question_ids": matrix.question_ids, "question_types": matrix.question_types, "option_ids": matrix.option_ids}
+    loaded = cache.load(test_session_identifier="sesi-1", key=KEY, layout=layout)
+
+    assert loaded.student_identifiers == ["S1", "S2"]
+    assert np.array_equal(loaded.correct, matrix.correct)
+    assert np.array_equal(loaded.option_index, matrix.option_index)
+
+
+def test_session_dir_is_hashed_and_stays_under_root(tmp_path):
+    root = tmp_path / "cache"
+    victim = tmp_path / "victim"
+    victim.mkdir()
+    (victim / "keep").mkdir()
+    cache = ResponseMatrixCache(str(root))
+
+    for identifier in (str(victim), "../victim", "sesi/../../victim"):
+        cache.store(_matrix(identifier), key=KEY)
+        session_dir = cache._session_dir(identifier)
+        assert os.path.dirname(session_dir) == str(root)
+        assert len(os.path.basename(session_dir)) == 40
+
+    assert (victim / "keep").is_dir()
+
+
+def test_store_only_removes_older_cache_keys(tmp_path):
+    cache = ResponseMatrixCache(str(tmp_path))
+    session_dir = cache._session_dir("sesi-1")
+    os.makedirs(os.path.join(session_dir, "b" * 40))
+    os.makedirs(os.path.join(session_dir, "lainnya"))
+
+    cache.store(_matrix("sesi-1"), key=KEY)
+
+    assert sorted(os.listdir(session_dir)) == sorted([KEY, "lainnya"])
+
+
+def test_validate_session_identifier_rejects_values_longer_than_the_column():
+    with pytest.raises(HTTPException) as exc_info:
+        validate_session_identifier("x" * 101)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.parametrize("identifier", [None, "UTS Matematika 2024", "XII/IPA/1", "sesi..2", "x" * 100])
+def test_validate_session_identifier_accepts_class_labels(identifier):
+    assert validate_session_identifier(identifier) == identifier
@@ -0,0 +1,55 @@
+# backend/tests/test_session_item_analysis.py
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app import crud
+from app.services import item_analysis_service
+from app.services.item_analysis_service import ItemAnalysisService
+from app.services.response_matrix import SessionResponseMatrix
+
+N_STUDENTS = 20
+
+
+def _matrix() -> SessionResponseMatrix:
+    # Siswa S00-S09 menjawab benar semua soal, S10-S19 salah semua
+    correct = np.zeros((N_STUDENTS, 3), dtype=bool)
+    correct[:10] = True
+    option_ids = [[uuid.uuid4(), uuid.uuid4()] for _ in range(3)]
+    return SessionResponseMatrix(
+        test_session_identifier="sesi-uji",
+        student_identifiers=[f"S{s:02d}" for s in range(N_STUDENTS)],
+        question_ids=[uuid.uuid4() for _ in range(3)],
+        question_types=["multiple_choice"] * 3,
+        option_ids=option_ids,
+        option_index=np.where(correct, 1, 2).astype(np.uint8),
+        answered=np.ones((N_STUDENTS, 3), dtype=bool),
+        correct=correct,
+    )
+
+
+def test_session_d_index_ranks_students_by_the_session_matrix(monkeypatch):
+    matrix = _matrix()
+    saved = []
+
+    def _upsert_many(db, objs_in):
+        saved.extend(objs_in)
+        return []
+
+    monkeypatch.setattr(crud.test_session, "get", lambda db, id: SimpleNamespace(id=id, questions=[]))
+    monkeypatch.setattr(
+        item_analysis_service.response_matrix_service, "build_for_session", lambda db, **kwargs: matrix
+    )
+    # Skor SQL dari is_response_correct dan respons di luar sesi membalik peringkat siswa
+    monkeypatch.setattr(
+        crud.student_response, "get_total_scores_by_session",
+        lambda db, test_session_identifier: {f"S{s:02d}": float(s) for s in range(N_STUDENTS)}
+    )
+    monkeypatch.setattr(crud.item_analysis_result, "upsert_many", _upsert_many)
+
+    result = ItemAnalysisService().analyze_test_session(None, session_id=uuid.uuid4())
+
+    assert result.students_analyzed_count == N_STUDENTS
+    assert [obj.discrimination_index for obj in saved] == pytest.approx([1.0, 1.0, 1.0])
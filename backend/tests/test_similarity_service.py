@@ -0,0 +1,99 @@
+# backend/tests/test_similarity_service.py
+import itertools
+import uuid
+
+import numpy as np
+import pytest
+
+from app.services import similarity_service
+from app.services.response_matrix import SessionResponseMatrix
+from app.services.similarity_service import find_similar_pairs, wrong_answer_features
+
+N_OPTIONS = 4 # Opsi 1 adalah kunci jawaban, opsi 2-4 pengecoh
+
+
+def _matrix(option_index: np.ndarray) -> SessionResponseMatrix:
+    n_students, n_items = option_index.shape
+    return SessionResponseMatrix(
+        test_session_identifier="sesi-uji",
+        student_identifiers=[f"S{s:03d}" for s in range(n_students)],
+        question_ids=[uuid.uuid4() for _ in range(n_items)],
+        question_types=["multiple_choice"] * n_items,
+        option_ids=[[uuid.uuid4() for _ in range(N_OPTIONS)] for _ in range(n_items)],
+        option_index=option_index.astype(np.uint8),
+        answered=option_index > 0,
+        correct=option_index == 1,
+    )
+
+
+def _random_options(n_students: int, n_items: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # Pengecoh dengan popularitas berbeda agar peluang kecocokan tiap soal tidak sama
+    return rng.choice(np.arange(1, N_OPTIONS + 1), size=(n_students, n_items), p=[0.5, 0.3, 0.15, 0.05])
+
+
+def _brute_force_pair(option_index: np.ndarray, a: int, b: int):
+    """z-score satu pasangan dihitung langsung dari definisinya, soal per soal."""
+    identical, expected, variance = 0, 0.0, 0.0
+    for i in range(option_index.shape[1]):
+        column = option_index[:, i]
+        wrong = column[column > 1]
+        if column[a] <= 1 or column[b] <= 1:
+            continue
+        shares = np.array([(wrong == k).mean() for k in range(2, N_OPTIONS + 1)])
+        match_prob = (shares ** 2).sum()
+        identical += int(column[a] == column[b])
+        expected += match_prob
+        variance += match_prob * (1 - match_prob)
+    z_score = (identical - expected) / np.sqrt(variance) if variance > 0 else np.nan
+    return identical, expected, z_score
+
+
+@pytest.mark.parametrize("block_rows", [1024, 7])
+def test_blocked_pair_z_scores_match_brute_force(monkeypatch, block_rows):
+    monkeypatch.setattr(similarity_service, "_BLOCK_ROWS", block_rows)
+    option_index = _random_options(30, 12, seed=0)
+
+    features = wrong_answer_features(_matrix(option_index))
+    result = find_similar_pairs(features, z_threshold=-1e9, min_identical_wrong=1, limit=10_000)
+
+    assert result["pairs_compared"] == 30 * 29 // 2
+    found = {(pair["a"], pair["b"]): pair for pair in result["pairs"]}
+    expected_pairs = set()
+    for a, b in itertools.combinations(range(30), 2):
+        identical, expected, z_score = _brute_force_pair(option_index, a, b)
+        if identical >= 1 and np.isfinite(z_score):
+            expected_pairs.add((a, b))
+            pair = found[(a, b)]
+            assert pair["identical_wrong"] == identical
+            assert pair["expected"] == pytest.approx(expected, rel=1e-5)
+            assert pair["z_score"] == pytest.approx(z_score, rel=1e-4)
+    assert set(found) == expected_pairs
+    z_scores = [pair["z_score"] for pair in result["pairs"]]
+    assert z_scores == sorted(z_scores, reverse=True)
+
+
+def test_copied_rare_distractors_are_flagged_first():
+    option_index = _random_options(200, 30, seed=1)
+    option_index[17] = 4 # Semua jawaban memilih pengecoh paling jarang
+    option_index[42] = option_index[17]
+
+    features = wrong_answer_features(_matrix(option_index))
+    result = find_similar_pairs(features, z_threshold=4.5, min_identical_wrong=3, limit=5)
+
+    top = result["pairs"][0]
+    assert (top["a"], top["b"]) == (17, 42)
+    assert top["identical_wrong"] == 30
+    assert top["z_score"] >= 4.5
+
+
+def test_students_with_few_wrong_answers_are_pruned():
+    option_index = np.ones((10, 5), dtype=int)
+    option_index[0, :2] = 2
+    option_index[1, :2] = 2
+
+    features = wrong_answer_features(_matrix(option_index))
+    result = find_similar_pairs(features, z_threshold=0.0, min_identical_wrong=3, limit=10)
+
+    assert result["candidates_count"] == 0
+    assert result["pairs"] == []
@@ -0,0 +1,76 @@
+# backend/tests/test_upload_stream.py
+import io
+import json
+
+import pytest
+
+from app.services.upload_stream import UploadParseError, iter_json_array
+
+ROWS = [
+    {"student_identifier": f"S{i:03d}", "answer": "jawabé \"kutip\" \\ ✓" * (i % 4), "nilai": i * 0.5, "benar": i % 2 == 0, "catatan": None}
+    for i in range(50)
+]
+
+
+class _CountingReader(io.BytesIO):
+    """File biner yang mencatat berapa byte sudah dibaca parser."""
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def readinto(self, buffer) -> int:
+        n = super().readinto(buffer)
+        self.bytes_read += n
+        return n
+
+    def read1(self, size: int = -1) -> bytes:
+        data = super().read1(size)
+        self.bytes_read += len(data)
+        return data
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64, 65536])
+def test_json_split_across_chunk_boundaries(chunk_size):
+    data = json.dumps(ROWS, ensure_ascii=False, indent=1).encode("utf-8")
+
+    assert list(iter_json_array(io.BytesIO(data), chunk_size=chunk_size)) == ROWS
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 64])
+def test_values_ending_at_chunk_boundary(chunk_size):
+    # Angka dan literal di ujung potongan bisa berlanjut di potongan berikutnya (12 -> 1234, t -> true)
+    data = b'[1234, true, -5.5e3, null, "\\u00e9", {"a": [false]}]'
+
+    assert list(iter_json_array(io.BytesIO(data), chunk_size=chunk_size)) == [1234, True, -5.5e3, None, "é", {"a": [False]}]
+
+
+def test_empty_array_and_utf8_bom():
+    assert list(iter_json_array(io.BytesIO(b"\xef\xbb\xbf  [ ]  "), chunk_size=1)) == []
+
+
+def test_truncated_file_raises():
+    data = json.dumps(ROWS).encode("utf-8")[:-40]
+
+    with pytest.raises(UploadParseError):
+        list(iter_json_array(io.BytesIO(data), chunk_size=16))
+
+
+def test_malformed_element_fails_without_reading_rest_of_file():
+    data = b'[{"a": 1}, {"b" 2}, ' + b'{"c": 3}, ' * 100_000 + b"{}]"
+    reader = _CountingReader(data)
+    rows = iter_json_array(reader, chunk_size=1024)
+
+    assert next(rows) == {"a": 1}
+    with pytest.raises(UploadParseError, match="Expecting ':' delimiter"):
+        next(rows)
+    assert reader.bytes_read < 64 * 1024 < len(data)
+
+
+def test_root_must_be_array():
+    with pytest.raises(UploadParseError, match="array"):
+        list(iter_json_array(io.BytesIO(b'{"a": 1}')))
+
+
+def test_missing_separator_between_elements():
+    with pytest.raises(UploadParseError, match="','"):
+        list(iter_json_array(io.BytesIO(b'[{"a": 1} {"b": 2}]'), chunk_size=4))